@@ -7,6 +7,17 @@
 # 修改日期(Modified): 2025/1/28
 # 简介(Description): 火山ASR客户端模块
 # 修改记录(Changes): 
+#   - 可选客户端VAD门控（ASR_VAD）：只上行有声段并带预卷，静音期间发送保活帧，可在长时间静音后关闭连接、说话时重新建连
+#   - 新增延迟档位 ASR_PROFILES（low_latency / balanced / high_accuracy / batch），统一决定服务地址、请求参数和帧时长
+#   - 新增分句增量事件流 events()：PartialUpdated / UtteranceFinalized / SessionEnded
+#   - 有界发送队列（coalesce 背压合并 / drop 追实时边沿），帧时长按发送耗时在100~400ms间自适应，send_stats 输出队列深度与滞后
+#   - 会话中断线/45000081/55000031 时自动重连，重放环形缓冲中未固化的音频并拼接分句时间
+#   - 新增 AsrStandbyManager：预热连接待命，Mic ON 后无需握手即可发送音频；空闲超过 idle_timeout 后停止补充
+#   - ResponseParser 基于 memoryview 偏移解析，AsrResponse 延迟解码payload，可选orjson
+#   - 支持 ogg_opus 上行格式，PCM在独立线程编码为Ogg/Opus
+#   - 音频payload压缩策略可选：none / fast(zlib level 1) / gzip
+#   - 新增 AudioFrameEncoder：预计算协议头、复用缓冲区编码音频帧
+#   - 完整客户端请求payload按配置缓存，不再每次重新序列化和压缩
 #   - 完善异步上下文管理器实现，修复资源泄漏问题
 #   - 改进 __aenter__ 和 __aexit__ 方法的资源管理
 #   - 添加 _cleanup_resources 方法统一资源清理
@@ -20,13 +31,80 @@ import struct
 import gzip
 import uuid
 import json
+import zlib
+import functools
+import collections
 from config_manager import config_manager
+from audio_codec import OggOpusEncoder
+from vad_gate import VadGate
 import logging
 
 # 从配置管理器获取常量
-ASR_WS_URL = config_manager.get('ASR_WS_URL')
+ASR_WS_URL = config_manager.get('ASR_WS_URL')  # 可选：显式指定时覆盖延迟档位的服务地址
 ASR_SAMPLE_RATE = config_manager.get('ASR_SAMPLE_RATE')
 
+# 火山ASR服务地址
+ASR_ENDPOINTS = {
+    'bigmodel': "wss://openspeech.bytedance.com/api/v3/sauc/bigmodel",                    # 双向流式：每包返回结果
+    'bigmodel_async': "wss://openspeech.bytedance.com/api/v3/sauc/bigmodel_async",        # 双向流式优化版：结果变化时返回
+    'bigmodel_nostream': "wss://openspeech.bytedance.com/api/v3/sauc/bigmodel_nostream",  # 流式输入：整句结束后返回
+}
+
+# 延迟档位：同时决定服务地址、请求参数和客户端帧时长
+ASR_PROFILES = {
+    # 最快出字：每包返回结果、较短判停窗口、100ms帧
+    'low_latency': {
+        'endpoint': 'bigmodel',
+        'chunk_ms': 100,
+        'request': {
+            "result_type": "single",
+            "vad_segment_duration": 600,
+            "end_window_size": 400,
+            "force_to_speech_time": 1000,
+            "enable_nonstream": False,
+        },
+    },
+    # 默认档位：与原有请求参数一致
+    'balanced': {
+        'endpoint': 'bigmodel_async',
+        'chunk_ms': 200,
+        'request': {
+            "result_type": "single",
+            "vad_segment_duration": 600,
+            "enable_nonstream": False,
+        },
+    },
+    # 准确优先：开启二遍识别，放宽判停窗口
+    'high_accuracy': {
+        'endpoint': 'bigmodel_async',
+        'chunk_ms': 200,
+        'request': {
+            "result_type": "single",
+            "vad_segment_duration": 600,
+            "end_window_size": 1200,
+            "enable_nonstream": True,
+        },
+    },
+    # 录音转写：只返回整句结果，大帧减少请求数
+    'batch': {
+        'endpoint': 'bigmodel_nostream',
+        'chunk_ms': 400,
+        'request': {
+            "result_type": "full",
+            "enable_nonstream": False,
+        },
+    },
+}
+ASR_PROFILE = config_manager.get('ASR_PROFILE', 'balanced')
+# 服务端判停窗口缺省值（请求未指定 end_window_size 时）
+SERVER_END_WINDOW_MS = 800
+
+def get_asr_profile(name: str) -> dict:
+    """按名称获取延迟档位"""
+    if name not in ASR_PROFILES:
+        raise ValueError(f"不支持的ASR延迟档位: {name}，可选 {', '.join(ASR_PROFILES)}")
+    return ASR_PROFILES[name]
+
 # 说话人检测功能已禁用（需要resemblyzer依赖）
 # 如需启用，请取消注释以下行并安装resemblyzer
 # from speaker_change_detector import SpeakerChangeDetector
@@ -56,6 +134,7 @@ class SerializationType:
     JSON = 0b0001
 
 class CompressionType:
+    NO_COMPRESSION = 0b0000
     GZIP = 0b0001
 
 # 协议头构造
@@ -99,6 +178,49 @@ class AsrRequestHeader:
     def default_header():
         return AsrRequestHeader()
 
+# 帧前缀：4字节协议头 + 4字节序列号 + 4字节payload长度
+_FRAME_PREFIX = struct.Struct('>4siI')
+
+def _audio_only_header(is_last: bool, compression_type: int = CompressionType.GZIP) -> bytes:
+    flags = MessageTypeSpecificFlags.NEG_WITH_SEQUENCE if is_last else MessageTypeSpecificFlags.POS_SEQUENCE
+    return AsrRequestHeader.default_header() \
+        .with_message_type(MessageType.CLIENT_AUDIO_ONLY_REQUEST) \
+        .with_message_type_specific_flags(flags) \
+        .with_compression_type(compression_type) \
+        .to_bytes()
+
+# 协议头只取决于标志位组合，预先计算
+_AUDIO_ONLY_HEADERS = {
+    (is_last, compression_type): _audio_only_header(is_last, compression_type)
+    for is_last in (False, True)
+    for compression_type in (CompressionType.NO_COMPRESSION, CompressionType.GZIP)
+}
+_FULL_CLIENT_HEADER = AsrRequestHeader.default_header() \
+    .with_message_type_specific_flags(MessageTypeSpecificFlags.POS_SEQUENCE) \
+    .to_bytes()
+
+def _gzip_fast(data) -> bytes:
+    """zlib level 1 输出gzip容器，服务端按GZIP解压"""
+    compressor = zlib.compressobj(1, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+# 音频payload压缩策略：名称 -> (协议压缩类型, 压缩函数)
+# 服务端逐帧独立解压，因此每帧都是完整的gzip成员，不能跨帧共享压缩上下文
+AUDIO_COMPRESSION_MODES = {
+    'none': (CompressionType.NO_COMPRESSION, None),
+    'fast': (CompressionType.GZIP, _gzip_fast),
+    'gzip': (CompressionType.GZIP, gzip.compress),
+}
+ASR_AUDIO_COMPRESSION = config_manager.get('ASR_AUDIO_COMPRESSION', 'gzip')
+
+# 上行音频格式：名称 -> 完整客户端请求中声明的 (format, codec)
+# ogg_opus 约为原始PCM码率的1/10，适合手机热点、会议室等带宽受限场景
+AUDIO_FORMATS = {
+    'pcm': ("pcm", "raw"),
+    'ogg_opus': ("ogg", "opus"),
+}
+ASR_AUDIO_FORMAT = config_manager.get('ASR_AUDIO_FORMAT', 'pcm')
+
 # 请求构造
 class RequestBuilder:
     @staticmethod
@@ -112,15 +234,16 @@ class RequestBuilder:
         }
 
     @staticmethod
-    def new_full_client_request(seq: int) -> bytes:
-        header = AsrRequestHeader.default_header() \
-            .with_message_type_specific_flags(MessageTypeSpecificFlags.POS_SEQUENCE)
+    @functools.lru_cache(maxsize=16)
+    def full_client_payload(sample_rate: int, audio_format: str = 'pcm', profile: str = 'balanced') -> bytes:
+        """构造并压缩完整客户端请求的payload，相同配置只计算一次"""
+        audio_container, audio_codec = AUDIO_FORMATS[audio_format]
         payload = {
             "user": {"uid": "demo_uid"},
             "audio": {
-                "format": "pcm",  # 恢复为PCM编码
-                "codec": "raw",
-                "rate": ASR_SAMPLE_RATE,
+                "format": audio_container,
+                "codec": audio_codec,
+                "rate": sample_rate,
                 "bits": 16,
                 "channel": 1
             },
@@ -130,49 +253,118 @@ class RequestBuilder:
                 "enable_punc": True,
                 "enable_ddc": True,
                 "show_utterances": True,
-                "result_type": "single",
-                "vad_segment_duration": 600,
-                # "end_window_size": 800,
-                # "force_to_speech_time": 1000,
-                "enable_nonstream": False
+                **get_asr_profile(profile)['request'],
             }
         }
-        payload_bytes = json.dumps(payload).encode('utf-8')
-        compressed_payload = gzip.compress(payload_bytes)
-        payload_size = len(compressed_payload)
-        request = bytearray()
-        request.extend(header.to_bytes())
-        request.extend(struct.pack('>i', seq))
-        request.extend(struct.pack('>I', payload_size))
-        request.extend(compressed_payload)
-        return bytes(request)
+        return gzip.compress(json.dumps(payload).encode('utf-8'))
+
+    @staticmethod
+    def new_full_client_request(seq: int, audio_format: str = 'pcm', profile: str = 'balanced') -> bytes:
+        compressed_payload = RequestBuilder.full_client_payload(ASR_SAMPLE_RATE, audio_format, profile)
+        return _FRAME_PREFIX.pack(_FULL_CLIENT_HEADER, seq, len(compressed_payload)) + compressed_payload
 
     @staticmethod
     def new_audio_only_request(seq: int, segment: bytes, is_last: bool = False) -> bytes:
-        header = AsrRequestHeader.default_header()
         if is_last:
-            header.with_message_type_specific_flags(MessageTypeSpecificFlags.NEG_WITH_SEQUENCE)
             seq = -seq
-        else:
-            header.with_message_type_specific_flags(MessageTypeSpecificFlags.POS_SEQUENCE)
-        header.with_message_type(MessageType.CLIENT_AUDIO_ONLY_REQUEST)
-        request = bytearray()
-        request.extend(header.to_bytes())
-        request.extend(struct.pack('>i', seq))
         compressed_segment = gzip.compress(segment)
-        request.extend(struct.pack('>I', len(compressed_segment)))
-        request.extend(compressed_segment)
-        return bytes(request)
+        header = _AUDIO_ONLY_HEADERS[(is_last, CompressionType.GZIP)]
+        return _FRAME_PREFIX.pack(header, seq, len(compressed_segment)) + compressed_segment
+
+class AudioFrameEncoder:
+    """
+    音频帧编码器：协议头预先计算，seq/size/payload 通过 pack_into 写入复用缓冲区。
+    返回的 memoryview 在下一次编码前有效，调用方需在发送完成后再编码下一帧。
+    compression 取值见 AUDIO_COMPRESSION_MODES：none / fast / gzip。
+    """
+
+    def __init__(self, compression: str = 'gzip', initial_capacity: int = 16384):
+        if compression not in AUDIO_COMPRESSION_MODES:
+            raise ValueError(f"不支持的音频压缩方式: {compression}")
+        self.compression = compression
+        self._compression_type, self._compress = AUDIO_COMPRESSION_MODES[compression]
+        self._buf = bytearray(_FRAME_PREFIX.size + initial_capacity)
+        self._view = memoryview(self._buf)
+
+    def frame(self, seq: int, payload, is_last: bool = False) -> memoryview:
+        """将已按本编码器压缩方式处理过的payload封装为音频帧"""
+        size = len(payload)
+        total = _FRAME_PREFIX.size + size
+        if total > len(self._buf):
+            # 容量不足时按需扩容，之后继续复用
+            self._buf = bytearray(total)
+            self._view = memoryview(self._buf)
+        if is_last:
+            seq = -seq
+        header = _AUDIO_ONLY_HEADERS[(is_last, self._compression_type)]
+        _FRAME_PREFIX.pack_into(self._buf, 0, header, seq, size)
+        self._view[_FRAME_PREFIX.size:total] = payload
+        return self._view[:total]
+
+    def encode(self, seq: int, segment, is_last: bool = False) -> memoryview:
+        """按压缩策略处理PCM片段并封装为音频帧"""
+        if self._compress is not None:
+            segment = self._compress(segment)
+        return self.frame(seq, segment, is_last)
+
+# JSON解析后端：安装了orjson时优先使用
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+_INT32 = struct.Struct('>i')
+_UINT32 = struct.Struct('>I')
+_ERROR_PREFIX = struct.Struct('>iI')
 
 # 响应解析
 class AsrResponse:
+    """
+    ASR响应。payload_msg 延迟解码：只检查 code / is_last_package 的调用方
+    不会触发解压和JSON解析，首次访问 payload_msg 时才解码并缓存结果。
+    """
+    __slots__ = ('code', 'event', 'is_last_package', 'payload_sequence', 'payload_size',
+                 'raw_payload', '_compression', '_serialization', '_payload_msg', '_decoded')
+
     def __init__(self):
         self.code = 0
         self.event = 0
         self.is_last_package = False
         self.payload_sequence = 0
         self.payload_size = 0
-        self.payload_msg = None
+        self.raw_payload = None  # 未解码的payload（memoryview，引用原始消息）
+        self._compression = CompressionType.NO_COMPRESSION
+        self._serialization = SerializationType.NO_SERIALIZATION
+        self._payload_msg = None
+        self._decoded = True
+
+    @property
+    def payload_msg(self):
+        if not self._decoded:
+            self._decoded = True
+            self._payload_msg = self._decode_payload()
+        return self._payload_msg
+
+    @payload_msg.setter
+    def payload_msg(self, value):
+        self._payload_msg = value
+        self._decoded = True
+
+    def _decode_payload(self):
+        payload = self.raw_payload
+        if self._compression == CompressionType.GZIP:
+            try:
+                payload = zlib.decompress(payload, 16 + zlib.MAX_WBITS)
+            except Exception as e:
+                logger.error(f"Failed to decompress payload: {e}")
+                return None
+        try:
+            if self._serialization == SerializationType.JSON:
+                return _json_loads(bytes(payload))
+        except Exception as e:
+            logger.error(f"Failed to parse payload: {e}")
+        return None
 
     def to_dict(self):
         return {
@@ -187,41 +379,32 @@ class AsrResponse:
 class ResponseParser:
     @staticmethod
     def parse_response(msg: bytes) -> AsrResponse:
+        """按偏移解析响应头，payload以memoryview保存，不复制、不解码"""
         response = AsrResponse()
         header_size = msg[0] & 0x0f
         message_type = msg[1] >> 4
         message_type_specific_flags = msg[1] & 0x0f
-        serialization_method = msg[2] >> 4
-        message_compression = msg[2] & 0x0f
-        payload = msg[header_size*4:]
+        offset = header_size * 4
         if message_type_specific_flags & 0x01:
-            response.payload_sequence = struct.unpack('>i', payload[:4])[0]
-            payload = payload[4:]
+            response.payload_sequence = _INT32.unpack_from(msg, offset)[0]
+            offset += 4
         if message_type_specific_flags & 0x02:
             response.is_last_package = True
         if message_type_specific_flags & 0x04:
-            response.event = struct.unpack('>i', payload[:4])[0]
-            payload = payload[4:]
+            response.event = _INT32.unpack_from(msg, offset)[0]
+            offset += 4
         if message_type == MessageType.SERVER_FULL_RESPONSE:
-            response.payload_size = struct.unpack('>I', payload[:4])[0]
-            payload = payload[4:]
+            response.payload_size = _UINT32.unpack_from(msg, offset)[0]
+            offset += 4
         elif message_type == MessageType.SERVER_ERROR_RESPONSE:
-            response.code = struct.unpack('>i', payload[:4])[0]
-            response.payload_size = struct.unpack('>I', payload[4:8])[0]
-            payload = payload[8:]
-        if not payload:
+            response.code, response.payload_size = _ERROR_PREFIX.unpack_from(msg, offset)
+            offset += 8
+        if offset >= len(msg):
             return response
-        if message_compression == CompressionType.GZIP:
-            try:
-                payload = gzip.decompress(payload)
-            except Exception as e:
-                logger.error(f"Failed to decompress payload: {e}")
-                return response
-        try:
-            if serialization_method == SerializationType.JSON:
-                response.payload_msg = json.loads(payload.decode('utf-8'))
-        except Exception as e:
-            logger.error(f"Failed to parse payload: {e}")
+        response.raw_payload = memoryview(msg)[offset:]
+        response._compression = msg[2] & 0x0f
+        response._serialization = msg[2] >> 4
+        response._decoded = False
         return response
 
 # 错误码与原因映射
@@ -241,19 +424,291 @@ def get_asr_error_reason(code):
         return "服务内部处理错误"
     return "未知错误"
 
+# 分句增量事件
+class PartialUpdated:
+    """未固化部分的文本发生变化（text 为空表示当前没有未固化内容）"""
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text
+
+    def __repr__(self):
+        return f"PartialUpdated({self.text!r})"
+
+class UtteranceFinalized:
+    """新固化的分句，utterance 为服务端分句字典（时间已拼接到会话时间）"""
+    __slots__ = ('utterance',)
+
+    def __init__(self, utterance):
+        self.utterance = utterance
+
+    def __repr__(self):
+        return f"UtteranceFinalized({self.utterance.get('text')!r})"
+
+class SessionEnded:
+    """会话结束，reason 为 'last'（正常结束）、错误码、'closed' 或 'error'"""
+    __slots__ = ('reason',)
+
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __repr__(self):
+        return f"SessionEnded({self.reason!r})"
+
+class UtteranceDiffer:
+    """
+    将服务端每次下发的完整分句列表与上一条消息比较，只产出变化：
+    固化分句按 (start_time, end_time) 去重，未固化文本变化时才产出 PartialUpdated。
+    分句按时间排列、固化分句在前，因此从尾部向前扫描到第一个已知固化分句即可停止，
+    开销只与变化部分成正比。acked_ms 为已固化分句覆盖到的最晚结束时间（断线重连时从这里重放）。
+    """
+
+    def __init__(self):
+        self._finalized = set()
+        self._partial = ""
+        self.acked_ms = 0.0
+
+    def feed(self, payload_msg) -> list:
+        result = payload_msg.get('result') if isinstance(payload_msg, dict) else None
+        if not isinstance(result, dict):
+            return []
+        utterances = result.get('utterances') or []
+        finalized = []
+        partial = []
+        for utt in reversed(utterances):
+            if not utt.get('definite'):
+                partial.append(utt.get('text', ''))
+                continue
+            key = (utt.get('start_time'), utt.get('end_time'))
+            if key in self._finalized:
+                break
+            self._finalized.add(key)
+            if isinstance(utt.get('end_time'), (int, float)):
+                self.acked_ms = max(self.acked_ms, utt['end_time'])
+            if utt.get('text'):
+                finalized.append(UtteranceFinalized(utt))
+        events = finalized[::-1]
+        text = "".join(reversed(partial))
+        if text != self._partial:
+            self._partial = text
+            events.append(PartialUpdated(text))
+        return events
+
+# 会话中可通过重连恢复的错误码：等包超时、服务器繁忙
+RECOVERABLE_ERROR_CODES = {45000081, 55000031}
+ASR_REPLAY_SECONDS = float(config_manager.get('ASR_REPLAY_SECONDS', 30))
+
+class AudioReplayBuffer:
+    """已发送PCM的环形缓冲：保留最近 capacity_ms 毫秒音频，断线重连后按会话时间重放"""
+
+    def __init__(self, capacity_ms, sample_rate=ASR_SAMPLE_RATE):
+        self.capacity_ms = capacity_ms
+        self.bytes_per_ms = sample_rate * 2 / 1000
+        self._chunks = collections.deque()  # (start_ms, end_ms, pcm, is_last)
+        self.end_ms = 0.0
+
+    def append(self, pcm, is_last=False) -> float:
+        """追加一块已发送音频，返回其会话起始时间(ms)"""
+        start = self.end_ms
+        self.end_ms = start + len(pcm) / self.bytes_per_ms
+        self._chunks.append((start, self.end_ms, bytes(pcm), is_last))
+        while self._chunks and self.end_ms - self._chunks[0][1] >= self.capacity_ms:
+            self._chunks.popleft()
+        return start
+
+    def since(self, ms):
+        """返回结束时间晚于 ms 的所有音频块"""
+        return [chunk for chunk in self._chunks if chunk[1] > ms]
+
+# 发送队列：容量按音频时长计；coalesce 积压时阻塞音频源并合并成大帧，drop 超出时丢弃积压追到实时边沿
+SEND_QUEUE_POLICIES = ('coalesce', 'drop')
+ASR_SEND_POLICY = config_manager.get('ASR_SEND_POLICY', 'coalesce')
+ASR_MAX_LAG_MS = int(config_manager.get('ASR_MAX_LAG_MS', 2000))
+# 自适应帧时长范围，以及积压时单帧最大合并时长
+MIN_CHUNK_MS = 100
+MAX_CHUNK_MS = 400
+MAX_COALESCED_MS = 1000
+
+class AudioSendQueue:
+    """
+    有界的待发送PCM队列，容量为 max_lag_ms 毫秒音频。
+    coalesce: 队列满时 put 等待（背压），积压超过两帧时 take 一次取出至多 MAX_COALESCED_MS
+    drop:     队列满时丢弃积压，只保留最新写入的音频（追到实时边沿），丢弃时长记入 dropped_ms
+    """
+
+    def __init__(self, max_lag_ms=ASR_MAX_LAG_MS, policy=ASR_SEND_POLICY, sample_rate=ASR_SAMPLE_RATE):
+        if policy not in SEND_QUEUE_POLICIES:
+            raise ValueError(f"不支持的发送队列策略: {policy}，可选 {', '.join(SEND_QUEUE_POLICIES)}")
+        self.policy = policy
+        self.bytes_per_ms = sample_rate * 2 / 1000
+        self.max_bytes = int(max_lag_ms * self.bytes_per_ms) & ~1
+        self._pending = bytearray()
+        self._finished = False
+        self._flush = False          # 不等满一帧，立即取出已有音频
+        self._segment_end = None     # 分段结束位置（_pending 中的字节偏移），取到该位置时返回最后一包
+        self._cond = asyncio.Condition()
+        self._live_start = None   # 首块音频到达时的 (墙钟时间, 音频时长ms)
+        self.taken_ms = 0.0
+        self.dropped_ms = 0.0
+        self.gated_ms = 0.0       # VAD门控未上行的音频（净值，预卷送出时为负）
+        self.peak_ms = 0.0
+
+    @property
+    def depth_ms(self) -> float:
+        """队列中等待发送的音频时长"""
+        return len(self._pending) / self.bytes_per_ms
+
+    @property
+    def lag_ms(self) -> float:
+        """
+        按实时音频源估算的实时边沿滞后：自首块到达后应产生的音频减去已取出和已丢弃的音频，
+        包含队列积压以及 coalesce 背压时音频源被阻塞的时间
+        """
+        if self._live_start is None:
+            return 0.0
+        started, first_ms = self._live_start
+        live_ms = first_ms + (asyncio.get_running_loop().time() - started) * 1000
+        return max(0.0, live_ms - self.taken_ms - self.dropped_ms - self.gated_ms)
+
+    @property
+    def finished(self) -> bool:
+        """音频源已结束且队列已取空"""
+        return self._finished and not self._pending
+
+    def _mark_live(self, ms):
+        if self._live_start is None:
+            self._live_start = (asyncio.get_running_loop().time(), ms)
+
+    async def put(self, pcm, is_last=False):
+        self._mark_live(len(pcm) / self.bytes_per_ms)
+        async with self._cond:
+            if self.policy == 'coalesce':
+                await self._cond.wait_for(lambda: len(self._pending) < self.max_bytes)
+            self._pending += pcm
+            if self.policy == 'drop' and len(self._pending) > self.max_bytes:
+                drop = len(self._pending) - len(pcm)
+                del self._pending[:drop]
+                self.dropped_ms += drop / self.bytes_per_ms
+                if self._segment_end is not None:
+                    self._segment_end = max(0, self._segment_end - drop)
+            self._finished = self._finished or is_last
+            self.peak_ms = max(self.peak_ms, self.depth_ms)
+            self._cond.notify_all()
+
+    def skip(self, ms):
+        """记录VAD门控未上行的音频时长，使 lag_ms 仍按实时音频源计算"""
+        self._mark_live(ms)
+        self.gated_ms += ms
+
+    async def flush(self):
+        """已写入的音频不必等满一帧，下次 take 立即取出"""
+        async with self._cond:
+            if self._pending:
+                self._flush = True
+                self._cond.notify_all()
+
+    async def end_segment(self):
+        """在当前位置结束分段：取到该位置时返回最后一包，之后写入的音频属于下一分段"""
+        async with self._cond:
+            self._segment_end = len(self._pending)
+            self._cond.notify_all()
+
+    async def wait_audio(self) -> bool:
+        """等待有新音频可取，音频源结束且队列为空时返回 False"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._pending or self._finished)
+            return bool(self._pending)
+
+    async def take(self, chunk_ms):
+        """等待至少 chunk_ms 音频（或音频源结束、分段结束、flush）后取出一帧，返回 (pcm, is_last)"""
+        chunk_bytes = int(chunk_ms * self.bytes_per_ms) & ~1
+        async with self._cond:
+            await self._cond.wait_for(lambda: self._finished or self._segment_end is not None
+                                      or len(self._pending) >= chunk_bytes or self._flush)
+            size = chunk_bytes
+            if self.policy == 'coalesce' and len(self._pending) >= 2 * chunk_bytes:
+                size = max(chunk_bytes, int(MAX_COALESCED_MS * self.bytes_per_ms) & ~1)
+            segment_last = self._segment_end is not None and size >= self._segment_end
+            if segment_last:
+                size = self._segment_end
+                self._segment_end = None
+            elif self._segment_end is not None:
+                self._segment_end -= size
+            with memoryview(self._pending) as view:
+                pcm = view[:size].tobytes()
+            del self._pending[:size]
+            if not self._pending:
+                self._flush = False
+            self.taken_ms += len(pcm) / self.bytes_per_ms
+            self._cond.notify_all()
+            return pcm, segment_last or (self._finished and not self._pending)
+
+# 客户端VAD门控：预卷时长、静音期间保活帧间隔、静音多久后关闭连接（0为不关闭）
+ASR_VAD = str(config_manager.get('ASR_VAD', False)).lower() in ('1', 'true', 'yes', 'on')
+ASR_VAD_PRE_ROLL_MS = int(config_manager.get('ASR_VAD_PRE_ROLL_MS', 300))
+ASR_VAD_KEEPALIVE_MS = int(config_manager.get('ASR_VAD_KEEPALIVE_MS', 2000))
+ASR_VAD_IDLE_CLOSE_MS = int(config_manager.get('ASR_VAD_IDLE_CLOSE_MS', 0))
+VAD_HANGOVER_MARGIN_MS = 200
+
 # 主ASR客户端
 class VolcanoASRClientAsync:
-    def __init__(self, on_result=None, segment_duration=200):
+    def __init__(self, on_result=None, segment_duration=None, compression=None, audio_format=None, ws_url=None,
+                 replay_seconds=None, send_policy=None, max_lag_ms=None, profile=None, vad=None):
         self.seq = 1
-        self.segment_duration = segment_duration
+        # 延迟档位决定服务地址和默认帧时长，ws_url / segment_duration 显式传入时优先
+        self.profile = profile or ASR_PROFILE
+        profile_config = get_asr_profile(self.profile)
+        self.ws_url = ws_url or ASR_WS_URL or ASR_ENDPOINTS[profile_config['endpoint']]
+        self.segment_duration = segment_duration or profile_config['chunk_ms']
+        # 当前帧时长：从 segment_duration（档位帧时长）开始，按发送耗时在 MIN_CHUNK_MS~MAX_CHUNK_MS 之间自适应
+        self.min_chunk_ms = MIN_CHUNK_MS
+        self.chunk_ms = min(max(self.segment_duration, MIN_CHUNK_MS), MAX_CHUNK_MS)
+        self.send_policy = send_policy or ASR_SEND_POLICY
+        self.max_lag_ms = max_lag_ms or ASR_MAX_LAG_MS
+        self.send_queue = None
+        self.send_latency_ms = 0.0   # 发送耗时的指数平均
+        self.last_lag_ms = 0.0       # 最近一帧发送时距实时边沿的滞后
+        self.max_send_lag_ms = 0.0
+        self.frames_sent = 0
+        # 分句增量事件：调用 events() 后才开始产出
+        self._event_queue = None
+        self._differ = UtteranceDiffer()
         self.on_result = on_result
+        self.audio_format = audio_format or ASR_AUDIO_FORMAT
+        if self.audio_format not in AUDIO_FORMATS:
+            raise ValueError(f"不支持的上行音频格式: {self.audio_format}")
+        # Opus编码在独立线程执行；已编码数据再压缩没有收益，默认不压缩
+        self.opus_encoder = OggOpusEncoder(ASR_SAMPLE_RATE) if self.audio_format == 'ogg_opus' else None
+        if compression is None:
+            compression = 'none' if self.opus_encoder else ASR_AUDIO_COMPRESSION
+        # 音频压缩策略：CPU受限的ARM设备可选 none/fast，带宽受限链路用 gzip
+        self.encoder = AudioFrameEncoder(compression)
         self.session = None
         self.conn = None
         self.running = False
+        self.full_request_sent = False
+        self.prepared_at = None
         # 新增：重试和超时配置
         self.max_retries = 3
         self.retry_delay = 2
         self.connection_timeout = 30
+        # 会话中断线重连：保留最近 replay_seconds 秒已发送音频，重连后从最后固化分句之后重放
+        self.max_reconnects = 5
+        self.reconnect_delay = 0.5
+        self.replay_buffer = AudioReplayBuffer((replay_seconds or ASR_REPLAY_SECONDS) * 1000)
+        self._conn_offset_ms = 0.0  # 当前连接的音频零点对应的会话时间
+        self._responses_since_connect = 0
+        self.reconnect_count = 0
+        self.reconnect_gaps_ms = []
+        self.lost_audio_ms = 0.0
+        # VAD门控：拖尾静音不短于服务端判停窗口，保证分句能及时固化
+        self.vad_gate = None
+        if ASR_VAD if vad is None else vad:
+            end_window = profile_config['request'].get('end_window_size', SERVER_END_WINDOW_MS)
+            self.vad_gate = VadGate(ASR_SAMPLE_RATE, pre_roll_ms=ASR_VAD_PRE_ROLL_MS,
+                                    hangover_ms=end_window + VAD_HANGOVER_MARGIN_MS,
+                                    keepalive_interval_ms=ASR_VAD_KEEPALIVE_MS, idle_close_ms=ASR_VAD_IDLE_CLOSE_MS)
+        self.reopen_gaps_ms = []
         # 说话人检测功能已禁用（需要resemblyzer依赖）
         # 如需启用，请取消注释以下行并安装resemblyzer
         # self.speaker_detector = SpeakerChangeDetector(sample_rate=ASR_SAMPLE_RATE)
@@ -261,8 +716,9 @@ class VolcanoASRClientAsync:
     async def __aenter__(self):
         """异步上下文管理器入口，建立连接"""
         try:
-            # 创建会话并建立连接
-            await self.connect()
+            # 创建会话并建立连接（预热连接已建立时直接使用）
+            if not self.conn or self.conn.closed:
+                await self.connect()
             return self
         except Exception as e:
             # 如果连接失败，确保清理已创建的资源
@@ -283,7 +739,13 @@ class VolcanoASRClientAsync:
     async def _cleanup_resources(self):
         """清理所有相关资源"""
         self.running = False
-        
+
+        if self.opus_encoder:
+            self.opus_encoder.close()
+        await self._close_connection()
+
+    async def _close_connection(self):
+        """关闭WebSocket连接和HTTP会话"""
         # 关闭WebSocket连接
         if self.conn and not self.conn.closed:
             try:
@@ -320,9 +782,10 @@ class VolcanoASRClientAsync:
                 self.session = aiohttp.ClientSession(timeout=timeout)
                 
                 # 建立WebSocket连接
-                self.conn = await self.session.ws_connect(ASR_WS_URL, headers=headers)
+                self.conn = await self.session.ws_connect(self.ws_url, headers=headers)
+                self.full_request_sent = False
                 self.running = True
-                logger.info(f"成功连接到ASR服务: {ASR_WS_URL}")
+                logger.info(f"成功连接到ASR服务: {self.ws_url}")
                 return
                 
             except asyncio.TimeoutError as e:
@@ -357,73 +820,166 @@ class VolcanoASRClientAsync:
     async def send_full_client_request(self):
         """发送完整客户端请求"""
         try:
-            request = RequestBuilder.new_full_client_request(self.seq)
+            request = RequestBuilder.new_full_client_request(self.seq, self.audio_format, self.profile)
             await self.conn.send_bytes(request)
             logger.debug(f"发送完整客户端请求，序列号: {self.seq}")
             self.seq += 1
+            self.full_request_sent = True
         except Exception as e:
             logger.error(f"发送客户端请求失败: {str(e)}")
             raise
 
-    async def send_audio_stream(self, audio_generator):
-        """发送音频流，支持错误处理"""
-        buf = b""
-        count = 0
+    async def prepare(self):
+        """建立连接并发送完整客户端请求，之后即可直接发送音频"""
+        if not self.conn or self.conn.closed:
+            await self.connect()
+        if not self.full_request_sent:
+            await self.send_full_client_request()
+        self.prepared_at = asyncio.get_running_loop().time()
+
+    async def send_audio_stream(self, queue):
+        """从发送队列取帧发送，帧时长随发送耗时自适应，支持错误处理"""
         # 说话人检测功能已禁用（需要resemblyzer依赖）
         # 如需启用，请取消注释以下代码并安装resemblyzer
         # detector = self.speaker_detector
-        
+        loop = asyncio.get_running_loop()
         try:
-            async for chunk, is_last in audio_generator:
-                buf += chunk
-                count += 1
+            while True:
+                pcm, is_last = await queue.take(self.chunk_ms)
                 # 说话人检测功能已禁用
-                # results = detector.feed_pcm(chunk)
+                # results = detector.feed_pcm(pcm)
                 # for speech_pcm, is_changed in results:
                 #     if is_changed:
                 #         print("[SpeakerChange] 检测到说话人变化！")
-                # 调整为累积1个200ms块就发送，减少网络传输频率
-                if count == 1 or is_last:
-                    try:
-                        request = RequestBuilder.new_audio_only_request(self.seq, buf, is_last=is_last)
-                        await self.conn.send_bytes(request)
-                        logger.debug(f"发送音频块 seq={self.seq} size={len(request)} bytes last={is_last}")
-                        if not is_last:
-                            self.seq += 1
-                        buf = b""
-                        count = 0
-                    except Exception as e:
-                        logger.error(f"发送音频块失败: {str(e)}")
-                        raise
-                        
+                try:
+                    started = loop.time()
+                    # 先记入重放缓冲再发送，发送中途断线时该块也会被重放
+                    self.replay_buffer.append(pcm, is_last)
+                    await self._send_audio_frame(pcm, is_last)
+                    self._adapt_chunk((loop.time() - started) * 1000, queue.depth_ms, queue.lag_ms)
+                except Exception as e:
+                    logger.error(f"发送音频块失败: {str(e)}")
+                    raise
+                if is_last:
+                    break
+
         except Exception as e:
             logger.error(f"音频流发送异常: {str(e)}")
             raise
-            
+
         # 说话人检测功能已禁用
         # for speech_pcm, is_changed in detector.flush():
         #     if is_changed:
         #         print("[SpeakerChange] 检测到说话人变化！（结尾）")
 
+    def _adapt_chunk(self, latency_ms, backlog_ms, lag_ms):
+        """
+        按发送耗时调整帧时长：耗时超过帧时长一半（上行跟不上）或出现积压时增大帧、减少帧数；
+        耗时低于帧时长十分之一且无积压时减小帧、降低延迟，但不低于 MIN_CHUNK_MS。帧时长取20ms整数倍，便于Opus分帧。
+        """
+        self.frames_sent += 1
+        self.send_latency_ms = latency_ms if self.frames_sent == 1 else 0.8 * self.send_latency_ms + 0.2 * latency_ms
+        self.last_lag_ms = lag_ms
+        self.max_send_lag_ms = max(self.max_send_lag_ms, lag_ms)
+        ratio = self.send_latency_ms / self.chunk_ms
+        if ratio > 0.5 or backlog_ms > self.chunk_ms:
+            target = self.chunk_ms * 1.25
+        elif ratio < 0.1 and backlog_ms < self.chunk_ms:
+            target = self.chunk_ms * 0.9
+        else:
+            return
+        self.chunk_ms = min(max(round(target / 20) * 20, self.min_chunk_ms), MAX_CHUNK_MS)
+
+    def send_stats(self) -> dict:
+        """发送管线指标：队列深度、距实时边沿滞后、发送耗时、当前帧时长、丢弃音频"""
+        queue = self.send_queue
+        return {
+            "policy": self.send_policy,
+            "chunk_ms": self.chunk_ms,
+            "frames": self.frames_sent,
+            "send_latency_ms": self.send_latency_ms,
+            "queue_depth_ms": queue.depth_ms if queue else 0.0,
+            "queue_peak_ms": queue.peak_ms if queue else 0.0,
+            "lag_ms": queue.lag_ms if queue else 0.0,
+            "max_lag_ms": self.max_send_lag_ms,
+            "dropped_ms": queue.dropped_ms if queue else 0.0,
+        }
+
+    async def _send_audio_frame(self, pcm, is_last):
+        """编码并发送一个音频帧"""
+        payload = pcm
+        if self.opus_encoder:
+            payload = await self.opus_encoder.encode(pcm, is_last)
+        request = self.encoder.encode(self.seq, payload, is_last=is_last)
+        await self.conn.send_bytes(request)
+        logger.debug(f"发送音频块 seq={self.seq} size={len(request)} bytes last={is_last}")
+        if not is_last:
+            self.seq += 1
+
+    @property
+    def _acked_ms(self) -> float:
+        """已固化分句覆盖到的会话时间，由 UtteranceDiffer 记录"""
+        return self._differ.acked_ms
+
+    @_acked_ms.setter
+    def _acked_ms(self, value):
+        self._differ.acked_ms = value
+
+    def _stitch_utterances(self, response):
+        """重连后将分句时间平移到会话时间，丢弃重放重叠部分重复固化的分句"""
+        payload = response.payload_msg
+        result = payload.get('result') if isinstance(payload, dict) else None
+        utterances = result.get('utterances') if isinstance(result, dict) else None
+        if not utterances:
+            return
+        offset = self._conn_offset_ms
+        kept = []
+        for utt in utterances:
+            for item in [utt] + utt.get('words', []):
+                for key in ('start_time', 'end_time'):
+                    if isinstance(item.get(key), (int, float)):
+                        item[key] += offset
+            if utt.get('definite') and utt.get('end_time', offset) <= self._acked_ms:
+                continue
+            kept.append(utt)
+        result['utterances'] = kept
+
     async def receive_results(self):
-        """接收ASR结果，支持错误处理"""
+        """
+        接收ASR结果，支持错误处理。
+        返回结束原因：'last'（收到最后一包）、错误码（int）或 'closed'（连接中断）。
+        """
         try:
             async for msg in self.conn:
                 if msg.type == aiohttp.WSMsgType.BINARY:
                     try:
                         response = ResponseParser.parse_response(msg.data)
-                        if response.payload_msg:
-                            result = response.payload_msg.get('result', {})
-                            text = result.get('text', '')
                         if response.code != 0:
                             reason = get_asr_error_reason(response.code)
                             logger.error(f"ASR错误码: {response.code}, 原因: {reason}")
+                            if self.max_reconnects and response.code in RECOVERABLE_ERROR_CODES:
+                                # 可恢复错误由 run 负责重连，不打断上层
+                                return response.code
+                        else:
+                            self._responses_since_connect += 1
+                            # 首个连接的分句时间就是会话时间，不需要平移；重连后才需要平移和去重
+                            if self._conn_offset_ms:
+                                self._stitch_utterances(response)
+                            # 可能断线重连时无论上层是否读取payload都要记录已固化位置，否则重连会从头重放；
+                            # 不重连也没有事件消费者时才不解码payload
+                            if (self._event_queue is not None or self.max_reconnects) and response.payload_msg:
+                                events = self._differ.feed(response.payload_msg)
+                                if self._event_queue is not None:
+                                    for event in events:
+                                        self._event_queue.put_nowait(event)
                         if self.on_result:
                             ret = self.on_result(response)
                             if asyncio.iscoroutine(ret):
                                 await ret
-                        if response.is_last_package or response.code != 0:
-                            break
+                        if response.is_last_package:
+                            return 'last'
+                        if response.code != 0:
+                            return response.code
                     except Exception as e:
                         logger.error(f"解析ASR响应失败: {str(e)}")
                         continue
@@ -437,34 +993,338 @@ class VolcanoASRClientAsync:
                 elif msg.type == aiohttp.WSMsgType.CLOSE:
                     logger.info("收到WebSocket关闭消息")
                     break
-                    
+
+        except (aiohttp.ClientError, ConnectionError) as e:
+            logger.error(f"接收ASR结果时连接中断: {str(e)}")
         except Exception as e:
             logger.error(f"接收ASR结果异常: {str(e)}")
             raise
+        return 'closed'
+
+    def events(self):
+        """
+        返回分句增量事件的异步迭代器：PartialUpdated / UtteranceFinalized，最后以 SessionEnded 结束。
+        需在 run 之前调用，以免漏掉会话开头的事件。
+        """
+        if self._event_queue is None:
+            self._event_queue = asyncio.Queue()
+        return self._iter_events(self._event_queue)
+
+    @staticmethod
+    async def _iter_events(queue):
+        while True:
+            event = await queue.get()
+            yield event
+            if isinstance(event, SessionEnded):
+                return
+
+    async def _pump_audio(self, audio_generator, queue):
+        """从音频源读取数据放入队列；音频源结束但未标记最后一包时补发空的最后一包"""
+        last_queued = False
+        try:
+            async for chunk, is_last in audio_generator:
+                if self.vad_gate is not None:
+                    await self._put_gated(queue, chunk, is_last)
+                else:
+                    await queue.put(chunk, is_last)
+                if is_last:
+                    last_queued = True
+                    break
+        except Exception as e:
+            logger.error(f"读取音频源异常: {str(e)}")
+        if not last_queued:
+            await queue.put(b"", True)
+
+    async def _put_gated(self, queue, chunk, is_last):
+        """经VAD门控写入发送队列"""
+        gate = self.vad_gate
+        actions = gate.feed(chunk)
+        if is_last:
+            actions += gate.flush()
+        streamed = 0
+        for kind, pcm in actions:
+            if pcm is not None:
+                await queue.put(pcm)
+                streamed += len(pcm)
+            if kind in ('keepalive', 'pause'):
+                await queue.flush()
+            elif kind == 'idle':
+                await queue.end_segment()
+        queue.skip((len(chunk) - streamed) / queue.bytes_per_ms)
+        if streamed:
+            # 预卷使门控输出与采集块错开，立即发送已有音频，避免再等满一帧
+            await queue.flush()
+        if is_last:
+            await queue.put(b"", True)
+
+    @staticmethod
+    async def _cancel_task(task):
+        if task and task.done() and not task.cancelled():
+            # 发送任务因连接中断已失败，取出异常避免事件循环报告未处理异常
+            if task.exception():
+                logger.debug(f"任务已异常结束: {task.exception()}")
+            return
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                logger.debug(f"任务取消时异常: {e}")
+
+    async def _reconnect(self, attempt):
+        """退避后重连，重发完整客户端请求并重放未被固化的音频"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        delay = min(self.reconnect_delay * (2 ** (attempt - 1)), 8)
+        logger.warning(f"ASR会话中断，{delay:.1f}秒后第{attempt}次重连")
+        await asyncio.sleep(delay)
+        await self._restart_session()
+        pending = self.replay_buffer.since(self._acked_ms)
+        replay_from = pending[0][0] if pending else self.replay_buffer.end_ms
+        if replay_from > self._acked_ms:
+            self.lost_audio_ms += replay_from - self._acked_ms
+            logger.warning(f"重放缓冲不足，丢失 {replay_from - self._acked_ms:.0f}ms 音频")
+        self._conn_offset_ms = replay_from
+        for _, _, pcm, is_last in pending:
+            await self._send_audio_frame(pcm, is_last)
+        self.reconnect_count += 1
+        self.reconnect_gaps_ms.append((loop.time() - started) * 1000)
+        logger.info(f"ASR重连成功，重放 {self.replay_buffer.end_ms - replay_from:.0f}ms 音频")
+
+    async def _restart_session(self):
+        """关闭当前连接，建立新连接并重发完整客户端请求"""
+        await self._close_connection()
+        await self.connect()
+        self.seq = 1
+        self.full_request_sent = False
+        if self.opus_encoder:
+            # Ogg流需要从头开始
+            self.opus_encoder.close()
+            self.opus_encoder = OggOpusEncoder(ASR_SAMPLE_RATE)
+        await self.send_full_client_request()
+        self._responses_since_connect = 0
+
+    async def _resume_after_idle(self, queue) -> bool:
+        """VAD静音超时的分段已结束：关闭连接，等到再次说话时重新建连；音频源结束时返回 False"""
+        await self._close_connection()
+        logger.info("长时间静音，已关闭ASR连接，说话时重新建连")
+        if not await queue.wait_audio():
+            return False
+        started = asyncio.get_running_loop().time()
+        await self._restart_session()
+        # 上一分段已全部固化，新连接的分句时间接在已发送音频之后
+        self._acked_ms = self._conn_offset_ms = self.replay_buffer.end_ms
+        self.reopen_gaps_ms.append((asyncio.get_running_loop().time() - started) * 1000)
+        return True
+
+    def vad_stats(self) -> dict:
+        """VAD门控统计：采集与上行时长、上行比例、保活帧数、静音关闭次数及重新建连耗时"""
+        if self.vad_gate is None:
+            return {}
+        return dict(self.vad_gate.stats(), reopen_ms=list(self.reopen_gaps_ms))
+
+    def reconnect_stats(self) -> dict:
+        """重连统计：次数、每次中断到重放完成的耗时、缓冲不足丢失的音频时长"""
+        return {
+            "reconnects": self.reconnect_count,
+            "gap_ms": list(self.reconnect_gaps_ms),
+            "lost_audio_ms": self.lost_audio_ms,
+        }
 
     async def run(self, audio_generator):
-        """运行ASR客户端，支持错误处理和重试"""
+        """运行ASR客户端，支持错误处理和会话中断线重连"""
         send_task = None
+        pump_task = None
+        outcome = 'error'
         try:
             # 注意：连接应该在 __aenter__ 中已经建立
             if not self.conn or self.conn.closed:
                 logger.warning("WebSocket连接未建立，尝试重新连接")
                 await self.connect()
             
-            await self.send_full_client_request()
-            send_task = asyncio.create_task(self.send_audio_stream(audio_generator))
-            await self.receive_results()
+            if not self.full_request_sent:
+                await self.send_full_client_request()
+            # 音频源由独立任务读取，重连时只取消发送任务，不会关闭音频源
+            queue = self.send_queue = AudioSendQueue(self.max_lag_ms, self.send_policy)
+            pump_task = asyncio.create_task(self._pump_audio(audio_generator, queue))
+            failures = 0
+            while True:
+                send_task = asyncio.create_task(self.send_audio_stream(queue))
+                outcome = await self.receive_results()
+                if outcome == 'last' and self.vad_gate is not None and not queue.finished:
+                    # VAD静音超时结束的分段，音频源仍在继续
+                    await self._cancel_task(send_task)
+                    if not await self._resume_after_idle(queue):
+                        break
+                    continue
+                if outcome != 'closed' and outcome not in RECOVERABLE_ERROR_CODES:
+                    break
+                if self._responses_since_connect:
+                    failures = 0
+                failures += 1
+                if failures > self.max_reconnects:
+                    logger.error(f"ASR会话中断，已连续重连{self.max_reconnects}次，放弃")
+                    break
+                await self._cancel_task(send_task)
+                await self._reconnect(failures)
             
         except Exception as e:
             logger.error(f"ASR客户端运行异常: {str(e)}")
             raise
         finally:
-            # 取消发送任务
-            if send_task and not send_task.done():
-                send_task.cancel()
+            # 取消发送任务和音频读取任务
+            await self._cancel_task(send_task)
+            await self._cancel_task(pump_task)
+            if self._event_queue is not None:
+                self._event_queue.put_nowait(SessionEnded(outcome))
+            
+            self.running = False
+
+class AsrStandbyManager:
+    """
+    ASR预热连接管理器。
+    始终保持一条已鉴权、已发送完整客户端请求的WebSocket待命，acquire 时立即交付，
+    随后在后台补充新的待命连接。待命超过 standby_ttl 秒未被使用时先建新连接再关闭旧连接，
+    避免服务端等包超时（45000081）；standby_ttl 须小于服务端的等包超时。
+    每条待命连接都是一次计费会话：距上次 acquire/release 超过 idle_timeout 秒（0为不限）后
+    不再补充，关闭待命连接，下次 acquire 时现场建连并恢复补充。所有方法需在同一事件循环中调用。
+    """
+
+    def __init__(self, standby_ttl=8.0, max_backoff=60.0, idle_timeout=0, **client_kwargs):
+        self.standby_ttl = standby_ttl
+        self.max_backoff = max_backoff
+        self.idle_timeout = idle_timeout
+        self._last_used = None
+        self.client_kwargs = client_kwargs
+        self._standby = None
+        self._task = None
+        self._wakeup = None
+        self._closed = False
+        # 从 acquire 到首个非空中间结果的耗时(ms)，按是否使用预热连接分别统计
+        self.first_partial_ms = {'prewarmed': [], 'cold': []}
+
+    async def start(self):
+        """启动后台预热任务"""
+        if self._task is None:
+            self._closed = False
+            self._last_used = asyncio.get_running_loop().time()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._maintain())
+
+    async def close(self):
+        self._closed = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._standby:
+            await self._standby._cleanup_resources()
+            self._standby = None
+
+    def _is_fresh(self, client) -> bool:
+        if not client.conn or client.conn.closed or client.prepared_at is None:
+            return False
+        return asyncio.get_running_loop().time() - client.prepared_at < self.standby_ttl
+
+    async def _open(self):
+        client = VolcanoASRClientAsync(**self.client_kwargs)
+        try:
+            await client.prepare()
+        except BaseException:
+            await client._cleanup_resources()
+            raise
+        return client
+
+    async def _sleep(self, timeout):
+        """等待超时或被 acquire 唤醒"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    def _idle_remaining(self) -> float:
+        if not self.idle_timeout:
+            return float('inf')
+        return self.idle_timeout - (asyncio.get_running_loop().time() - self._last_used)
+
+    async def _maintain(self):
+        backoff = 1.0
+        while not self._closed:
+            if self._idle_remaining() <= 0:
+                # 长时间未使用：停止补充，等下一次 acquire
+                stale, self._standby = self._standby, None
+                if stale:
+                    await stale._cleanup_resources()
+                logger.debug("ASR预热连接空闲超时，暂停补充")
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            if self._standby is None or not self._is_fresh(self._standby):
                 try:
-                    await send_task
+                    fresh = await self._open()
                 except asyncio.CancelledError:
-                    pass
-            
-            self.running = False 
\ No newline at end of file
+                    raise
+                except Exception as e:
+                    logger.warning(f"ASR预热连接失败: {e}，{backoff:.0f}秒后重试")
+                    await self._sleep(backoff)
+                    backoff = min(backoff * 2, self.max_backoff)
+                    continue
+                backoff = 1.0
+                stale, self._standby = self._standby, fresh
+                if stale:
+                    await stale._cleanup_resources()
+                logger.debug("ASR预热连接已就绪")
+            if self._standby is None:
+                continue
+            remaining = self.standby_ttl - (asyncio.get_running_loop().time() - self._standby.prepared_at)
+            await self._sleep(max(min(remaining, self._idle_remaining()), 0))
+
+    async def acquire(self, on_result=None):
+        """取出一条可直接发送音频的连接；没有可用的预热连接时现场建立"""
+        start = asyncio.get_running_loop().time()
+        self._last_used = start
+        client, self._standby = self._standby, None
+        if client and not self._is_fresh(client):
+            await client._cleanup_resources()
+            client = None
+        kind = 'prewarmed' if client else 'cold'
+        if self._wakeup:
+            self._wakeup.set()
+        if client is None:
+            client = await self._open()
+        client.on_result = self._track_first_partial(on_result, kind, start)
+        return client
+
+    def release(self):
+        """会话结束时调用，空闲计时从此刻开始"""
+        self._last_used = asyncio.get_running_loop().time()
+        if self._wakeup:
+            self._wakeup.set()
+
+    def _track_first_partial(self, on_result, kind, start):
+        recorded = False
+
+        async def wrapper(response):
+            nonlocal recorded
+            if not recorded and response.payload_msg and response.payload_msg.get('result', {}).get('text'):
+                recorded = True
+                self.first_partial_ms[kind].append((asyncio.get_running_loop().time() - start) * 1000)
+            if on_result:
+                ret = on_result(response)
+                if asyncio.iscoroutine(ret):
+                    await ret
+        return wrapper
+
+    def first_partial_report(self) -> str:
+        """首个中间结果耗时统计（预热 vs 现场建连）"""
+        parts = []
+        for kind, values in self.first_partial_ms.items():
+            if values:
+                parts.append(f"{kind}: {len(values)}次 平均{sum(values) / len(values):.0f}ms")
+        return "，".join(parts) or "暂无数据"
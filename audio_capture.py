@@ -1,10 +1,27 @@
 # =============================================================
 # 文件名(File): audio_capture.py
-# 版本(Version): v2.0.2
+# 版本(Version): v2.2.0
 # 作者(Author): 深圳王哥 & AI
 # 创建日期(Created): 2025/07/29
-# 简介(Description): 桌面端音频采集模块，移除Android支持，专注桌面平台
+# 简介(Description): 桌面端音频采集模块，移除Android支持，专注桌面平台；可配置为回放录音文件
 # =============================================================
 
+from config_manager import config_manager
+
 # 直接使用桌面端PyAudio实现
-from audio_capture_pyaudio import AudioStream 
\ No newline at end of file
+from audio_capture_pyaudio import AudioStream
+from audio_capture_file import FileAudioStream
+from audio_engine import get_audio_engine
+
+def warm_up_audio():
+    """应用启动时在后台初始化 PortAudio 并枚举设备，Mic ON 时只需打开采集流"""
+    if not config_manager.get('AUDIO_REPLAY_FILE'):
+        get_audio_engine().start_background()
+
+def open_audio_stream(**kwargs):
+    """配置了 AUDIO_REPLAY_FILE 时回放录音文件（没有声卡的机器上测试用），否则打开麦克风"""
+    replay_file = config_manager.get('AUDIO_REPLAY_FILE')
+    if replay_file:
+        speed = float(config_manager.get('AUDIO_REPLAY_SPEED', 1.0))
+        return FileAudioStream(replay_file, speed=speed, **kwargs)
+    return AudioStream(**kwargs)
@@ -0,0 +1,122 @@
+# =============================================================
+# 文件名(File): audio_capture_file.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 录音文件回放音频源 - WAV/原始PCM按实时、N倍速或不限速回放，接口与 AudioStream 相同
+# =============================================================
+
+"""
+录音文件回放音频源
+
+FileAudioStream 与 audio_capture_pyaudio.AudioStream 接口相同（audio_stream_generator / subscribe /
+hub / stop / on_audio），可直接替换麦克风，用同一段会议录音驱动ASR、翻译和界面，
+在没有声卡的机器上做回归和延迟测试。
+
+    - WAV：按文件头的采样率和声道数读取，与输出格式不同时经 PolyphaseResampler 重采样/下混
+    - 原始PCM（其他扩展名）：16bit小端交错，采样率和声道数由 source_rate / source_channels 指定
+    - speed: 1 为实时，N 为N倍速，0 为不限速（由下游消费速度决定，适合批量转写）
+
+读取和节奏控制都在 audio_stream_generator 所在的事件循环中进行，每块与麦克风回调块同样大小，
+按“该块录制完成”的时刻送出；同时广播到 hub，录音、电平表等订阅者与麦克风采集时行为一致。
+"""
+
+import wave
+import asyncio
+from pathlib import Path
+
+from audio_hub import AudioHub
+from pcm_buffer import PcmRingBuffer
+from resampler import PolyphaseResampler
+
+class FileAudioStream:
+    def __init__(self, path, rate=16000, channels=1, frames_per_buffer=1024, speed=1.0,
+                 source_rate=None, source_channels=None):
+        self.path = Path(path)
+        self.rate = rate
+        self.channels = channels
+        self.frames_per_buffer = frames_per_buffer
+        self.speed = speed or 0
+        self.is_wav = self.path.suffix.lower() == '.wav'
+        if self.is_wav:
+            with wave.open(str(self.path), 'rb') as wf:
+                if wf.getsampwidth() != 2:
+                    raise ValueError(f"仅支持16bit WAV: {self.path}")
+                self.source_rate = wf.getframerate()
+                self.source_channels = wf.getnchannels()
+                source_frames = wf.getnframes()
+        else:
+            self.source_rate = source_rate or rate
+            self.source_channels = source_channels or channels
+            source_frames = self.path.stat().st_size // (2 * self.source_channels)
+        self.duration_ms = source_frames * 1000 / self.source_rate
+        self.position_ms = 0.0  # 已送出的音频时长
+        self.hub = AudioHub()
+        self.running = False
+
+    def start(self):
+        self.running = True
+
+    def stop(self):
+        """停止回放，可在其他线程调用；生成器在下一块前结束"""
+        self.running = False
+
+    def on_audio(self, data):
+        pass
+
+    def subscribe(self, name, max_frames=512, overflow='drop_oldest'):
+        """订阅回放帧，返回 audio_hub.Subscription；应在开始回放之前订阅"""
+        return self.hub.subscribe(name, max_frames, overflow)
+
+    def _open(self):
+        """返回 (读取函数, 关闭函数, 每块字节数)，读取函数参数为字节数"""
+        block_frames = self.frames_per_buffer * self.source_rate // self.rate
+        block_bytes = block_frames * 2 * self.source_channels
+        if self.is_wav:
+            wf = wave.open(str(self.path), 'rb')
+            return (lambda n: wf.readframes(n // (2 * self.source_channels))), wf.close, block_bytes
+        f = open(self.path, 'rb')
+        return f.read, f.close, block_bytes
+
+    async def _blocks(self):
+        """按节奏产出输出格式的PCM块"""
+        resampler = PolyphaseResampler(self.source_rate, self.rate, self.source_channels, self.channels)
+        bytes_per_ms = self.rate * self.channels * 2 / 1000
+        read, close, block_bytes = self._open()
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        self.position_ms = 0.0
+        try:
+            while self.running:
+                raw = read(block_bytes)
+                data = resampler.process(raw) if raw else resampler.flush()
+                if data:
+                    self.position_ms += len(data) / bytes_per_ms
+                    if self.speed:
+                        # 与麦克风一致：一块录制完成时才送出
+                        await asyncio.sleep(max(0.0, started + self.position_ms / 1000 / self.speed - loop.time()))
+                    else:
+                        await asyncio.sleep(0)
+                    self.hub.publish(data)
+                    self.on_audio(data)
+                    yield data
+                if not raw:
+                    break
+        finally:
+            close()
+            self.hub.close()
+
+    async def audio_stream_generator(self, chunk_ms=200):
+        bytes_per_ms = self.rate * self.channels * 2 // 1000
+        chunk_bytes = bytes_per_ms * chunk_ms
+        ring = PcmRingBuffer(chunk_bytes, capacity_chunks=4, sample_width=2 * self.channels)
+        self.start()
+        try:
+            async for data in self._blocks():
+                ring.write(data)
+                while (pcm := ring.read_chunk()) is not None:
+                    yield pcm, False
+        finally:
+            self.stop()
+        tail = ring.read_tail()
+        yield (tail if tail is not None else b""), True
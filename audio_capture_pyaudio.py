@@ -1,102 +1,241 @@
 # =============================================================
 # 文件名(File): audio_capture_pyaudio.py
-# 版本(Version): v2.0.2
+# 版本(Version): v2.1.0
 # 作者(Author): 深圳王哥 & AI
 # 创建日期(Created): 2025/07/29
 # 简介(Description): 桌面端 PyAudio 音频采集实现
+# 修改记录(Changes):
+#   - 采集队列只由 _consume 线程读取，经 AudioHub 以只读memoryview广播给各订阅者，
+#     修复 _consume 与 audio_stream_generator 争抢队列导致丢帧的问题
+#   - 采集队列有界，下游停滞时丢弃最旧的采集块
+#   - audio_stream_generator 改用预分配环形缓冲累积，按块输出只读memoryview，不再反复拼接和切片bytes
+#   - audio_stream_generator 以 asyncio 订阅读取采集帧，由 call_soon_threadsafe 唤醒，不再每帧占用线程池线程
+#   - 按设备原生采样率和声道数打开，_consume 线程内多相重采样并下混为 rate/channels 后再广播
+#   - 使用进程级 AudioEngine，不再每次创建 PyAudio（重新初始化PortAudio并枚举设备）
+#   - 采集超过 DEVICE_STALL_S 无数据时视为设备断开，按设备名称重新打开或改用默认设备，hub 与下游会话不中断
+#   - 记录 start 到首帧的耗时 first_frame_ms
+#   - 打开采集流后首帧前按 DEVICE_FIRST_FRAME_S 等待，启动较慢的设备（蓝牙耳机等）不会被误判为断开
 # =============================================================
 
+import time
 import threading
 import queue
-import asyncio
 import pyaudio
 
+from audio_engine import get_audio_engine
+from audio_hub import AudioHub
+from pcm_buffer import PcmRingBuffer
+from resampler import PolyphaseResampler
+
+# 采集回调超过该时长没有数据视为设备断开（拔出USB麦克风等），重新打开采集流
+DEVICE_STALL_S = 1.0
+# 打开（或重新打开）采集流后等待首帧的时长：蓝牙耳机等设备启动较慢，首帧前不按 DEVICE_STALL_S 判断
+DEVICE_FIRST_FRAME_S = 5.0
+
 class AudioStream:
-    def __init__(self, rate=16000, channels=1, frames_per_buffer=1024, input_device_index=None):
+    def __init__(self, rate=16000, channels=1, frames_per_buffer=1024, input_device_index=None, max_buffers=512,
+                 capture_rate=None, capture_channels=None, engine=None):
+        # rate/channels 为输出格式；设备按 capture_rate/capture_channels 打开，缺省取设备原生格式
         self.rate = rate
         self.channels = channels
         self.frames_per_buffer = frames_per_buffer
         self.input_device_index = input_device_index
-        self.audio_queue = queue.Queue()
+        self.capture_rate = capture_rate
+        self.capture_channels = capture_channels
+        self.resampler = None
+        # 有界队列：下游停滞时丢弃最旧的采集块，避免内存无限增长（默认512块约32秒）
+        self.audio_queue = queue.Queue(maxsize=max_buffers)
+        self.dropped_buffers = 0
+        # 采集帧广播中心：ASR上行、VAD、录音、电平表等各自订阅
+        self.hub = AudioHub()
         self.running = False
         self.thread = None
-        self.audio = pyaudio.PyAudio()
+        # PortAudio 由进程级引擎持有，这里不再初始化
+        self.engine = engine or get_audio_engine()
         self.stream = None
+        self._stream_lock = threading.Lock()
+        # 按名称记住所用设备，重新枚举后序号可能变化
+        self.device_name = None
+        self.device_switches = 0
+        self.started_at = None
+        self.first_frame_ms = None
 
     def start(self):
         if self.running:
             return
+        self.started_at = time.perf_counter()
+        self.first_frame_ms = None
+        self.resampler = None
         self.running = True
-        self.stream = self.audio.open(
-            format=pyaudio.paInt16,
-            channels=self.channels,
-            rate=self.rate,
-            input=True,
-            input_device_index=self.input_device_index,
-            frames_per_buffer=self.frames_per_buffer,
-            stream_callback=self._audio_callback
-        )
-        self.stream.start_stream()
+        try:
+            self._open_stream(self._device_info())
+        except Exception:
+            self.running = False
+            raise
         self.thread = threading.Thread(target=self._consume)
         self.thread.start()
 
+    def _device_info(self):
+        """本次采集所用设备：已记住名称时按名称查找（找不到则用默认设备），否则按序号或默认设备"""
+        engine = self.engine
+        if self.device_name is not None:
+            info = engine.find_input_device(self.device_name)
+            if info is not None:
+                return info
+            print(f"[音频] 找不到输入设备 {self.device_name}，改用默认输入设备")
+            return engine.default_input_info()
+        if self.input_device_index is None:
+            info = engine.default_input_info()
+        else:
+            info = engine.device_info(self.input_device_index)
+        self.device_name = info['name']
+        return info
+
+    def _open_stream(self, info):
+        """按设备原生格式打开采集流；重新打开时格式变化则先冲刷旧的重采样器再换新的"""
+        capture_rate, capture_channels = self._capture_format(info)
+        old = self.resampler
+        if old is None or (old.src_rate, old.in_channels) != (capture_rate, capture_channels):
+            if old is not None:
+                self._publish(old.flush())
+            resampler = PolyphaseResampler(capture_rate, self.rate, capture_channels, self.channels)
+            self.resampler = None if resampler.passthrough else resampler
+        with self._stream_lock:
+            if not self.running:
+                return
+            self.stream = self.engine.open_input(
+                format=pyaudio.paInt16,
+                channels=capture_channels,
+                rate=capture_rate,
+                input_device_index=info['index'],
+                # 回调周期与按输出采样率计的 frames_per_buffer 一致
+                frames_per_buffer=self.frames_per_buffer * capture_rate // self.rate,
+                stream_callback=self._audio_callback
+            )
+            self.stream.start_stream()
+
+    def _capture_format(self, info):
+        """设备原生采样率和声道数（下混前至多取2声道），显式指定时优先"""
+        rate = self.capture_rate or int(info['defaultSampleRate'])
+        if self.capture_channels:
+            channels = self.capture_channels
+        elif self.channels > 1:
+            channels = self.channels
+        else:
+            channels = max(1, min(int(info['maxInputChannels']), 2))
+        return rate, channels
+
     def stop(self):
         if not self.running:
             return
-        self.running = False
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-            self.stream = None
-        self.audio_queue.put(None)
+        with self._stream_lock:
+            self.running = False
+            if self.stream:
+                self.engine.close_stream(self.stream)
+                self.stream = None
+        try:
+            self.audio_queue.put_nowait(None)
+        except queue.Full:
+            self.audio_queue.get_nowait()
+            self.audio_queue.put_nowait(None)
         if self.thread is not None:
             self.thread.join()
             self.thread = None
 
     def _audio_callback(self, in_data, frame_count, time_info, status):
         if self.running:
-            self.audio_queue.put(in_data)
+            try:
+                self.audio_queue.put_nowait(in_data)
+            except queue.Full:
+                try:
+                    self.audio_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self.dropped_buffers += 1
+                self.audio_queue.put_nowait(in_data)
         return (None, pyaudio.paContinue)
 
     def _consume(self):
-        while self.running:
+        """唯一的采集队列读取者：转换为输出格式后广播到订阅者，直到收到 stop 放入的结束标记"""
+        # 当前采集流是否已送来数据；首帧之前按 DEVICE_FIRST_FRAME_S 等待
+        streaming = False
+        while True:
             try:
-                data = self.audio_queue.get(timeout=0.1)
-                if data is None:
-                    break
-                self.on_audio(data)
+                data = self.audio_queue.get(timeout=DEVICE_STALL_S if streaming else DEVICE_FIRST_FRAME_S)
             except queue.Empty:
+                if self.running:
+                    self._reopen(DEVICE_STALL_S if streaming else DEVICE_FIRST_FRAME_S)
+                    streaming = False
                 continue
+            streaming = True
+            if data is None:
+                break
+            try:
+                if self.resampler is not None:
+                    data = self.resampler.process(data)
+                self._publish(data)
             except Exception as e:
                 print(f"[音频] 处理错误: {e}")
-                continue
+        resampler = self.resampler
+        if resampler is not None:
+            try:
+                self._publish(resampler.flush())
+            except Exception as e:
+                print(f"[音频] 处理错误: {e}")
+        self.hub.close()
+
+    def _reopen(self, waited_s=DEVICE_STALL_S):
+        """设备无数据：关闭旧流，重新枚举设备后按名称重新打开（或改用默认设备），失败时下次超时再试"""
+        with self._stream_lock:
+            if not self.running:
+                return
+            if self.stream is not None:
+                print(f"[音频] 输入设备 {self.device_name} 超过 {waited_s:g}s 无数据，重新打开")
+                self.engine.close_stream(self.stream)
+                self.stream = None
+        try:
+            self.engine.refresh()
+            info = self._device_info()
+            self._open_stream(info)
+        except Exception as e:
+            print(f"[音频] 重新打开输入设备失败: {e}")
+            return
+        if self.stream is not None:
+            self.device_switches += 1
+            print(f"[音频] 已重新打开输入设备 {info['name']}")
+
+    def _publish(self, data):
+        if data:
+            if self.first_frame_ms is None:
+                self.first_frame_ms = (time.perf_counter() - self.started_at) * 1000
+            self.hub.publish(data)
+            self.on_audio(data)
 
     def on_audio(self, data):
         pass
 
+    def subscribe(self, name, max_frames=512, overflow='drop_oldest'):
+        """订阅采集帧，返回 audio_hub.Subscription；应在 start 之前订阅以免漏掉开头的帧"""
+        return self.hub.subscribe(name, max_frames, overflow)
+
     async def audio_stream_generator(self, chunk_ms=200):
         bytes_per_ms = self.rate * self.channels * 2 // 1000
         chunk_bytes = bytes_per_ms * chunk_ms
-        buf = b""
-        loop = asyncio.get_event_loop()
+        # 输出的memoryview在后续约3块音频写入前有效，下游（ASR发送队列）取到后立即复制
+        ring = PcmRingBuffer(chunk_bytes, capacity_chunks=4, sample_width=2 * self.channels)
+        sub = self.hub.subscribe_async('asr', max_frames=512)
         self.start()
         try:
-            while self.running:
-                data = await loop.run_in_executor(None, self.audio_queue.get)
-                if data is None:
+            while True:
+                item = await sub.get()
+                if item is None:
                     break
-                buf += data
-                while len(buf) >= chunk_bytes:
-                    pcm = buf[:chunk_bytes]
+                ring.write(item[1])
+                while (pcm := ring.read_chunk()) is not None:
                     yield pcm, False
-                    buf = buf[chunk_bytes:]
         finally:
+            sub.close()
             self.stop()
-        if buf:
-            yield buf, True
-
-    def __del__(self):
-        if self.stream:
-            self.stream.close()
-        if self.audio:
-            self.audio.terminate() 
\ No newline at end of file
+        tail = ring.read_tail()
+        if tail is not None:
+            yield tail, True
@@ -0,0 +1,189 @@
+# =============================================================
+# 文件名(File): audio_codec.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): ASR上行音频编码模块，PCM编码为Ogg封装的Opus流
+# 修改记录(Changes):
+#   - 新增 OggOpusEncoder：16bit单声道PCM按20ms帧编码为Opus，按块输出Ogg页
+#   - 新增 parse_ogg_pages：解析并校验Ogg页，供本地替身服务器和基准脚本使用
+# =============================================================
+
+import struct
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# opuslib 依赖系统 libopus，为可选依赖；仅在启用 ogg_opus 上行时需要
+try:
+    import opuslib
+except Exception as e:  # 未安装opuslib或找不到libopus时都会抛异常
+    opuslib = None
+    _OPUS_IMPORT_ERROR = e
+else:
+    _OPUS_IMPORT_ERROR = None
+
+OPUS_FRAME_MS = 20
+OPUS_GRANULE_RATE = 48000  # Ogg Opus 的 granule position 固定以48kHz计
+OPUS_DEFAULT_BITRATE = 24000
+OGG_FLAG_BOS = 0x02
+OGG_FLAG_EOS = 0x04
+_OGG_PAGE_HEADER = struct.Struct('<4sBBqIIIB')
+
+def _make_crc_table():
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else (crc << 1)
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+_CRC_TABLE = _make_crc_table()
+
+def ogg_crc32(data) -> int:
+    """Ogg页校验：多项式0x04C11DB7，初值0，不反转"""
+    crc = 0
+    table = _CRC_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ table[((crc >> 24) ^ byte) & 0xFF]
+    return crc
+
+def build_ogg_page(packets, granule: int, serial: int, page_seq: int, flags: int = 0) -> bytes:
+    """将若干完整packet封装为一个Ogg页（packet总lacing段数需不超过255）"""
+    lacing = bytearray()
+    for packet in packets:
+        size = len(packet)
+        lacing.extend(b'\xff' * (size // 255))
+        lacing.append(size % 255)
+    if len(lacing) > 255:
+        raise ValueError("单个Ogg页的lacing段数超过255")
+    header = bytearray(_OGG_PAGE_HEADER.pack(b'OggS', 0, flags, granule, serial, page_seq, 0, len(lacing)))
+    header.extend(lacing)
+    page = header + b''.join(packets)
+    struct.pack_into('<I', page, 22, ogg_crc32(page))
+    return bytes(page)
+
+def parse_ogg_pages(data):
+    """
+    解析Ogg字节流，校验CRC，返回 [(flags, granule, serial, page_seq, [packet, ...]), ...]。
+    跨页的packet会在结束页中合并返回。
+    """
+    pages = []
+    view = memoryview(data)
+    offset = 0
+    pending = b''
+    while offset < len(view):
+        if len(view) - offset < _OGG_PAGE_HEADER.size:
+            raise ValueError("Ogg页头不完整")
+        capture, version, flags, granule, serial, page_seq, crc, n_segments = \
+            _OGG_PAGE_HEADER.unpack_from(view, offset)
+        if capture != b'OggS' or version != 0:
+            raise ValueError(f"非法Ogg页头，偏移 {offset}")
+        lacing = view[offset + _OGG_PAGE_HEADER.size:offset + _OGG_PAGE_HEADER.size + n_segments]
+        body_start = offset + _OGG_PAGE_HEADER.size + n_segments
+        body_end = body_start + sum(lacing)
+        page = bytearray(view[offset:body_end])
+        struct.pack_into('<I', page, 22, 0)
+        if ogg_crc32(page) != crc:
+            raise ValueError(f"Ogg页CRC校验失败，页序号 {page_seq}")
+        packets = []
+        pos = body_start
+        for size in lacing:
+            pending += bytes(view[pos:pos + size])
+            pos += size
+            if size < 255:
+                packets.append(pending)
+                pending = b''
+        pages.append((flags, granule, serial, page_seq, packets))
+        offset = body_end
+    return pages
+
+class OggOpusEncoder:
+    """
+    16bit单声道PCM -> Ogg/Opus 流式编码器。
+    encode_chunk 按块输入PCM，返回本块对应的完整Ogg页（首块附带OpusHead/OpusTags页），
+    不足20ms的尾部样本留到下一块；is_last 时补零编码并输出EOS页。
+    编码器有状态，需顺序调用；在事件循环中请使用 encode，编码在单线程执行器中进行。
+    """
+
+    def __init__(self, sample_rate=16000, bitrate=OPUS_DEFAULT_BITRATE, serial=0x54434154):
+        if opuslib is None:
+            raise RuntimeError(f"Ogg/Opus上行需要opuslib和系统libopus: {_OPUS_IMPORT_ERROR}")
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * OPUS_FRAME_MS // 1000
+        self.frame_bytes = self.frame_samples * 2
+        self._granule_step = OPUS_GRANULE_RATE * OPUS_FRAME_MS // 1000
+        self._encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+        self._encoder.bitrate = bitrate
+        self.pre_skip = self._encoder.lookahead * OPUS_GRANULE_RATE // sample_rate
+        self.serial = serial
+        self._page_seq = 0
+        self._granule = self.pre_skip
+        self._input_samples = 0
+        self._pending = bytearray()
+        self._headers_sent = False
+        self._executor = None
+
+    def _header_pages(self) -> bytes:
+        opus_head = struct.pack('<8sBBHIhB', b'OpusHead', 1, 1, self.pre_skip, self.sample_rate, 0, 0)
+        vendor = b'translate-chat'
+        opus_tags = b'OpusTags' + struct.pack('<I', len(vendor)) + vendor + struct.pack('<I', 0)
+        pages = build_ogg_page([opus_head], 0, self.serial, 0, OGG_FLAG_BOS)
+        pages += build_ogg_page([opus_tags], 0, self.serial, 1)
+        self._page_seq = 2
+        return pages
+
+    def encode_chunk(self, pcm, is_last: bool = False) -> bytes:
+        """同步编码一块PCM，返回Ogg页字节"""
+        out = bytearray()
+        if not self._headers_sent:
+            out += self._header_pages()
+            self._headers_sent = True
+        self._pending += pcm
+        self._input_samples += len(pcm) // 2
+        if is_last and (len(self._pending) % self.frame_bytes or not self._pending):
+            # 尾部补零到整帧，保证EOS页至少携带一个packet
+            pad = self.frame_bytes - len(self._pending) % self.frame_bytes
+            self._pending += b'\x00' * pad
+        n_frames = len(self._pending) // self.frame_bytes
+        packets = []
+        view = memoryview(self._pending)
+        for i in range(n_frames):
+            frame = bytes(view[i * self.frame_bytes:(i + 1) * self.frame_bytes])
+            packets.append(self._encoder.encode(frame, self.frame_samples))
+        view.release()
+        del self._pending[:n_frames * self.frame_bytes]
+        # 每页最多255个lacing段，按需拆页
+        page_packets = []
+        lacing = 0
+        for packet in packets:
+            need = len(packet) // 255 + 1
+            if page_packets and lacing + need > 255:
+                out += self._flush_page(page_packets, False)
+                page_packets, lacing = [], 0
+            page_packets.append(packet)
+            lacing += need
+        if page_packets:
+            out += self._flush_page(page_packets, is_last)
+        return bytes(out)
+
+    def _flush_page(self, packets, eos: bool) -> bytes:
+        self._granule += self._granule_step * len(packets)
+        if eos:
+            # EOS页的granule只计真实样本，解码端据此裁掉补零
+            self._granule = self.pre_skip + self._input_samples * OPUS_GRANULE_RATE // self.sample_rate
+        page = build_ogg_page(packets, self._granule, self.serial, self._page_seq, OGG_FLAG_EOS if eos else 0)
+        self._page_seq += 1
+        return page
+
+    async def encode(self, pcm, is_last: bool = False) -> bytes:
+        """在事件循环外编码，避免阻塞收发"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="opus-encoder")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.encode_chunk, bytes(pcm), is_last)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,172 @@
+# =============================================================
+# 文件名(File): audio_engine.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 进程级 PortAudio 引擎 - 只初始化一次（可在启动时后台进行），缓存设备枚举，毫秒级开关采集流
+# =============================================================
+
+"""
+进程级 PortAudio 引擎
+
+pyaudio.PyAudio() 会初始化 PortAudio 并枚举所有 host API 和设备，在使用 PulseAudio/JACK 的
+Linux 上需要数百毫秒。AudioEngine 在进程内只创建一个 PyAudio 实例：
+    - start_background: 应用启动时在后台线程初始化，Mic ON 时通常已经就绪
+    - 设备列表和默认输入设备在初始化时缓存，打开采集流时不再查询
+    - open_input / close_stream 只打开关闭流，不重新初始化 PortAudio
+    - refresh: 设备插拔后重新初始化 PortAudio 以重新枚举设备（PortAudio 只在初始化时枚举），
+      仅在没有打开的流时进行
+
+设备在重新枚举后序号可能变化，因此按设备名称重新查找（find_input_device）。
+"""
+
+import time
+import atexit
+import threading
+import logging
+
+import pyaudio
+
+logger = logging.getLogger(__name__)
+
+class AudioEngine:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._started = False
+        self._pa = None
+        self._error = None
+        self._devices = []
+        self._default_input = None
+        self._open_streams = set()
+        self.init_ms = None       # 最近一次初始化 PortAudio + 枚举设备的耗时
+        self.generation = 0       # 每次重新初始化加一，设备序号只在同一 generation 内有效
+
+    def start_background(self):
+        """在后台线程初始化 PortAudio（重复调用无效）"""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        threading.Thread(target=self._initialize, name='audio-engine-init', daemon=True).start()
+
+    def _initialize(self):
+        start = time.perf_counter()
+        pa = None
+        try:
+            pa = pyaudio.PyAudio()
+            devices = [pa.get_device_info_by_index(index) for index in range(pa.get_device_count())]
+            try:
+                default_input = pa.get_default_input_device_info()
+            except (IOError, OSError):
+                default_input = None
+        except Exception as e:
+            if pa is not None:
+                pa.terminate()
+            self._error = e
+            logger.error(f"PortAudio 初始化失败: {e}")
+        else:
+            with self._lock:
+                self._pa = pa
+                self._devices = devices
+                self._default_input = default_input
+                self._error = None
+                self.generation += 1
+            self.init_ms = (time.perf_counter() - start) * 1000
+            logger.info(f"PortAudio 初始化 {self.init_ms:.0f}ms，{len(devices)} 个设备")
+        finally:
+            self._ready.set()
+
+    def wait_ready(self, timeout=None) -> pyaudio.PyAudio:
+        """等待初始化完成并返回 PyAudio 实例；未启动时在当前线程等待后台初始化"""
+        self.start_background()
+        if not self._ready.wait(timeout):
+            raise TimeoutError("PortAudio 初始化超时")
+        if self._pa is None:
+            raise RuntimeError(f"PortAudio 不可用: {self._error}")
+        return self._pa
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set() and self._pa is not None
+
+    def input_devices(self) -> list:
+        """缓存的输入设备信息（maxInputChannels > 0）"""
+        self.wait_ready()
+        return [info for info in self._devices if int(info['maxInputChannels']) > 0]
+
+    def device_info(self, index) -> dict:
+        self.wait_ready()
+        for info in self._devices:
+            if info['index'] == index:
+                return info
+        raise ValueError(f"没有序号为 {index} 的音频设备")
+
+    def default_input_info(self) -> dict:
+        self.wait_ready()
+        if self._default_input is None:
+            raise IOError("没有可用的默认输入设备")
+        return self._default_input
+
+    def find_input_device(self, name):
+        """按名称查找输入设备，找不到返回 None"""
+        for info in self.input_devices():
+            if info['name'] == name:
+                return info
+        return None
+
+    def open_input(self, **kwargs):
+        """打开输入流（参数同 PyAudio.open，input=True），返回 pyaudio.Stream"""
+        pa = self.wait_ready()
+        with self._lock:
+            stream = pa.open(input=True, **kwargs)
+            self._open_streams.add(stream)
+        return stream
+
+    def close_stream(self, stream):
+        """停止并关闭流；设备已拔出时停止可能报错，仍视为已关闭"""
+        with self._lock:
+            self._open_streams.discard(stream)
+        try:
+            stream.stop_stream()
+        except Exception:
+            pass
+        try:
+            stream.close()
+        except Exception as e:
+            logger.debug(f"关闭音频流: {e}")
+
+    def refresh(self) -> bool:
+        """重新初始化 PortAudio 以重新枚举设备；有打开的流时不进行，返回是否已刷新"""
+        self.wait_ready()
+        with self._lock:
+            if self._open_streams:
+                return False
+            self._ready.clear()
+            self._pa.terminate()
+            self._pa = None
+            self._initialize()
+        return self.ready
+
+    def terminate(self):
+        """进程退出时释放 PortAudio"""
+        with self._lock:
+            for stream in list(self._open_streams):
+                self.close_stream(stream)
+            if self._pa is not None:
+                self._pa.terminate()
+                self._pa = None
+            self._started = False
+            self._ready.clear()
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_audio_engine() -> AudioEngine:
+    """进程内唯一的 AudioEngine"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AudioEngine()
+            atexit.register(_engine.terminate)
+        return _engine
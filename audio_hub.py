@@ -0,0 +1,189 @@
+# =============================================================
+# 文件名(File): audio_hub.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 单读者音频采集中心 - 采集帧以只读memoryview零拷贝广播给多个订阅者
+# =============================================================
+
+"""
+单读者音频采集中心
+
+采集回调的数据只由一个读取线程取出，调用 AudioHub.publish 广播给所有订阅者
+（ASR上行、VAD、录音、电平表……）。每帧只包装一次为只读 memoryview，各订阅者持有
+同一块内存的引用，不复制数据。
+
+每个订阅者有独立的有界游标（队列），满时按各自的溢出策略处理：
+    drop_oldest: 丢弃最旧的帧（实时消费者，如ASR上行、电平表）
+    drop_newest: 丢弃新到的帧（保留已排队的连续音频）
+    close:       关闭该订阅并标记 overflowed（录音等不允许静默丢帧的消费者）
+每帧带递增序号，消费者可据此检测丢帧。
+
+线程消费者使用 subscribe / Subscription.get；asyncio 消费者使用 subscribe_async /
+AsyncSubscription.get，帧到达时经 loop.call_soon_threadsafe 唤醒事件循环，
+不占用线程池线程，取消时也不会留下阻塞的线程。
+"""
+
+import asyncio
+import threading
+import collections
+import logging
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ('drop_oldest', 'drop_newest', 'close')
+
+class Subscription:
+    """一个订阅者的有界游标"""
+
+    def __init__(self, hub, name, max_frames=256, overflow='drop_oldest'):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"不支持的溢出策略: {overflow}，可选 {', '.join(OVERFLOW_POLICIES)}")
+        self.hub = hub
+        self.name = name
+        self.max_frames = max_frames
+        self.overflow = overflow
+        self._frames = collections.deque()
+        self._cond = threading.Condition()
+        self.closed = False
+        self.overflowed = False
+        self.delivered = 0
+        self.dropped = 0
+
+    def _push(self, seq, view):
+        with self._cond:
+            if self.closed:
+                return
+            if len(self._frames) >= self.max_frames:
+                self.dropped += 1
+                if self.overflow == 'drop_newest':
+                    return
+                if self.overflow == 'close':
+                    self.overflowed = True
+                    self.closed = True
+                    self._notify()
+                    logger.warning(f"订阅者 {self.name} 积压超过 {self.max_frames} 帧，已关闭")
+                    return
+                self._frames.popleft()
+            self._frames.append((seq, view))
+            self._notify()
+
+    def _close(self):
+        with self._cond:
+            self.closed = True
+            self._notify()
+
+    def _notify(self):
+        """唤醒等待的消费者，调用时已持有 _cond"""
+        self._cond.notify_all()
+
+    def get(self, timeout=None):
+        """
+        取下一帧，返回 (seq, 只读memoryview)。
+        订阅已关闭且队列为空时返回 None；超时返回 None 且订阅仍未关闭。
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._frames or self.closed, timeout)
+            if self._frames:
+                self.delivered += 1
+                return self._frames.popleft()
+            return None
+
+    @property
+    def pending(self) -> int:
+        return len(self._frames)
+
+    def close(self):
+        """取消订阅"""
+        self.hub.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class AsyncSubscription(Subscription):
+    """
+    asyncio 订阅者：溢出策略与 Subscription 相同，帧到达时通过 call_soon_threadsafe 唤醒事件循环。
+    消费者落后时多帧只触发一次唤醒。需在事件循环线程中创建和读取。
+    """
+
+    def __init__(self, hub, name, max_frames=256, overflow='drop_oldest'):
+        super().__init__(hub, name, max_frames, overflow)
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._wake_pending = False
+
+    def _notify(self):
+        if self._wake_pending:
+            return
+        self._wake_pending = True
+        try:
+            self._loop.call_soon_threadsafe(self._wake)
+        except RuntimeError:
+            # 事件循环已关闭，消费者不会再读取
+            pass
+
+    def _wake(self):
+        with self._cond:
+            self._wake_pending = False
+        self._wakeup.set()
+
+    async def get(self):
+        """取下一帧，返回 (seq, 只读memoryview)；订阅已关闭且队列为空时返回 None"""
+        while True:
+            with self._cond:
+                if self._frames:
+                    self.delivered += 1
+                    return self._frames.popleft()
+                if self.closed:
+                    return None
+                self._wakeup.clear()
+            await self._wakeup.wait()
+
+class AudioHub:
+    """音频帧广播中心，publish 应只由唯一的采集读取线程调用"""
+
+    def __init__(self):
+        self._subscribers = ()
+        self._lock = threading.Lock()
+        self.seq = 0
+
+    def subscribe(self, name, max_frames=256, overflow='drop_oldest') -> Subscription:
+        sub = Subscription(self, name, max_frames, overflow)
+        with self._lock:
+            # 写时复制，publish 遍历时无需加锁
+            self._subscribers = self._subscribers + (sub,)
+        return sub
+
+    def subscribe_async(self, name, max_frames=256, overflow='drop_oldest') -> AsyncSubscription:
+        """在事件循环中订阅，返回可 await get() 的 AsyncSubscription"""
+        sub = AsyncSubscription(self, name, max_frames, overflow)
+        with self._lock:
+            self._subscribers = self._subscribers + (sub,)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s is not sub)
+        sub._close()
+
+    @property
+    def subscribers(self) -> tuple:
+        return self._subscribers
+
+    def publish(self, data):
+        """广播一帧：包装为只读memoryview后分发给所有订阅者，返回帧序号"""
+        self.seq += 1
+        view = memoryview(data).toreadonly()
+        for sub in self._subscribers:
+            sub._push(self.seq, view)
+        return self.seq
+
+    def close(self):
+        """关闭所有订阅，消费者取完剩余帧后收到 None"""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, ()
+        for sub in subscribers:
+            sub._close()
@@ -0,0 +1,281 @@
+# =============================================================
+# 文件名(File): batch_transcribe.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 录音批量转写翻译命令行工具 - 多会话并发、快于实时上行，输出JSONL/SRT，支持断点续跑
+# =============================================================
+
+"""
+录音批量转写翻译（无界面）
+
+对目录中的录音（.wav / .pcm / .raw，原始PCM按16kHz单声道读取）并发运行多个
+VolcanoASRClientAsync 会话，固化分句经共享的 Translator 翻译（全局并发上限），
+每个录音输出到同名的 .jsonl（每行一个分句）和 .srt 字幕文件：
+    - 会话数受 --jobs 限制，较长的录音先开始，避免最后只剩一个长录音在跑
+    - 音频按 --speed 倍速上行，缺省不限速，由发送队列背压和服务端处理速度决定；
+      服务端限制上行速率时可设为 1~N
+    - 输出先写临时文件再改名，已有完整输出的录音在重新运行时跳过（断点续跑），失败的录音下次重跑
+    - 结束时打印吞吐报告（每墙钟小时处理的音频小时数），并写入输出目录的 batch_report.json
+
+用法:
+    python3 batch_transcribe.py 会议录音/ -o 转写结果/ --jobs 4 --profile batch --translate
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+
+from asr_client import VolcanoASRClientAsync, UtteranceFinalized, SessionEnded, ASR_PROFILES
+from audio_capture_file import FileAudioStream
+from lang_detect import LangDetect
+from translator import Translator, TRANSLATION_FAILURES
+from translation_cache import cached_translator
+
+logger = logging.getLogger("batch_transcribe")
+
+AUDIO_SUFFIXES = ('.wav', '.pcm', '.raw')
+OUTPUT_FORMATS = ('jsonl', 'srt')
+REPORT_NAME = 'batch_report.json'
+
+def find_audio_files(inputs) -> list:
+    """展开输入的文件和目录，返回 [(录音路径, 相对路径)]"""
+    files = []
+    for item in map(Path, inputs):
+        if item.is_dir():
+            files.extend((path, path.relative_to(item)) for path in sorted(item.rglob('*'))
+                         if path.is_file() and path.suffix.lower() in AUDIO_SUFFIXES)
+        elif item.is_file():
+            files.append((item, Path(item.name)))
+        else:
+            raise FileNotFoundError(f"找不到录音: {item}")
+    return files
+
+def srt_time(ms) -> str:
+    ms = int(round(ms))
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+def format_srt(records) -> str:
+    blocks = []
+    for number, record in enumerate(records, 1):
+        lines = [str(number), f"{srt_time(record['start_ms'])} --> {srt_time(record['end_ms'])}", record['text']]
+        if record.get('translation'):
+            lines.append(record['translation'])
+        blocks.append("\n".join(lines))
+    return "\n\n".join(blocks) + "\n" if blocks else ""
+
+def format_jsonl(records) -> str:
+    return "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+
+def write_atomic(path: Path, text: str):
+    """先写临时文件再改名，中断时不会留下不完整的输出"""
+    tmp = path.with_name(path.name + '.part')
+    tmp.write_text(text, encoding='utf-8')
+    os.replace(tmp, path)
+
+class BatchTranscriber:
+    """
+    批量转写调度器。
+
+    output_dir: 输出目录，按录音相对路径建立子目录
+    jobs: 同时运行的ASR会话数
+    speed: 上行倍速，0 为不限速
+    profile / ws_url: ASR延迟档位和服务地址，缺省取配置
+    translate: 是否翻译固化分句；target 为 'auto' 时中文译为英文、其他译为中文
+    translate_jobs: 所有录音共享的翻译并发上限
+    """
+
+    def __init__(self, output_dir, jobs=4, speed=0, profile=None, ws_url=None, translate=False,
+                 target='auto', translate_jobs=8, translator=None, formats=OUTPUT_FORMATS, force=False):
+        self.output_dir = Path(output_dir)
+        self.jobs = jobs
+        self.speed = speed
+        self.profile = profile
+        self.ws_url = ws_url
+        self.translate = translate
+        self.target = target
+        self.translator = translator or (Translator() if translate else None)
+        self.translate_jobs = translate_jobs
+        self.formats = tuple(formats)
+        self.force = force
+        self.lang_detect = LangDetect()
+        self._session_slots = None
+        self._translate_slots = None
+
+    def output_paths(self, rel: Path) -> dict:
+        base = self.output_dir / rel.parent / rel.stem
+        return {fmt: base.with_name(f"{base.name}.{fmt}") for fmt in self.formats}
+
+    def is_done(self, rel: Path) -> bool:
+        return not self.force and all(path.exists() for path in self.output_paths(rel).values())
+
+    async def run(self, files) -> dict:
+        self._session_slots = asyncio.Semaphore(self.jobs)
+        self._translate_slots = asyncio.Semaphore(self.translate_jobs)
+        pending = [(path, rel) for path, rel in files if not self.is_done(rel)]
+        skipped = [str(rel) for path, rel in files if self.is_done(rel)]
+        # 长录音先开始
+        pending.sort(key=lambda item: item[0].stat().st_size, reverse=True)
+        started = time.perf_counter()
+        try:
+            if self.translator is not None and pending:
+                await self.translator.warm_up()
+            results = await asyncio.gather(*(self._run_file(path, rel, index, len(pending))
+                                             for index, (path, rel) in enumerate(pending, 1)))
+        finally:
+            if self.translator is not None:
+                # 连接池绑定本次运行的事件循环
+                await self.translator.close()
+        wall_s = time.perf_counter() - started
+        done = [result for result in results if result['status'] == 'done']
+        audio_s = sum(result['audio_s'] for result in done)
+        report = {
+            'files': len(files),
+            'done': len(done),
+            'failed': len(results) - len(done),
+            'skipped': skipped,
+            'audio_hours': audio_s / 3600,
+            'wall_hours': wall_s / 3600,
+            'audio_hours_per_wall_hour': audio_s / wall_s if wall_s else 0.0,
+            'utterances': sum(result['utterances'] for result in done),
+            'translation_failures': sum(result['translation_failures'] for result in done),
+            'jobs': self.jobs,
+            'speed': self.speed,
+            'results': results,
+        }
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.output_dir / REPORT_NAME, json.dumps(report, ensure_ascii=False, indent=2))
+        return report
+
+    async def _run_file(self, path: Path, rel: Path, index: int, total: int) -> dict:
+        async with self._session_slots:
+            result = {'file': str(rel), 'status': 'failed', 'audio_s': 0.0, 'elapsed_s': 0.0,
+                      'utterances': 0, 'translation_failures': 0}
+            started = time.perf_counter()
+            try:
+                records = await self._transcribe(path, result)
+                result['elapsed_s'] = time.perf_counter() - started
+                self._write_outputs(rel, records)
+                result['status'] = 'done'
+                speedup = result['audio_s'] / result['elapsed_s'] if result['elapsed_s'] else 0.0
+                logger.info(f"[{index}/{total}] {rel}: 音频 {result['audio_s']:.0f}s，耗时 {result['elapsed_s']:.1f}s"
+                            f"（{speedup:.1f}x实时），{result['utterances']} 句")
+            except Exception as e:
+                result['elapsed_s'] = time.perf_counter() - started
+                result['error'] = str(e)
+                logger.error(f"[{index}/{total}] {rel} 处理失败，下次运行时重试: {e}")
+            return result
+
+    async def _transcribe(self, path: Path, result: dict) -> list:
+        source = FileAudioStream(path, speed=self.speed)
+        result['audio_s'] = source.duration_ms / 1000
+        # 文件时间轴：不用VAD门控（分句时间即文件时间）；不限速送入时必须背压，drop 策略会丢音频
+        client = VolcanoASRClientAsync(ws_url=self.ws_url, profile=self.profile, vad=False, send_policy='coalesce')
+        records = []
+        translations = []
+        outcome = {'reason': None}
+
+        async def consume(events):
+            async for event in events:
+                if isinstance(event, UtteranceFinalized):
+                    utt = event.utterance
+                    text = (utt.get('text') or '').strip()
+                    if not text:
+                        continue
+                    record = {'start_ms': utt.get('start_time', 0), 'end_ms': utt.get('end_time', 0), 'text': text}
+                    records.append(record)
+                    if self.translate:
+                        translations.append(asyncio.create_task(self._translate(record)))
+                elif isinstance(event, SessionEnded):
+                    outcome['reason'] = event.reason
+
+        events_task = asyncio.create_task(consume(client.events()))
+        try:
+            async with client as asr:
+                await asr.run(source.audio_stream_generator())
+            await events_task
+        finally:
+            events_task.cancel()
+            if outcome['reason'] != 'last':
+                for task in translations:
+                    task.cancel()
+            # 已取消或出错的翻译记为失败，不让 CancelledError 越过 _run_file 中止整批
+            await asyncio.gather(events_task, return_exceptions=True)
+            results = await asyncio.gather(*translations, return_exceptions=True)
+            result['translation_failures'] = sum(1 for ok in results if ok is not True)
+        if outcome['reason'] != 'last':
+            raise RuntimeError(f"ASR会话异常结束: {outcome['reason']}")
+        result['utterances'] = len(records)
+        return records
+
+    async def _translate(self, record) -> bool:
+        """翻译一个分句，结果写入 record；翻译失败时返回 False"""
+        text = record['text']
+        src_lang = self.lang_detect.detect(text)
+        tgt_lang = self.target
+        if tgt_lang == 'auto':
+            tgt_lang = 'en' if src_lang.startswith('zh') else 'zh'
+        async with self._translate_slots:
+            translated = await self.translator.translate(text, src_lang=src_lang, tgt_lang=tgt_lang)
+        record['corrected'] = translated.get('corrected', '')
+        record['translation'] = translated.get('translation', '')
+        return record['corrected'] not in TRANSLATION_FAILURES
+
+    def _write_outputs(self, rel: Path, records):
+        records = [{'index': index, **record}
+                   for index, record in enumerate(sorted(records, key=lambda record: record['start_ms']))]
+        writers = {'jsonl': format_jsonl, 'srt': format_srt}
+        for fmt, path in self.output_paths(rel).items():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(path, writers[fmt](records))
+
+def print_report(report):
+    print(f"录音 {report['files']} 个：完成 {report['done']}，失败 {report['failed']}，"
+          f"已有输出跳过 {len(report['skipped'])}")
+    print(f"音频 {report['audio_hours']:.2f} 小时，墙钟 {report['wall_hours'] * 60:.1f} 分钟，"
+          f"吞吐 {report['audio_hours_per_wall_hour']:.1f} 音频小时/墙钟小时"
+          f"（{report['jobs']} 路并发），{report['utterances']} 句")
+    if report['translation_failures']:
+        print(f"翻译失败 {report['translation_failures']} 句（输出中保留原文）")
+
+def main():
+    parser = argparse.ArgumentParser(description="录音批量转写翻译")
+    parser.add_argument('inputs', nargs='+', help="录音文件或目录（.wav / .pcm / .raw）")
+    parser.add_argument('-o', '--output', required=True, help="输出目录")
+    parser.add_argument('-j', '--jobs', type=int, default=4, help="同时运行的ASR会话数")
+    parser.add_argument('--speed', type=float, default=0, help="上行倍速，0 为不限速")
+    parser.add_argument('--profile', choices=list(ASR_PROFILES), default=None, help="ASR延迟档位，缺省取配置")
+    parser.add_argument('--ws-url', default=None, help="ASR服务地址，缺省由延迟档位决定")
+    parser.add_argument('--translate', action='store_true', help="翻译固化分句")
+    parser.add_argument('--target', default='auto', help="目标语言，auto 为中文译英文、其他译中文")
+    parser.add_argument('--translate-jobs', type=int, default=8, help="同时进行的翻译请求数")
+    parser.add_argument('--translate-url', default=None, help="翻译服务地址，缺省取配置")
+    parser.add_argument('--formats', default=','.join(OUTPUT_FORMATS), help="输出格式，逗号分隔：jsonl,srt")
+    parser.add_argument('--force', action='store_true', help="忽略已有输出，全部重新处理")
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    if not args.verbose:
+        logging.getLogger('asr_client').setLevel(logging.WARNING)
+    formats = [fmt.strip() for fmt in args.formats.split(',') if fmt.strip()]
+    unknown = set(formats) - set(OUTPUT_FORMATS)
+    if unknown:
+        parser.error(f"不支持的输出格式: {', '.join(sorted(unknown))}")
+    files = find_audio_files(args.inputs)
+    transcriber = BatchTranscriber(
+        args.output, jobs=args.jobs, speed=args.speed, profile=args.profile, ws_url=args.ws_url,
+        translate=args.translate, target=args.target, translate_jobs=args.translate_jobs,
+        translator=cached_translator(Translator(args.translate_url)) if args.translate else None, formats=formats,
+        force=args.force)
+    report = asyncio.run(transcriber.run(files))
+    print_report(report)
+    sys.exit(1 if report['failed'] else 0)
+
+if __name__ == "__main__":
+    main()
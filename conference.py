@@ -0,0 +1,298 @@
+# =============================================================
+# 文件名(File): conference.py
+# 版本(Version): v1.0.1
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 会议模式 - 多声道/多设备采集，每路一个ASR会话和翻译方向，合并为按时间排序的对话记录
+# 修改记录(Changes):
+#   - 开启VAD门控时分句时间换算回采集时间，各路仍在同一时间轴上；异常结束的一路等待事件任务取消完成
+# =============================================================
+
+"""
+会议模式（双向传译）
+
+一台多声道声卡（每个声道一位发言人）或多个USB麦克风，每一路运行独立的
+VolcanoASRClientAsync 会话和翻译方向（如 zh→en、en→zh），全部在同一个事件循环中：
+    - ChannelSplitter: 从一个多声道音频源读取交错PCM，用 NumPy reshape 拆成各声道的单声道块，
+      不逐样点循环；每个声道提供与 audio_stream_generator 相同的 (pcm, is_last) 异步生成器
+    - 多个设备时每个设备一个单声道 AudioStream，直接使用各自的 audio_stream_generator
+    - ConferenceSession: 每路一个ASR会话，固化分句经共享的 Translator 翻译（并发上限），
+      按分句起始时间插入合并的对话记录，回调给出插入位置，界面可按位置插入
+
+各路音频来自同一次采集（或同时开始的多个设备），分句时间在同一时间轴上。开启VAD门控（ASR_VAD）时
+各路跳过的静音不同，服务端分句时间先经 vad_gate.capture_ms 换算回采集时间再合并。
+
+用法:
+    python3 conference.py --channels 2 --directions zh:en,en:zh
+    python3 conference.py --devices 1,3 --directions zh:en,en:zh
+    python3 conference.py --file 会议.wav --channels 2 --directions zh:en,en:zh --speed 4
+"""
+
+import time
+import bisect
+import asyncio
+import logging
+import argparse
+
+import numpy as np
+
+from asr_client import VolcanoASRClientAsync, UtteranceFinalized, SessionEnded
+
+logger = logging.getLogger(__name__)
+
+# 每个声道待ASR取走的最多块数；最慢的声道会使拆分暂停，其他声道随之等待
+CHANNEL_QUEUE_CHUNKS = 16
+
+def parse_directions(text) -> list:
+    """'zh:en,en:zh' → [('zh', 'en'), ('en', 'zh')]"""
+    directions = []
+    for item in text.split(','):
+        src, _, tgt = item.strip().partition(':')
+        if not src or not tgt:
+            raise ValueError(f"翻译方向格式应为 源语言:目标语言，收到: {item!r}")
+        directions.append((src, tgt))
+    return directions
+
+class ChannelSplitter:
+    """
+    多声道音频源拆分为单声道流。
+
+    source: 输出 channels 声道交错PCM的音频源（AudioStream / FileAudioStream，channels=N）
+    channels: 声道数
+    """
+
+    def __init__(self, source, channels, chunk_ms=200):
+        self.source = source
+        self.channels = channels
+        self.chunk_ms = chunk_ms
+        self._queues = [asyncio.Queue(CHANNEL_QUEUE_CHUNKS) for _ in range(channels)]
+        self._active = [True] * channels
+        self._task = None
+        self.split_ns = 0   # 拆分累计耗时
+
+    def streams(self) -> list:
+        """各声道的 (pcm, is_last) 异步生成器"""
+        return [self._channel_stream(channel) for channel in range(self.channels)]
+
+    async def _split(self):
+        queues = self._queues
+        ended = False
+        try:
+            async for pcm, is_last in self.source.audio_stream_generator(self.chunk_ms):
+                ended = is_last
+                start = time.perf_counter_ns()
+                # (帧数, 声道数) 转置后每行是一个声道，tobytes 按行复制为连续的单声道PCM
+                planar = np.frombuffer(pcm, dtype='<i2').reshape(-1, self.channels).T
+                parts = [planar[channel].tobytes() for channel in range(self.channels)]
+                self.split_ns += time.perf_counter_ns() - start
+                for channel, part in enumerate(parts):
+                    if self._active[channel]:
+                        await queues[channel].put((part, is_last))
+                if not any(self._active):
+                    break
+        except Exception as e:
+            logger.error(f"多声道音频源异常: {e}")
+        finally:
+            if not ended:
+                # 音频源异常结束：通知仍在消费的声道结束，必要时丢弃一块未取走的音频
+                for channel, queue in enumerate(queues):
+                    if self._active[channel]:
+                        if queue.full():
+                            queue.get_nowait()
+                        queue.put_nowait((b"", True))
+
+    async def _channel_stream(self, channel):
+        if self._task is None:
+            self._task = asyncio.create_task(self._split())
+        queue = self._queues[channel]
+        try:
+            while True:
+                pcm, is_last = await queue.get()
+                yield pcm, is_last
+                if is_last:
+                    return
+        finally:
+            self._active[channel] = False
+            # 不再消费的声道：清空队列，避免拆分任务阻塞在该声道上
+            while not queue.empty():
+                queue.get_nowait()
+            if not any(self._active) and not self._task.done():
+                self._task.cancel()
+
+class ConferenceSession:
+    """
+    多路ASR会话与合并对话记录。
+
+    speakers: 每路的显示名称
+    directions: 每路的 (源语言, 目标语言)
+    translator: 共享的 Translator，None 表示不翻译
+    translate_jobs: 所有路共享的翻译并发上限
+    on_entry(entry, position): 新分句插入对话记录第 position 条时调用
+    on_update(entry): 分句译文到达时调用
+    client_factory(channel): 创建该路ASR客户端，缺省使用配置
+    """
+
+    def __init__(self, speakers, directions, translator=None, translate_jobs=4, on_entry=None, on_update=None,
+                 client_factory=None):
+        if len(speakers) != len(directions):
+            raise ValueError("发言人与翻译方向数量不一致")
+        self.speakers = list(speakers)
+        self.directions = list(directions)
+        self.translator = translator
+        self.translate_jobs = translate_jobs
+        self.on_entry = on_entry
+        self.on_update = on_update
+        self.client_factory = client_factory or (lambda channel: VolcanoASRClientAsync())
+        self.transcript = []   # 按 (start_ms, channel) 排序
+        self._keys = []
+        self.clients = []
+        self.outcomes = []
+        self._translate_slots = None
+        self._translations = []
+
+    async def run(self, streams) -> list:
+        """streams 为各路的 (pcm, is_last) 异步生成器，全部结束后返回合并的对话记录"""
+        if len(streams) != len(self.speakers):
+            raise ValueError(f"音频流 {len(streams)} 路，发言人 {len(self.speakers)} 位")
+        self._translate_slots = asyncio.Semaphore(self.translate_jobs)
+        self.clients = [self.client_factory(channel) for channel in range(len(streams))]
+        # 首句固化之前建立翻译连接
+        warm_up = asyncio.create_task(self.translator.warm_up()) if self.translator is not None else None
+        try:
+            self.outcomes = await asyncio.gather(*(self._run_channel(channel, client, stream) for channel, (client, stream)
+                                                   in enumerate(zip(self.clients, streams))))
+            await asyncio.gather(*self._translations)
+        finally:
+            if warm_up is not None:
+                await warm_up
+            if self.translator is not None:
+                # 连接池绑定本次运行的事件循环
+                await self.translator.close()
+        return self.transcript
+
+    async def _run_channel(self, channel, client, stream):
+        outcome = {'reason': None}
+
+        async def consume(events):
+            async for event in events:
+                if isinstance(event, UtteranceFinalized):
+                    self._add(channel, event.utterance, client.vad_gate)
+                elif isinstance(event, SessionEnded):
+                    outcome['reason'] = event.reason
+
+        events_task = asyncio.create_task(consume(client.events()))
+        try:
+            async with client as asr:
+                await asr.run(stream)
+            await events_task
+        except Exception as e:
+            logger.error(f"会议第{channel + 1}路（{self.speakers[channel]}）ASR异常: {e}")
+            events_task.cancel()
+            try:
+                await events_task
+            except asyncio.CancelledError:
+                pass
+            return 'error'
+        finally:
+            # 会话提前结束的一路不再消费音频，其他路继续
+            await stream.aclose()
+        if outcome['reason'] != 'last':
+            logger.error(f"会议第{channel + 1}路（{self.speakers[channel]}）ASR会话结束: {outcome['reason']}")
+        return outcome['reason']
+
+    def _add(self, channel, utt, vad_gate=None):
+        text = (utt.get('text') or '').strip()
+        if not text:
+            return
+        src_lang, tgt_lang = self.directions[channel]
+        # VAD门控时分句时间为该路的上行音频时间，换算回采集时间
+        to_capture = vad_gate.capture_ms if vad_gate is not None else float
+        entry = {
+            'channel': channel,
+            'speaker': self.speakers[channel],
+            'start_ms': to_capture(utt.get('start_time', 0)),
+            'end_ms': to_capture(utt.get('end_time', 0)),
+            'text': text,
+            'src_lang': src_lang,
+            'tgt_lang': tgt_lang,
+            'translation': None,
+            'corrected': None,
+        }
+        key = (entry['start_ms'], channel)
+        position = bisect.bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self.transcript.insert(position, entry)
+        if self.on_entry:
+            self.on_entry(entry, position)
+        if self.translator is not None:
+            self._translations.append(asyncio.create_task(self._translate(entry)))
+
+    async def _translate(self, entry):
+        async with self._translate_slots:
+            result = await self.translator.translate(entry['text'], src_lang=entry['src_lang'],
+                                                     tgt_lang=entry['tgt_lang'])
+        entry['corrected'] = result.get('corrected', '')
+        entry['translation'] = result.get('translation', '')
+        if self.on_update:
+            self.on_update(entry)
+
+def format_entry(entry) -> str:
+    seconds = entry['start_ms'] / 1000
+    line = f"[{int(seconds // 60):02d}:{seconds % 60:04.1f}] {entry['speaker']}: {entry['text']}"
+    if entry.get('translation'):
+        line += f"  →  {entry['translation']}"
+    return line
+
+async def _run_cli(args):
+    directions = parse_directions(args.directions)
+    if args.devices:
+        from audio_capture_pyaudio import AudioStream
+        devices = [int(device) for device in args.devices.split(',')]
+        sources = [AudioStream(input_device_index=device) for device in devices]
+        streams = [source.audio_stream_generator() for source in sources]
+    else:
+        channels = args.channels or len(directions)
+        if args.file:
+            from audio_capture_file import FileAudioStream
+            source = FileAudioStream(args.file, channels=channels, speed=args.speed)
+        else:
+            from audio_capture_pyaudio import AudioStream
+            source = AudioStream(channels=channels)
+        streams = ChannelSplitter(source, channels).streams()
+    if len(directions) == 1:
+        directions = directions * len(streams)
+    speakers = [chr(ord('A') + index) for index in range(len(streams))]
+    translator = None
+    if not args.no_translate:
+        from translator import Translator
+        from translation_cache import cached_translator
+        translator = cached_translator(Translator())
+    session = ConferenceSession(speakers, directions, translator,
+                                on_entry=lambda entry, position: print(format_entry(entry)),
+                                on_update=lambda entry: print("    " + format_entry(entry)))
+    try:
+        transcript = await session.run(streams)
+    except asyncio.CancelledError:
+        transcript = session.transcript
+    print("\n===== 对话记录 =====")
+    for entry in transcript:
+        print(format_entry(entry))
+
+def main():
+    parser = argparse.ArgumentParser(description="会议模式：多路采集，每路一个ASR会话和翻译方向")
+    parser.add_argument('--channels', type=int, default=None, help="多声道声卡的声道数，缺省为翻译方向数")
+    parser.add_argument('--devices', default=None, help="多个输入设备序号，逗号分隔，每个设备一路")
+    parser.add_argument('--file', default=None, help="用多声道录音代替采集")
+    parser.add_argument('--speed', type=float, default=1.0, help="录音回放倍速，0 为不限速")
+    parser.add_argument('--directions', default='zh:en,en:zh', help="各路翻译方向，逗号分隔")
+    parser.add_argument('--no-translate', action='store_true')
+    args = parser.parse_args()
+    logging.getLogger('asr_client').setLevel(logging.WARNING)
+    try:
+        asyncio.run(_run_cli(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    main()
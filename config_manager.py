@@ -83,8 +83,8 @@ class ConfigManager:
         
         # 检查必要的环境变量是否存在
         if all([asr_app_id, asr_access_key, llm_api_key]):
+            config.update(self._get_tuning_config())
             config.update({
-                'ASR_WS_URL': "wss://openspeech.bytedance.com/api/v3/sauc/bigmodel",
                 'ASR_APP_ID': asr_app_id or "8388344882",  # 使用默认值或环境变量
                 'ASR_ACCESS_KEY': asr_access_key,
                 'ASR_SAMPLE_RATE': 16000,
@@ -109,8 +109,8 @@ class ConfigManager:
             required_keys = ['ASR_APP_ID', 'ASR_ACCESS_KEY', 'LLM_API_KEY']
             if all(config.get(key) for key in required_keys):
                 # 补充默认配置项
+                config.update(self._get_tuning_config(config))
                 config.update({
-                    'ASR_WS_URL': "wss://openspeech.bytedance.com/api/v3/sauc/bigmodel_async",
                     'ASR_APP_ID': config.get('ASR_APP_ID', "8388344882"),
                     'ASR_SAMPLE_RATE': 16000,
                     'LLM_BASE_URL': "https://ark.cn-beijing.volces.com/api/v3",
@@ -123,10 +123,68 @@ class ConfigManager:
         
         return None
     
+    def _get_tuning_config(self, stored: Optional[dict] = None) -> dict:
+        """获取性能调优项，优先级：加密存储 > 环境变量 > 默认值"""
+        stored = stored or {}
+        defaults = {
+            # 音频payload压缩：none / fast / gzip
+            'ASR_AUDIO_COMPRESSION': 'gzip',
+            # 上行音频格式：pcm / ogg_opus（需要opuslib和系统libopus）
+            'ASR_AUDIO_FORMAT': 'pcm',
+            # 会话中断线重连时可重放的音频时长(秒)
+            'ASR_REPLAY_SECONDS': 30,
+            # 发送队列策略：coalesce（积压时背压并合并成大帧）/ drop（超出上限时丢弃积压追实时边沿）
+            'ASR_SEND_POLICY': 'coalesce',
+            # 发送队列上限（毫秒音频）
+            'ASR_MAX_LAG_MS': 2000,
+            # ASR延迟档位：low_latency / balanced / high_accuracy / batch，决定服务地址、请求参数和帧时长
+            'ASR_PROFILE': 'balanced',
+            # 可选：显式指定ASR服务地址，留空时由延迟档位决定
+            'ASR_WS_URL': '',
+            # 客户端VAD门控：只上行有声段；预卷时长、静音期间保活帧间隔、静音多久后关闭连接（0为不关闭），单位毫秒
+            'ASR_VAD': False,
+            'ASR_VAD_PRE_ROLL_MS': 300,
+            'ASR_VAD_KEEPALIVE_MS': 2000,
+            'ASR_VAD_IDLE_CLOSE_MS': 0,
+            # ASR预热连接：首次 Mic ON 之后保持一条待命连接；待命多久换新(秒，须小于服务端等包超时)、空闲多久后停止(秒，0为不停止)
+            'ASR_STANDBY': False,
+            'ASR_STANDBY_TTL_S': 8,
+            'ASR_STANDBY_IDLE_S': 300,
+            # 音频源：设置录音文件路径（WAV或16kHz单声道原始PCM）时回放文件代替麦克风；回放倍速，0为不限速
+            'AUDIO_REPLAY_FILE': '',
+            'AUDIO_REPLAY_SPEED': 1.0,
+            # 会话录音：开启时每次 Mic ON 的采集音频写入 RECORD_DIR 下的 .tcrec 容器（带分句索引）
+            'RECORD_AUDIO': False,
+            'RECORD_DIR': 'recordings',
+            # 翻译连接池：每主机最多保持的连接数、空闲连接保持时长(秒)、DNS缓存时长(秒)
+            'TRANSLATE_MAX_CONNECTIONS': 8,
+            'TRANSLATE_KEEPALIVE_S': 60,
+            'TRANSLATE_DNS_CACHE_S': 300,
+            # 翻译缓存：内存LRU条数；SQLite文件（留空只用内存）、有效期(天)、最多条数
+            'TRANSLATE_CACHE': True,
+            'TRANSLATE_CACHE_MEMORY': 2048,
+            'TRANSLATE_CACHE_DB': 'translation_cache.db',
+            'TRANSLATE_CACHE_TTL_DAYS': 30,
+            'TRANSLATE_CACHE_MAX_ROWS': 100000,
+            # 流式翻译：译文随生成显示；界面更新最小间隔(毫秒)
+            'TRANSLATE_STREAM': True,
+            'TRANSLATE_STREAM_UPDATE_MS': 100,
+            # 批量翻译：每批最多条数（1为逐句）、第一条之后的凑批等待时间(毫秒，0为只取已排队的)
+            'TRANSLATE_BATCH_MAX': 8,
+            'TRANSLATE_BATCH_WINDOW_MS': 0,
+            # 翻译工作池：同时进行的翻译任务数、是否按分句顺序更新译文
+            'TRANSLATE_WORKERS': 4,
+            'TRANSLATE_IN_ORDER': True,
+        }
+        return {
+            key: stored.get(key, os.environ.get(key, default))
+            for key, default in defaults.items()
+        }
+
     def _get_default_config(self) -> dict:
         """获取默认配置（仅用于开发测试）"""
         return {
-            'ASR_WS_URL': "wss://openspeech.bytedance.com/api/v3/sauc/bigmodel_async",
+            **self._get_tuning_config(),
             'ASR_APP_ID': "8388344882",  # 请通过环境变量或加密存储设置
             'ASR_ACCESS_KEY': "",  # 请通过环境变量或加密存储设置
             'ASR_SAMPLE_RATE': 16000,
@@ -136,6 +194,24 @@ class ConfigManager:
             'TRANSLATE_API_URL': "https://ark.cn-beijing.volces.com/api/v3/chat/completions"
         }
     
+    def get_data_path(self, path: str) -> str:
+        """
+        把相对路径解析到应用数据目录：与加密存储相同，优先 Kivy 用户数据目录，
+        独立运行时为 ~/.translate_chat；绝对路径原样返回
+        """
+        path = os.path.expanduser(path)
+        if os.path.isabs(path):
+            return path
+        data_dir = os.path.expanduser("~/.translate_chat")
+        try:
+            from kivy.app import App
+            app = App.get_running_app()
+            if app:
+                data_dir = app.user_data_dir
+        except Exception:
+            pass
+        return os.path.join(data_dir, path)
+
     def get(self, key: str, default=None):
         """获取配置项"""
         return self.config.get(key, default)
@@ -0,0 +1,419 @@
+# =============================================================
+# 文件名(File): mock_asr_server.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 本地火山ASR替身服务器，离线测试与延迟基准用
+# 修改记录(Changes):
+#   - 新增 MockASRServer：与火山ASR相同的二进制协议（协议头位域、序列号、gzip payload）
+#   - 支持可配置的中间结果节奏、注入延迟、错误码、处理速度上限与中途断连
+#   - 按服务地址和请求参数模拟延迟档位：bigmodel 每包返回、bigmodel_nostream 只返回整句，
+#     end_window_size 判停窗口、enable_nonstream 二遍识别耗时
+#   - 新增 speech_threshold 能量分句模式：按音频能量切分语音段，静音达到判停窗口后固化，用于VAD门控基准
+# =============================================================
+
+"""
+本地火山ASR替身服务器
+
+协议与 asr_client 一致：客户端发送完整客户端请求后持续发送音频帧，服务端按音频时间
+推进返回 SERVER_FULL_RESPONSE（utterances 带 definite 标志），最后一包返回负序列号；
+错误通过 SERVER_ERROR_RESPONSE 返回错误码后关闭连接。所有行为按收到的音频时长驱动，
+与墙钟无关，便于确定性地复现线上故障。
+
+用法:
+    python3 mock_asr_server.py --port 8765 --error-code 55000031 --error-after-ms 5000
+    # 客户端: VolcanoASRClientAsync(ws_url="ws://127.0.0.1:8765/api/v3/sauc/bigmodel")
+"""
+
+import gzip
+import json
+import time
+import struct
+import asyncio
+import logging
+import argparse
+
+import numpy as np
+from aiohttp import web, WSMsgType
+
+from asr_client import (
+    ProtocolVersion, MessageType, MessageTypeSpecificFlags, SerializationType, CompressionType,
+    get_asr_error_reason,
+)
+from audio_codec import parse_ogg_pages, OPUS_GRANULE_RATE
+
+logger = logging.getLogger(__name__)
+
+MOCK_WORDS = "今天 我们 讨论 一下 季度 预算 好的 下一页 Thank you next slide please 没问题 谢谢".split()
+
+def build_server_response(seq: int, body, is_last: bool = False) -> bytes:
+    """构造 SERVER_FULL_RESPONSE 帧"""
+    flags = MessageTypeSpecificFlags.NEG_WITH_SEQUENCE if is_last else MessageTypeSpecificFlags.POS_SEQUENCE
+    header = bytes([
+        (ProtocolVersion.V1 << 4) | 1,
+        (MessageType.SERVER_FULL_RESPONSE << 4) | flags,
+        (SerializationType.JSON << 4) | CompressionType.GZIP,
+        0,
+    ])
+    payload = gzip.compress(json.dumps(body, ensure_ascii=False).encode('utf-8'))
+    return header + struct.pack('>iI', -seq if is_last else seq, len(payload)) + payload
+
+def build_error_response(code: int, message: str = None) -> bytes:
+    """构造 SERVER_ERROR_RESPONSE 帧"""
+    header = bytes([
+        (ProtocolVersion.V1 << 4) | 1,
+        (MessageType.SERVER_ERROR_RESPONSE << 4) | MessageTypeSpecificFlags.NO_SEQUENCE,
+        (SerializationType.JSON << 4) | CompressionType.GZIP,
+        0,
+    ])
+    body = {"error": message or get_asr_error_reason(code)}
+    payload = gzip.compress(json.dumps(body, ensure_ascii=False).encode('utf-8'))
+    return header + struct.pack('>iI', code, len(payload)) + payload
+
+def parse_client_frame(data):
+    """解析客户端帧，返回 (message_type, flags, seq, payload)，payload已解压"""
+    header_size = (data[0] & 0x0f) * 4
+    message_type = data[1] >> 4
+    flags = data[1] & 0x0f
+    compression = data[2] & 0x0f
+    seq, size = struct.unpack_from('>iI', data, header_size)
+    payload = data[header_size + 8:header_size + 8 + size]
+    if compression == CompressionType.GZIP:
+        payload = gzip.decompress(payload)
+    return message_type, flags, seq, payload
+
+class MockSession:
+    """单个WebSocket会话的状态与统计"""
+
+    def __init__(self, keep_audio=False):
+        self.request = None
+        self.audio_format = 'pcm'
+        self.sample_rate = 16000
+        self.audio = bytearray() if keep_audio else None
+        self.audio_bytes = 0
+        self.audio_ms = 0
+        self.frames = 0
+        self.last_seq = 0
+        self.responses = 0
+        self.connected_at = time.monotonic()
+        self.first_audio_at = None
+        self.end_reason = None
+        self.ogg_pre_skip = 0
+
+    def add_audio(self, payload):
+        self.frames += 1
+        self.audio_bytes += len(payload)
+        if self.first_audio_at is None:
+            self.first_audio_at = time.monotonic()
+        if self.audio is not None:
+            self.audio += payload
+        if self.audio_format == 'ogg':
+            for _, granule, _, _, packets in parse_ogg_pages(payload):
+                if packets and packets[0].startswith(b'OpusHead'):
+                    self.ogg_pre_skip = struct.unpack_from('<H', packets[0], 10)[0]
+                elif granule > 0:
+                    self.audio_ms = (granule - self.ogg_pre_skip) * 1000 // OPUS_GRANULE_RATE
+        else:
+            self.audio_ms = self.audio_bytes * 1000 // (self.sample_rate * 2)
+
+class EnergySegmenter:
+    """按10ms帧能量切分语音段：语音段结束后收到 end_window 毫秒静音时固化，模拟服务端判停"""
+
+    FRAME_MS = 10
+
+    def __init__(self, threshold, sample_rate=16000):
+        self.threshold = threshold
+        self.frame_samples = sample_rate * self.FRAME_MS // 1000
+        self._rest = bytearray()
+        self.audio_ms = 0
+        self.start = None     # 当前语音段起点
+        self.voice_end = 0    # 最近一个有声帧的结束时间
+
+    def feed(self, pcm, end_window) -> list:
+        """输入PCM，返回本次固化的语音段 [(start_ms, end_ms)]"""
+        self._rest += pcm
+        frame_bytes = self.frame_samples * 2
+        usable = len(self._rest) - len(self._rest) % frame_bytes
+        samples = np.frombuffer(bytes(self._rest[:usable]), dtype='<i2').astype(np.float32)
+        del self._rest[:usable]
+        loud = np.sqrt((samples.reshape(-1, self.frame_samples) ** 2).mean(axis=1)) > self.threshold
+        finalized = []
+        for is_loud in loud:
+            self.audio_ms += self.FRAME_MS
+            if is_loud:
+                if self.start is None:
+                    self.start = self.audio_ms - self.FRAME_MS
+                self.voice_end = self.audio_ms
+            elif self.start is not None and self.audio_ms - self.voice_end >= end_window:
+                finalized.append((self.start, self.voice_end))
+                self.start = None
+        return finalized
+
+    def partial(self):
+        """未固化的语音段 (start_ms, end_ms)，没有时返回 None"""
+        return (self.start, self.audio_ms) if self.start is not None else None
+
+    def flush(self) -> list:
+        """流结束：固化未结束的语音段"""
+        if self.start is None:
+            return []
+        span, self.start = (self.start, self.voice_end), None
+        return [span]
+
+class MockASRServer:
+    """
+    火山ASR替身服务器。
+
+    partial_interval_ms: 每收到多少毫秒音频返回一次中间结果
+    utterance_ms: 每句话的音频时长，到达后该句以 definite=True 返回
+    segment_utterances: 一个VAD段内累计的句数，消息中携带本段全部utterances
+    response_latency_ms: 每条响应的注入延迟
+    connect_latency_ms: WebSocket握手前的注入延迟
+    max_speed: 服务端处理速度上限（实时倍数），None表示不限速
+    error_code / error_after_ms: 收到指定时长音频后返回错误码并关闭（如45000081、55000031）
+    packet_timeout_ms: 超过该时长未收到音频包时返回45000081（等包超时）
+    disconnect_after_ms: 收到指定时长音频后直接断开TCP连接（不发送关闭帧）
+    fail_sessions: 仅前N个会话注入错误/断连，之后的会话正常（用于重连测试），None表示全部
+    second_pass_ms: 请求开启 enable_nonstream（二遍识别）时，固化结果的额外耗时
+    speech_threshold: 设置时按音频能量（10ms帧RMS超过该值为有声）切分分句，代替按 utterance_ms 定长切分；
+        仅支持PCM上行
+
+    服务地址决定返回节奏：bigmodel 每个音频包返回一次，bigmodel_async 按 partial_interval_ms 返回，
+    bigmodel_nostream 只在分句固化时返回。分句在其结束后再收到 end_window_size（请求参数，缺省800）
+    毫秒音频时固化，对应服务端判停窗口。
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, partial_interval_ms=200, utterance_ms=3000,
+                 segment_utterances=5, response_latency_ms=0, connect_latency_ms=0, max_speed=None,
+                 error_code=None, error_after_ms=0, packet_timeout_ms=None, disconnect_after_ms=None,
+                 fail_sessions=None, keep_audio=False, second_pass_ms=300, speech_threshold=None):
+        self.host = host
+        self.port = port
+        self.partial_interval_ms = partial_interval_ms
+        self.utterance_ms = utterance_ms
+        self.segment_utterances = segment_utterances
+        self.response_latency_ms = response_latency_ms
+        self.connect_latency_ms = connect_latency_ms
+        self.max_speed = max_speed
+        self.error_code = error_code
+        self.error_after_ms = error_after_ms
+        self.packet_timeout_ms = packet_timeout_ms
+        self.disconnect_after_ms = disconnect_after_ms
+        self.fail_sessions = fail_sessions
+        self.keep_audio = keep_audio
+        self.second_pass_ms = second_pass_ms
+        self.speech_threshold = speech_threshold
+        self.sessions = []
+        self._runner = None
+        self._site = None
+
+    @property
+    def url(self) -> str:
+        return self.url_for('bigmodel')
+
+    def url_for(self, endpoint: str) -> str:
+        """指定服务地址名称（bigmodel / bigmodel_async / bigmodel_nostream）的本地URL"""
+        return f"ws://{self.host}:{self.port}/api/v3/sauc/{endpoint}"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        self._site = web.TCPSite(self._runner, self.host, self.port)
+        await self._site.start()
+        self.port = self._site._server.sockets[0].getsockname()[1]
+        logger.info(f"ASR替身服务器已启动: {self.url}")
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    def _inject_failures(self, index: int) -> bool:
+        return self.fail_sessions is None or index < self.fail_sessions
+
+    def _utterance(self, start_ms, end_ms, definite):
+        index = start_ms // self.utterance_ms
+        n_words = max(1, (end_ms - start_ms) // max(self.partial_interval_ms, 1))
+        words = [MOCK_WORDS[(index * 7 + i) % len(MOCK_WORDS)] for i in range(n_words)]
+        return {"text": "".join(words), "start_time": start_ms, "end_time": end_ms, "definite": definite}
+
+    def _result(self, session, segment, partial):
+        utterances = list(segment)
+        if partial:
+            utterances.append(self._utterance(*partial, False))
+        return {
+            "audio_info": {"duration": session.audio_ms},
+            "result": {"text": "".join(u["text"] for u in utterances), "utterances": utterances},
+        }
+
+    async def _handle(self, request):
+        if self.connect_latency_ms:
+            await asyncio.sleep(self.connect_latency_ms / 1000)
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        session = MockSession(self.keep_audio)
+        index = len(self.sessions)
+        self.sessions.append(session)
+        inject = self._inject_failures(index)
+        outbox = asyncio.Queue()
+        sender = asyncio.create_task(self._sender(ws, session, outbox))
+
+        endpoint = request.path.rstrip('/').rsplit('/', 1)[-1]
+        end_window = 800
+        second_pass = 0
+
+        def emit(frame, audio_ms=0, extra_ms=0):
+            due = time.monotonic() + (self.response_latency_ms + extra_ms) / 1000
+            if self.max_speed and session.first_audio_at is not None:
+                due = max(due, session.first_audio_at + audio_ms / 1000 / self.max_speed)
+            outbox.put_nowait((due, frame))
+
+        segment = []
+        segmenter = None
+        current_start = 0
+
+        def partial_span():
+            if segmenter is not None:
+                return segmenter.partial()
+            if session.audio_ms > current_start:
+                return current_start, min(session.audio_ms, current_start + self.utterance_ms)
+            return None
+
+        next_partial = self.partial_interval_ms
+        try:
+            while True:
+                timeout = self.packet_timeout_ms / 1000 if (self.packet_timeout_ms and inject) else None
+                try:
+                    msg = await asyncio.wait_for(ws.receive(), timeout)
+                except asyncio.TimeoutError:
+                    session.end_reason = 45000081
+                    emit(build_error_response(45000081))
+                    break
+                if msg.type != WSMsgType.BINARY:
+                    session.end_reason = session.end_reason or 'client_closed'
+                    break
+                message_type, flags, seq, payload = parse_client_frame(msg.data)
+                session.last_seq = seq
+                if message_type == MessageType.CLIENT_FULL_REQUEST:
+                    session.request = json.loads(payload)
+                    audio = session.request.get('audio', {})
+                    session.audio_format = audio.get('format', 'pcm')
+                    session.sample_rate = audio.get('rate', 16000)
+                    options = session.request.get('request', {})
+                    end_window = options.get('end_window_size', 800)
+                    second_pass = self.second_pass_ms if options.get('enable_nonstream') else 0
+                    if self.speech_threshold is not None:
+                        segmenter = EnergySegmenter(self.speech_threshold, session.sample_rate)
+                    continue
+                session.add_audio(payload)
+                is_last = bool(flags & MessageTypeSpecificFlags.NEG_SEQUENCE)
+
+                if inject and self.disconnect_after_ms is not None and session.audio_ms >= self.disconnect_after_ms:
+                    session.end_reason = 'disconnect'
+                    request.transport.close()
+                    break
+                if inject and self.error_code and session.audio_ms >= self.error_after_ms:
+                    session.end_reason = self.error_code
+                    emit(build_error_response(self.error_code), session.audio_ms)
+                    break
+
+                if segmenter is not None:
+                    spans = segmenter.feed(payload, end_window)
+                else:
+                    spans = []
+                    while session.audio_ms - current_start >= self.utterance_ms + end_window:
+                        spans.append((current_start, current_start + self.utterance_ms))
+                        current_start += self.utterance_ms
+                for start, end in spans:
+                    segment.append(self._utterance(start, end, True))
+                    emit(build_server_response(abs(seq), self._result(session, segment, partial_span())),
+                         session.audio_ms, second_pass)
+                    if len(segment) >= self.segment_utterances:
+                        segment = []
+                    next_partial = session.audio_ms + self.partial_interval_ms
+                if is_last:
+                    # 流结束时不再等待判停窗口，剩余音频全部固化
+                    if segmenter is not None:
+                        spans = segmenter.flush()
+                    else:
+                        spans = []
+                        while session.audio_ms > current_start:
+                            spans.append((current_start, min(current_start + self.utterance_ms, session.audio_ms)))
+                            current_start = spans[-1][1]
+                    segment.extend(self._utterance(start, end, True) for start, end in spans)
+                    emit(build_server_response(abs(seq), self._result(session, segment, None),
+                                               is_last=True), session.audio_ms, second_pass)
+                    session.end_reason = 'completed'
+                    break
+                if endpoint == 'bigmodel_nostream':
+                    continue
+                if endpoint == 'bigmodel' or session.audio_ms >= next_partial:
+                    emit(build_server_response(seq, self._result(session, segment, partial_span())),
+                         session.audio_ms)
+                    next_partial = session.audio_ms + self.partial_interval_ms
+        finally:
+            outbox.put_nowait(None)
+            await sender
+            if not ws.closed and session.end_reason != 'disconnect':
+                await ws.close()
+        return ws
+
+    async def _sender(self, ws, session, outbox):
+        """按到期时间顺序发送响应，注入延迟不阻塞接收"""
+        while True:
+            item = await outbox.get()
+            if item is None:
+                return
+            due, frame = item
+            delay = due - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if ws.closed:
+                continue
+            try:
+                await ws.send_bytes(frame)
+                session.responses += 1
+            except Exception as e:
+                logger.debug(f"替身服务器发送失败: {e}")
+
+async def _serve_forever(server):
+    async with server:
+        print(f"ASR替身服务器: {server.url}")
+        await asyncio.Event().wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="本地火山ASR替身服务器")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--partial-interval-ms', type=int, default=200)
+    parser.add_argument('--utterance-ms', type=int, default=3000)
+    parser.add_argument('--response-latency-ms', type=int, default=0)
+    parser.add_argument('--connect-latency-ms', type=int, default=0)
+    parser.add_argument('--max-speed', type=float, default=None)
+    parser.add_argument('--error-code', type=int, default=None)
+    parser.add_argument('--error-after-ms', type=int, default=0)
+    parser.add_argument('--packet-timeout-ms', type=int, default=None)
+    parser.add_argument('--disconnect-after-ms', type=int, default=None)
+    parser.add_argument('--fail-sessions', type=int, default=None)
+    parser.add_argument('--second-pass-ms', type=int, default=300)
+    parser.add_argument('--speech-threshold', type=float, default=None)
+    args = parser.parse_args()
+    server = MockASRServer(**{k: v for k, v in vars(args).items()})
+    try:
+        asyncio.run(_serve_forever(server))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    main()
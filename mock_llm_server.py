@@ -0,0 +1,221 @@
+# =============================================================
+# 文件名(File): mock_llm_server.py
+# 版本(Version): v1.5.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 本地OpenAI兼容chat completions替身服务器，翻译离线测试与延迟基准用
+# 修改记录(Changes):
+#   - 新增 MockLLMServer：/chat/completions 按 Translator 的提示词格式返回【纠错后原文】【翻译结果】
+#   - 支持注入响应延迟，统计请求数与最大并发
+#   - 统计客户端建立的连接数（按对端地址），用于验证连接复用；可注入新连接建连耗时、设置空闲连接保持时长
+#   - 支持 stream=true（SSE逐词元返回），可按词元注入生成耗时 token_ms
+#   - 支持批量翻译请求（按编号返回JSON），可指定若干批量响应返回损坏的JSON；响应带估算的 usage 词元数
+#   - 可每隔 slow_every 个请求注入一次慢响应 slow_ms（模拟偶发的慢LLM响应）
+#   - 预热请求为 GET 根路径（不访问翻译接口），预热连接留在连接池中复用
+# =============================================================
+
+"""
+本地OpenAI兼容chat completions替身服务器
+
+接收 Translator 发送的请求，从提示词中取出待翻译文本和目标语言，返回
+    【纠错后原文】<原文>
+    【翻译结果】[<目标语言>] <原文>
+翻译内容是确定的，便于校验结果与分句的对应关系。请求带 stream=true 时按 OpenAI 格式以 SSE
+逐词元（每 TOKEN_CHARS 个字符）返回 delta，段落标记会被拆在多个词元中。
+批量翻译请求（Translator.translate_batch）按编号返回 {"items": [{"id", "corrected", "translation"}]}。
+usage 中的词元数按中日韩字符每字一个、其他字符每4个一个估算。
+
+用法:
+    python3 mock_llm_server.py --port 8766 --latency-ms 300
+    # 客户端: Translator(api_url="http://127.0.0.1:8766/api/v3/chat/completions")
+"""
+
+import re
+import json
+import asyncio
+import logging
+import argparse
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+# Translator 提示词中待翻译文本之前的标记
+TEXT_MARKERS = ("原始ASR内容如下：", "原始内容：")
+# 批量翻译提示词中待处理条目之前的标记（与 translator.BATCH_ITEMS_MARKER 相同）
+BATCH_ITEMS_MARKER = "待处理条目（JSON）："
+TARGET_PATTERN = re.compile(r"翻译为【([^】]+)】")
+# 替身的一个词元对应的字符数
+TOKEN_CHARS = 2
+
+def count_tokens(text: str) -> int:
+    """估算词元数：中日韩字符每字一个，其他字符每4个一个"""
+    cjk = sum(1 for char in text if '\u2e80' <= char <= '\u9fff' or '\uff00' <= char <= '\uffef')
+    return cjk + (len(text) - cjk + 3) // 4
+
+def batch_content(prompt: str) -> str:
+    """批量翻译请求的JSON响应"""
+    entries = json.loads(prompt.rsplit(BATCH_ITEMS_MARKER, 1)[1])
+    items = [{"id": entry["id"], "corrected": entry["text"], "translation": f"[{entry['tgt']}] {entry['text']}"}
+             for entry in entries]
+    return json.dumps({"items": items}, ensure_ascii=False)
+
+def parse_prompt(prompt: str):
+    """从 Translator 提示词中取出 (待翻译文本, 目标语言)"""
+    text = prompt
+    for marker in TEXT_MARKERS:
+        if marker in prompt:
+            text = prompt.rsplit(marker, 1)[1]
+            break
+    match = TARGET_PATTERN.search(prompt)
+    return text.strip(), match.group(1) if match else 'en'
+
+class MockLLMServer:
+    """
+    OpenAI兼容chat completions替身服务器。
+
+    latency_ms: 每个请求的注入延迟（模拟首个词元之前的耗时）
+    token_ms: 每个词元的生成耗时，非流式请求在全部词元生成后才返回
+    connect_latency_ms: 新连接上首个请求的额外延迟（模拟远端服务的 DNS+TCP+TLS 建连耗时）
+    keepalive_s: 服务端空闲连接保持时长，超时后服务端关闭连接
+    broken_batches: 之后多少个批量请求返回损坏的JSON（测试逐条重试）
+    slow_every / slow_ms: 每第 slow_every 个请求额外延迟 slow_ms（0 为不注入）
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency_ms=0, token_ms=0, connect_latency_ms=0, keepalive_s=75.0,
+                 broken_batches=0, slow_every=0, slow_ms=0):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.token_ms = token_ms
+        self.connect_latency_ms = connect_latency_ms
+        self.keepalive_s = keepalive_s
+        self.broken_batches = broken_batches
+        self.slow_every = slow_every
+        self.slow_ms = slow_ms
+        self.requests = 0
+        self.batch_requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._peers = set()
+        self._runner = None
+        self._site = None
+
+    @property
+    def connections(self) -> int:
+        """至今建立过的客户端连接数（含预热请求的连接）"""
+        return len(self._peers)
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/api/v3/chat/completions"
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/{tail:.*}', self._handle)
+        app.router.add_get('/{tail:.*}', self._handle_warm_up)
+        self._runner = web.AppRunner(app, access_log=None, keepalive_timeout=self.keepalive_s)
+        await self._runner.setup()
+        self._site = web.TCPSite(self._runner, self.host, self.port)
+        await self._site.start()
+        self.port = self._site._server.sockets[0].getsockname()[1]
+        logger.info(f"LLM替身服务器已启动: {self.url}")
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def _track(self, request):
+        peer = request.transport.get_extra_info('peername')
+        if peer not in self._peers:
+            self._peers.add(peer)
+            if self.connect_latency_ms:
+                await asyncio.sleep(self.connect_latency_ms / 1000)
+
+    async def _handle_warm_up(self, request):
+        """预热请求（GET 根路径）：只建立连接，不计入请求数"""
+        await self._track(request)
+        return web.Response()
+
+    async def _handle(self, request):
+        await self._track(request)
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            body = await request.json()
+            prompt = body["messages"][-1]["content"]
+            latency_ms = self.latency_ms
+            if self.slow_every and self.requests % self.slow_every == 0:
+                latency_ms += self.slow_ms
+            if latency_ms:
+                await asyncio.sleep(latency_ms / 1000)
+            if BATCH_ITEMS_MARKER in prompt:
+                self.batch_requests += 1
+                content = batch_content(prompt)
+                if self.broken_batches:
+                    self.broken_batches -= 1
+                    content = "好的，以下是结果：" + content[:len(content) // 2]
+            else:
+                text, target = parse_prompt(prompt)
+                content = f"【纠错后原文】{text}\n【翻译结果】[{target}] {text}"
+            tokens = [content[i:i + TOKEN_CHARS] for i in range(0, len(content), TOKEN_CHARS)]
+            if body.get("stream"):
+                return await self._stream(request, body, tokens)
+            if self.token_ms:
+                await asyncio.sleep(self.token_ms * len(tokens) / 1000)
+            return web.json_response({
+                "object": "chat.completion",
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": sum(count_tokens(message["content"]) for message in body["messages"]),
+                          "completion_tokens": count_tokens(content)},
+            })
+        finally:
+            self.in_flight -= 1
+
+    async def _stream(self, request, body, tokens):
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+        await response.prepare(request)
+        for index, token in enumerate(tokens):
+            if index and self.token_ms:
+                await asyncio.sleep(self.token_ms / 1000)
+            chunk = {"object": "chat.completion.chunk", "model": body.get("model"),
+                     "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}]}
+            await response.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode('utf-8'))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+async def _serve_forever(server):
+    async with server:
+        print(f"LLM替身服务器: {server.url}")
+        await asyncio.Event().wait()
+
+def main():
+    parser = argparse.ArgumentParser(description="本地OpenAI兼容chat completions替身服务器")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--latency-ms', type=int, default=0, help="首个词元之前的延迟")
+    parser.add_argument('--token-ms', type=int, default=0, help="每个词元的生成耗时")
+    parser.add_argument('--connect-latency-ms', type=int, default=0, help="新连接首个请求的额外延迟（模拟建连耗时）")
+    args = parser.parse_args()
+    server = MockLLMServer(**vars(args))
+    try:
+        asyncio.run(_serve_forever(server))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+    main()
@@ -0,0 +1,112 @@
+# =============================================================
+# 文件名(File): pcm_buffer.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 预分配的PCM环形缓冲 - 任意长度写入，按固定时长整块零拷贝取出
+# =============================================================
+
+"""
+PCM环形缓冲
+
+替代 `buf += data` / `buf = buf[n:]` 的累积方式：缓冲区一次性分配，写入时只复制一次，
+按整块取出时直接返回缓冲区上的 memoryview，不产生中间 bytes 对象。
+
+容量为块大小的整数倍，读指针每次前进一整块，因此任何一块（包括结尾不足一块的尾巴）
+都不会跨越缓冲区末尾，取出总是零拷贝。
+块大小按采样宽度对齐，奇数长度的写入不会让块边界落在16bit采样中间；
+流结束时尾巴也截断到完整采样。
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+class PcmRingBuffer:
+    """
+    固定容量的PCM环形缓冲。
+
+    chunk_bytes: 每块字节数（向下对齐到采样宽度）
+    capacity_chunks: 缓冲容量（块数），写入超出容量时丢弃最旧的整块并计入 dropped_bytes
+    sample_width: 采样字节数，16bit PCM为2
+
+    read_chunk 返回的 memoryview 在该块被后续写入覆盖前有效，即之后至少还能写入
+    (capacity_chunks - 1) 块数据；需要更长时间持有时请自行复制。
+    """
+
+    def __init__(self, chunk_bytes, capacity_chunks=4, sample_width=2):
+        if capacity_chunks < 2:
+            raise ValueError("capacity_chunks 至少为2")
+        self.sample_width = sample_width
+        self.chunk_bytes = chunk_bytes - chunk_bytes % sample_width
+        if self.chunk_bytes <= 0:
+            raise ValueError(f"块大小必须至少为一个采样: {chunk_bytes}")
+        self.capacity = self.chunk_bytes * capacity_chunks
+        self._buf = bytearray(self.capacity)
+        self._view = memoryview(self._buf)
+        self._read = 0
+        self._size = 0
+        self.dropped_bytes = 0
+
+    def __len__(self):
+        return self._size
+
+    def write(self, data):
+        """写入任意长度的PCM（bytes / bytearray / memoryview），只复制一次"""
+        if not isinstance(data, (bytes, bytearray)):
+            data = memoryview(data).cast('B')
+        n = len(data)
+        overflow = self._size + n - self.capacity
+        if overflow > 0:
+            # 按整块丢弃最旧数据（先旧数据、再新数据开头），保持读指针与块边界对齐
+            drop = -(-overflow // self.chunk_bytes) * self.chunk_bytes
+            self.dropped_bytes += drop
+            if drop <= self._size:
+                self._read = (self._read + drop) % self.capacity
+                self._size -= drop
+            else:
+                data = data[drop - self._size:]
+                n = len(data)
+                self._read = 0
+                self._size = 0
+        start = (self._read + self._size) % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            self._view[start:end] = data
+        else:
+            # 跨越缓冲区末尾时分两段写入
+            data = memoryview(data)
+            first = self.capacity - start
+            self._view[start:] = data[:first]
+            self._view[:n - first] = data[first:]
+        self._size += n
+
+    def read_chunk(self):
+        """取出一整块，返回缓冲区上的只读 memoryview；不足一块时返回 None"""
+        if self._size < self.chunk_bytes:
+            return None
+        start = self._read
+        self._read = (start + self.chunk_bytes) % self.capacity
+        self._size -= self.chunk_bytes
+        return self._view[start:start + self.chunk_bytes].toreadonly()
+
+    def read_tail(self):
+        """
+        取出剩余不足一块的数据（截断到完整采样），返回只读 memoryview；无数据时返回 None。
+        末尾不成整采样的字节被丢弃并计入 dropped_bytes。
+        """
+        n = self._size - self._size % self.sample_width
+        self.dropped_bytes += self._size - n
+        if n <= 0:
+            self._size = 0
+            return None
+        # 读指针位于块边界且尾巴不足一块，不会跨越缓冲区末尾
+        view = self._view[self._read:self._read + n]
+        # 流结束：读指针回到起点，后续写入重新按块对齐
+        self._read = 0
+        self._size = 0
+        return view.toreadonly()
+
+    def clear(self):
+        self._read = 0
+        self._size = 0
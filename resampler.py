@@ -0,0 +1,129 @@
+# =============================================================
+# 文件名(File): resampler.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 流式多相重采样与下混 - 设备原生采样率/声道的PCM转换为ASR所需的16kHz单声道
+# =============================================================
+
+"""
+流式多相重采样
+
+很多USB/会议设备只支持44.1/48kHz或立体声，让PortAudio/ALSA在驱动层转换开销大，有时还会爆音，
+甚至直接打不开。采集改为按设备原生格式打开，再由 PolyphaseResampler 在采集线程中按块转换：
+    1. 多声道先平均下混（减少后续运算量）
+    2. 有理数倍率 up/down 的多相FIR重采样，只计算需要输出的样点
+
+滤波器与 scipy.signal.resample_poly 的缺省设计相同（Kaiser窗 beta=5，半长 10*max(up, down)，
+截止频率为两侧采样率中较低者的奈奎斯特频率），输出与其逐样点对齐，便于对照校验。
+分块处理时在块之间保留滤波器历史，任意分块方式的输出都与整段处理一致。
+"""
+
+import math
+
+import numpy as np
+
+KAISER_BETA = 5.0
+HALF_LEN_FACTOR = 10
+
+class PolyphaseResampler:
+    """
+    16bit PCM流式重采样与下混。
+
+    src_rate / dst_rate: 输入输出采样率
+    in_channels: 输入声道数（交错存储）
+    out_channels: 输出声道数，1 表示平均下混，否则须与 in_channels 相同
+    """
+
+    def __init__(self, src_rate, dst_rate=16000, in_channels=1, out_channels=1):
+        if out_channels not in (1, in_channels):
+            raise ValueError(f"不支持 {in_channels} 声道转换为 {out_channels} 声道")
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self.in_channels = in_channels
+        self.out_channels = out_channels
+        g = math.gcd(src_rate, dst_rate)
+        self.up = dst_rate // g
+        self.down = src_rate // g
+        max_rate = max(self.up, self.down)
+        half_len = HALF_LEN_FACTOR * max_rate
+        n = np.arange(-half_len, half_len + 1)
+        h = np.sinc(n / max_rate) * np.kaiser(2 * half_len + 1, KAISER_BETA)
+        h = h / h.sum() * self.up
+        # 与 resample_poly 相同：前补零使滤波器延迟为整数个输出样点，之后丢弃这些输出
+        pre_pad = self.down - half_len % self.down
+        self._skip = (half_len + pre_pad) // self.down
+        h = np.concatenate([np.zeros(pre_pad), h])
+        self.taps = -(-len(h) // self.up)   # 每个相位的抽头数
+        h = np.concatenate([h, np.zeros(self.taps * self.up - len(h))])
+        # _bank[p, k] = h[k*up + p]：输出样点相位为 p 时与输入 x[b-k] 相乘的系数
+        self._bank = np.ascontiguousarray(h.reshape(self.taps, self.up).T, dtype=np.float32)
+        self._reversed = np.ascontiguousarray(self._bank[:, ::-1])
+        # 输出相位每 up 个样点循环一次：第 j 个样点的系数行和最新输入相对周期起点的偏移
+        cycle = np.arange(self.up) * self.down
+        self._cycle_bank = self._bank[cycle % self.up]
+        self._cycle_offset = cycle // self.up
+        self._tap_range = np.arange(self.taps)
+        # 输入历史（含 taps-1 个起始零），_buf[0] 对应输入样点 _buf_start
+        self._buf = np.zeros((self.taps - 1, out_channels), dtype=np.float32)
+        self._buf_start = -(self.taps - 1)
+        self._in_count = 0
+        self._next_out = 0
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down and self.in_channels == self.out_channels
+
+    def process(self, pcm) -> bytes:
+        """输入一块交错的16bit PCM，返回已可计算的输出PCM"""
+        if self.passthrough:
+            return bytes(pcm)
+        samples = np.frombuffer(pcm, dtype='<i2')
+        samples = samples[:len(samples) - len(samples) % self.in_channels].reshape(-1, self.in_channels)
+        if self.out_channels == 1 and self.in_channels > 1:
+            samples = samples.mean(axis=1, dtype=np.float32, keepdims=True)
+        self._buf = np.concatenate([self._buf, samples.astype(np.float32, copy=False)])
+        self._in_count += len(samples)
+        # 输出样点 n 需要的最新输入为 x[n*down // up]
+        last = (self._in_count * self.up - 1) // self.down
+        return self._compute(last)
+
+    def flush(self) -> bytes:
+        """流结束：以零补足滤波器尾部，输出剩余样点，总输出数为 ceil(输入数 * up / down)"""
+        if self.passthrough:
+            return b""
+        total = -(-self._in_count * self.up // self.down) + self._skip
+        pad = (total * self.down) // self.up + 1 - (self._buf_start + len(self._buf))
+        if pad > 0:
+            self._buf = np.concatenate([self._buf, np.zeros((pad, self.out_channels), dtype=np.float32)])
+        return self._compute(total - 1)
+
+    def _compute(self, last) -> bytes:
+        first = self._next_out
+        if last < first:
+            return b""
+        if self.up == 1:
+            # 整数倍降采样：滑动窗口视图按步长取样，无需复制
+            start = first * self.down - self._buf_start - self.taps + 1
+            stop = last * self.down - self._buf_start - self.taps + 2
+            windows = np.lib.stride_tricks.sliding_window_view(self._buf, self.taps, axis=0)
+            out = windows[start:stop:self.down] @ self._reversed[0]
+        else:
+            outs = np.arange(first, last + 1)
+            phase = outs % self.up
+            bases = (outs // self.up) * self.down + self._cycle_offset[phase] - self._buf_start
+            index = bases[:, None] - self._tap_range
+            coefs = self._cycle_bank[phase]
+            if self.out_channels == 1:
+                out = np.einsum('nk,nk->n', coefs, self._buf[:, 0][index])[:, None]
+            else:
+                out = np.einsum('nk,nkc->nc', coefs, self._buf[index])
+        self._next_out = last + 1
+        # 丢弃之后的输出都不再需要的历史
+        keep_from = (self._next_out * self.down) // self.up - (self.taps - 1)
+        if keep_from > self._buf_start:
+            self._buf = self._buf[keep_from - self._buf_start:]
+            self._buf_start = keep_from
+        if first < self._skip:
+            out = out[self._skip - first:]
+        return np.clip(np.rint(out), -32768, 32767).astype('<i2').tobytes()
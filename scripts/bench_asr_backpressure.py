@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_asr_backpressure.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): ASR发送管线背压基准 - 上行受限时 coalesce / drop 策略的滞后、帧时长与丢弃量
+# =============================================================
+
+"""
+ASR发送管线背压基准
+
+按实时节奏向本地ASR替身服务器发送音频，在客户端WebSocket发送处模拟上行链路状况：
+    - steady:  链路正常
+    - stall:   链路中途停顿 --stall-ms 毫秒后恢复
+    - narrow:  链路带宽限制为 --kbps（低于PCM所需的256 kbit/s）
+分别统计 coalesce / drop 两种策略下的距实时边沿滞后（每50ms采样p50/p95，及发送时最大值）、帧数、
+帧时长范围、丢弃音频时长以及服务端实际收到的音频时长。
+
+用法:
+    python3 scripts/bench_asr_backpressure.py [--seconds 8] [--stall-ms 2000] [--kbps 160]
+"""
+
+import time
+import asyncio
+import argparse
+import logging
+
+from bench_common import load_speech_pcm, percentile
+from asr_client import VolcanoASRClientAsync, ASR_SAMPLE_RATE
+from mock_asr_server import MockASRServer
+
+CHUNK_MS = 200
+
+
+def throttle(conn, link, args, t0):
+    """包装 send_bytes 模拟上行链路：停顿或限速"""
+    send_bytes = conn.send_bytes
+
+    async def limited(data):
+        elapsed = time.perf_counter() - t0
+        if link == 'stall':
+            stall_from = args.seconds / 3
+            stall_to = stall_from + args.stall_ms / 1000
+            if stall_from <= elapsed < stall_to:
+                await asyncio.sleep(stall_to - elapsed)
+        elif link == 'narrow':
+            await asyncio.sleep(len(data) * 8 / (args.kbps * 1000))
+        await send_bytes(data)
+
+    conn.send_bytes = limited
+
+
+async def run_case(url, pcm, policy, link, args):
+    async def audio_generator():
+        chunk_bytes = ASR_SAMPLE_RATE * 2 * CHUNK_MS // 1000
+        start = time.perf_counter()
+        for index, offset in enumerate(range(0, len(pcm), chunk_bytes)):
+            await asyncio.sleep(max(0.0, start + index * CHUNK_MS / 1000 - time.perf_counter()))
+            yield pcm[offset:offset + chunk_bytes], offset + chunk_bytes >= len(pcm)
+
+    client = VolcanoASRClientAsync(ws_url=url, compression='none', send_policy=policy, max_lag_ms=args.max_lag_ms)
+    client.max_reconnects = 0
+    lags, chunk_sizes = [], set()
+
+    async def sample():
+        while True:
+            await asyncio.sleep(0.05)
+            if client.send_queue:
+                lags.append(client.send_queue.lag_ms)
+            chunk_sizes.add(client.chunk_ms)
+
+    async with client as asr:
+        throttle(asr.conn, link, args, time.perf_counter())
+        sampler = asyncio.create_task(sample())
+        try:
+            await asr.run(audio_generator())
+        finally:
+            sampler.cancel()
+    return client.send_stats(), lags, chunk_sizes
+
+
+async def bench(args):
+    pcm = load_speech_pcm(args.wav, args.seconds, ASR_SAMPLE_RATE)
+    print(f"样本: {args.seconds:.1f}s 实时发送, 队列上限 {args.max_lag_ms}ms, "
+          f"停顿 {args.stall_ms}ms, 限速 {args.kbps}kbit/s")
+    print(f"{'链路':<8}{'策略':<10}{'滞后p50':>9}{'滞后p95':>9}{'最大滞后':>9}{'帧数':>6}"
+          f"{'帧时长ms':>12}{'丢弃ms':>8}{'服务端收到ms':>14}")
+    for link in ('steady', 'stall', 'narrow'):
+        for policy in ('coalesce', 'drop'):
+            async with MockASRServer() as server:
+                stats, lags, chunk_sizes = await run_case(server.url, pcm, policy, link, args)
+                received = server.sessions[0].audio_ms
+            print(f"{link:<8}{policy:<10}{percentile(lags, 50):>9.0f}{percentile(lags, 95):>9.0f}"
+                  f"{stats['max_lag_ms']:>9.0f}{stats['frames']:>6}"
+                  f"{min(chunk_sizes):>6}~{max(chunk_sizes):<5}{stats['dropped_ms']:>8.0f}{received:>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR发送管线背压基准")
+    parser.add_argument('--wav', help="16bit WAV录音，缺省时使用合成语音")
+    parser.add_argument('--seconds', type=float, default=8.0, help="音频时长(秒)")
+    parser.add_argument('--stall-ms', type=int, default=2000, help="stall 场景的链路停顿时长")
+    parser.add_argument('--kbps', type=int, default=160, help="narrow 场景的上行带宽")
+    parser.add_argument('--max-lag-ms', type=int, default=1000, help="发送队列上限（音频时长）")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.CRITICAL)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_asr_compression.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): ASR音频payload压缩策略基准 - 压缩率、CPU耗时与事件循环阻塞时间
+# =============================================================
+
+"""
+ASR音频payload压缩策略基准
+
+对 none / fast / gzip 三种压缩方式，按实际发送粒度逐帧编码录音，输出：
+    - 压缩率（上行字节 / 原始PCM字节）
+    - 每帧CPU耗时(µs)
+    - 每帧事件循环阻塞时间(µs，均值/p99/最大)：编码在事件循环中同步执行，阻塞时间即单帧墙钟耗时
+
+用法:
+    python3 scripts/bench_asr_compression.py [--wav meeting.wav] [--seconds 60] [--chunk-ms 200]
+"""
+
+import time
+import argparse
+
+from bench_common import load_speech_pcm, percentile
+from asr_client import AudioFrameEncoder, AUDIO_COMPRESSION_MODES, ASR_SAMPLE_RATE
+
+
+def bench_mode(mode, pcm, chunk_bytes):
+    encoder = AudioFrameEncoder(mode)
+    wire_bytes = 0
+    blocking_us = []
+    cpu_start = time.process_time_ns()
+    for seq, offset in enumerate(range(0, len(pcm), chunk_bytes), start=1):
+        segment = pcm[offset:offset + chunk_bytes]
+        start = time.perf_counter_ns()
+        frame = encoder.encode(seq, segment, is_last=offset + chunk_bytes >= len(pcm))
+        blocking_us.append((time.perf_counter_ns() - start) / 1000)
+        wire_bytes += len(frame)
+    cpu_us = (time.process_time_ns() - cpu_start) / 1000 / len(blocking_us)
+    return {
+        'ratio': wire_bytes / len(pcm),
+        'cpu_us': cpu_us,
+        'mean_us': sum(blocking_us) / len(blocking_us),
+        'p99_us': percentile(blocking_us, 99),
+        'max_us': max(blocking_us),
+        'kbps': wire_bytes * 8 / 1000 / (len(pcm) / 2 / ASR_SAMPLE_RATE),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR音频payload压缩策略基准")
+    parser.add_argument('--wav', help="16bit WAV录音，缺省时使用合成语音")
+    parser.add_argument('--seconds', type=float, default=60.0, help="合成语音时长(秒)")
+    parser.add_argument('--chunk-ms', type=int, default=200, help="发送粒度(ms)")
+    args = parser.parse_args()
+
+    pcm = load_speech_pcm(args.wav, args.seconds, ASR_SAMPLE_RATE)
+    chunk_bytes = ASR_SAMPLE_RATE * 2 * args.chunk_ms // 1000
+    print(f"样本: {len(pcm) / 2 / ASR_SAMPLE_RATE:.1f}s, 帧粒度 {args.chunk_ms}ms")
+    print(f"{'模式':<8}{'压缩率':>8}{'上行kbps':>10}{'CPU µs/帧':>12}{'阻塞均值':>10}{'阻塞p99':>10}{'阻塞最大':>10}")
+    for mode in AUDIO_COMPRESSION_MODES:
+        r = bench_mode(mode, pcm, chunk_bytes)
+        print(f"{mode:<8}{r['ratio']:>8.3f}{r['kbps']:>10.1f}{r['cpu_us']:>12.1f}"
+              f"{r['mean_us']:>10.1f}{r['p99_us']:>10.1f}{r['max_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_asr_events.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): ASR分句增量事件基准 - 全量遍历 vs UtteranceDiffer 每条消息的处理开销
+# =============================================================
+
+"""
+ASR分句增量事件基准
+
+从本地ASR替身服务器录制一次长会话的全部响应（每个VAD分段包含 --segment-utterances 个分句），
+对比两种处理方式：
+    - full:  旧版 on_result 逻辑，每条消息遍历全部分句并按 (text, start, end) 去重
+    - delta: UtteranceDiffer，只产出新固化分句和变化的中间结果
+校验两者得到的固化分句一致，并统计每条消息的平均耗时与访问的分句数。
+
+用法:
+    python3 scripts/bench_asr_events.py [--seconds 120] [--segment-utterances 40]
+"""
+
+import copy
+import time
+import asyncio
+import argparse
+import logging
+
+from bench_common import load_speech_pcm
+from asr_client import VolcanoASRClientAsync, UtteranceDiffer, UtteranceFinalized, ASR_SAMPLE_RATE
+from mock_asr_server import MockASRServer
+
+CHUNK_MS = 200
+
+
+async def record_session(pcm, segment_utterances):
+    """录制一次会话的所有 payload_msg"""
+    messages = []
+
+    async def audio_generator():
+        chunk_bytes = ASR_SAMPLE_RATE * 2 * CHUNK_MS // 1000
+        for offset in range(0, len(pcm), chunk_bytes):
+            yield pcm[offset:offset + chunk_bytes], offset + chunk_bytes >= len(pcm)
+
+    def on_result(response):
+        if response.payload_msg:
+            messages.append(copy.deepcopy(response.payload_msg))
+
+    async with MockASRServer(utterance_ms=2000, segment_utterances=segment_utterances) as server:
+        async with VolcanoASRClientAsync(on_result=on_result, ws_url=server.url) as asr:
+            await asr.run(audio_generator())
+    return messages
+
+
+def process_full(messages):
+    seen = set()
+    finals = []
+    visited = 0
+    for payload in messages:
+        for utt in payload.get('result', {}).get('utterances', []):
+            visited += 1
+            key = (utt.get('text'), utt.get('start_time'), utt.get('end_time'))
+            if utt.get('definite') and utt.get('text') and key not in seen:
+                seen.add(key)
+                finals.append(key)
+    return finals, visited
+
+
+def process_delta(messages):
+    differ = UtteranceDiffer()
+    finals = []
+    events = 0
+    for payload in messages:
+        for event in differ.feed(payload):
+            events += 1
+            if isinstance(event, UtteranceFinalized):
+                utt = event.utterance
+                finals.append((utt.get('text'), utt.get('start_time'), utt.get('end_time')))
+    return finals, events
+
+
+def timed(func, messages, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(messages)
+        best = min(best, time.perf_counter() - start)
+    return result, best / len(messages) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR分句增量事件基准")
+    parser.add_argument('--seconds', type=float, default=120.0, help="合成语音时长(秒)")
+    parser.add_argument('--segment-utterances', type=int, default=40, help="每个VAD分段的分句数")
+    parser.add_argument('--repeat', type=int, default=20, help="重复次数（取最快）")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    pcm = load_speech_pcm(None, args.seconds, ASR_SAMPLE_RATE)
+    messages = asyncio.run(record_session(pcm, args.segment_utterances))
+    lengths = [len(m.get('result', {}).get('utterances', [])) for m in messages]
+    print(f"消息数: {len(messages)}, 每条分句数 平均 {sum(lengths) / len(lengths):.1f} 最大 {max(lengths)}")
+
+    (full_finals, visited), full_us = timed(process_full, messages, args.repeat)
+    (delta_finals, events), delta_us = timed(process_delta, messages, args.repeat)
+    assert full_finals == delta_finals, "增量事件与全量遍历得到的固化分句不一致"
+    print(f"{'方式':<8}{'µs/消息':>10}{'处理项':>10}")
+    print(f"{'full':<8}{full_us:>10.2f}{visited:>10}  (遍历分句)")
+    print(f"{'delta':<8}{delta_us:>10.2f}{events:>10}  (产出事件)")
+    print(f"固化分句 {len(delta_finals)} 个，两种方式一致")
+
+
+if __name__ == "__main__":
+    main()
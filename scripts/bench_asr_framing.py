@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_asr_framing.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): ASR音频帧编码微基准 - 对比旧版RequestBuilder与AudioFrameEncoder
+# =============================================================
+
+"""
+ASR音频帧编码微基准
+
+对比项:
+    - legacy:  旧版 new_audio_only_request（每帧新建Header对象、bytearray、struct临时对象并整体复制）
+    - builder: 现版 RequestBuilder.new_audio_only_request（预计算协议头，返回bytes）
+    - encoder: AudioFrameEncoder（预计算协议头，pack_into写入复用缓冲区）
+
+输出每帧耗时(ns)和每帧临时分配峰值(tracemalloc)，分别统计纯封帧和含gzip压缩两种情况。
+
+用法:
+    python3 scripts/bench_asr_framing.py [-n 20000] [--chunk-ms 200]
+"""
+
+import os
+import gzip
+import struct
+import argparse
+import time
+import tracemalloc
+
+import bench_common  # noqa: F401  设置项目路径
+from asr_client import (
+    AsrRequestHeader, AudioFrameEncoder, MessageType, MessageTypeSpecificFlags,
+    RequestBuilder, CompressionType, ASR_SAMPLE_RATE, _FRAME_PREFIX, _AUDIO_ONLY_HEADERS,
+)
+
+
+def legacy_frame(seq, payload, is_last=False):
+    """旧版封帧逻辑（payload已压缩），作为对照基线"""
+    header = AsrRequestHeader.default_header()
+    if is_last:
+        header.with_message_type_specific_flags(MessageTypeSpecificFlags.NEG_WITH_SEQUENCE)
+        seq = -seq
+    else:
+        header.with_message_type_specific_flags(MessageTypeSpecificFlags.POS_SEQUENCE)
+    header.with_message_type(MessageType.CLIENT_AUDIO_ONLY_REQUEST)
+    request = bytearray()
+    request.extend(header.to_bytes())
+    request.extend(struct.pack('>i', seq))
+    request.extend(struct.pack('>I', len(payload)))
+    request.extend(payload)
+    return bytes(request)
+
+
+def legacy_request(seq, segment, is_last=False):
+    return legacy_frame(seq, gzip.compress(segment), is_last)
+
+
+def builder_frame(seq, payload, is_last=False):
+    if is_last:
+        seq = -seq
+    return _FRAME_PREFIX.pack(_AUDIO_ONLY_HEADERS[(is_last, CompressionType.GZIP)], seq, len(payload)) + payload
+
+
+def time_per_call(fn, arg, n):
+    start = time.perf_counter_ns()
+    for seq in range(1, n + 1):
+        fn(seq, arg)
+    return (time.perf_counter_ns() - start) / n
+
+
+def peak_alloc_per_call(fn, arg):
+    """单次调用期间的临时分配峰值（字节）"""
+    fn(1, arg)  # 预热，排除首次调用的缓存分配
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    result = fn(2, arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak - base
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR音频帧编码微基准")
+    parser.add_argument('-n', type=int, default=20000, help="每项迭代次数")
+    parser.add_argument('--chunk-ms', type=int, default=200, help="音频块时长(ms)")
+    args = parser.parse_args()
+
+    chunk_bytes = ASR_SAMPLE_RATE * 2 * args.chunk_ms // 1000
+    segment = os.urandom(chunk_bytes)
+    payload = gzip.compress(segment)
+    encoder = AudioFrameEncoder()
+
+    # 三种实现输出必须逐字节一致
+    for is_last in (False, True):
+        expected = legacy_frame(7, payload, is_last)
+        assert builder_frame(7, payload, is_last) == expected
+        assert bytes(encoder.frame(7, payload, is_last)) == expected
+    assert RequestBuilder.new_full_client_request(1) == RequestBuilder.new_full_client_request(1)
+
+    cases = [
+        ("封帧 legacy", legacy_frame, payload, args.n),
+        ("封帧 builder", builder_frame, payload, args.n),
+        ("封帧 encoder", encoder.frame, payload, args.n),
+        ("gzip+封帧 legacy", legacy_request, segment, max(args.n // 20, 1)),
+        ("gzip+封帧 builder", RequestBuilder.new_audio_only_request, segment, max(args.n // 20, 1)),
+        ("gzip+封帧 encoder", encoder.encode, segment, max(args.n // 20, 1)),
+    ]
+    print(f"音频块: {args.chunk_ms}ms / {chunk_bytes}字节, 压缩后payload {len(payload)}字节")
+    print(f"{'实现':<20}{'ns/帧':>12}{'临时分配峰值(B)':>18}")
+    for name, fn, arg, n in cases:
+        ns = time_per_call(fn, arg, n)
+        peak = peak_alloc_per_call(fn, arg)
+        print(f"{name:<20}{ns:>12.0f}{peak:>18}")
+
+    n_full = max(args.n // 10, 1)
+    start = time.perf_counter_ns()
+    for seq in range(n_full):
+        RequestBuilder.new_full_client_request(seq)
+    cached_ns = (time.perf_counter_ns() - start) / n_full
+    start = time.perf_counter_ns()
+    for seq in range(n_full):
+        RequestBuilder.full_client_payload.__wrapped__(ASR_SAMPLE_RATE)
+    uncached_ns = (time.perf_counter_ns() - start) / n_full
+    print(f"完整客户端请求: 缓存 {cached_ns:.0f} ns/次, 每次重新序列化+压缩 {uncached_ns:.0f} ns/次")
+
+
+if __name__ == "__main__":
+    main()
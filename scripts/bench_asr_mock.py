@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_asr_mock.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 基于本地ASR替身服务器的离线基准 - 连接耗时、首个中间结果延迟、吞吐与故障场景
+# =============================================================
+
+"""
+基于本地ASR替身服务器的离线基准
+
+场景:
+    - normal:      正常会话，统计连接耗时、首个中间结果延迟、吞吐（音频秒/墙钟秒）
+    - err45000081: 等包超时
+    - err55000031: 服务器繁忙
+    - disconnect:  中途断开TCP连接
+
+用法:
+    python3 scripts/bench_asr_mock.py [--seconds 20] [--realtime] [--latency-ms 50] [--sessions 5]
+"""
+
+import time
+import asyncio
+import argparse
+import logging
+
+from bench_common import load_speech_pcm, percentile
+from asr_client import VolcanoASRClientAsync, ASR_SAMPLE_RATE
+from mock_asr_server import MockASRServer
+
+CHUNK_MS = 200
+
+
+async def run_session(url, pcm, realtime, **client_kwargs):
+    """运行一次会话，返回统计数据"""
+    stats = {'first_audio': None, 'first_partial': None, 'responses': 0, 'codes': set(), 'last': False}
+
+    async def on_result(response):
+        stats['responses'] += 1
+        if response.code:
+            stats['codes'].add(response.code)
+        if response.is_last_package:
+            stats['last'] = True
+        if stats['first_partial'] is None and response.payload_msg:
+            if response.payload_msg.get('result', {}).get('text'):
+                stats['first_partial'] = time.perf_counter()
+
+    async def audio_generator():
+        chunk_bytes = ASR_SAMPLE_RATE * 2 * CHUNK_MS // 1000
+        start = time.perf_counter()
+        for index, offset in enumerate(range(0, len(pcm), chunk_bytes)):
+            if realtime:
+                await asyncio.sleep(max(0.0, start + index * CHUNK_MS / 1000 - time.perf_counter()))
+            if stats['first_audio'] is None:
+                stats['first_audio'] = time.perf_counter()
+            yield pcm[offset:offset + chunk_bytes], offset + chunk_bytes >= len(pcm)
+
+    start = time.perf_counter()
+    client = VolcanoASRClientAsync(on_result=on_result, ws_url=url, **client_kwargs)
+    client.max_retries = 1
+    client.max_reconnects = 0  # 故障场景直接观察结束方式，重连见 bench_asr_reconnect.py
+    async with client as asr:
+        connected = time.perf_counter()
+        try:
+            await asr.run(audio_generator())
+        except Exception as e:
+            stats['codes'].add(type(e).__name__)
+    end = time.perf_counter()
+    stats['connect_ms'] = (connected - start) * 1000
+    stats['wall_s'] = end - start
+    if stats['first_partial'] and stats['first_audio']:
+        stats['first_partial_ms'] = (stats['first_partial'] - stats['first_audio']) * 1000
+    return stats
+
+
+async def bench(args):
+    pcm = load_speech_pcm(args.wav, args.seconds, ASR_SAMPLE_RATE)
+    audio_s = len(pcm) / 2 / ASR_SAMPLE_RATE
+    scenarios = [
+        ('normal', {}),
+        ('err45000081', {'error_code': 45000081, 'error_after_ms': int(audio_s * 500)}),
+        ('err55000031', {'error_code': 55000031, 'error_after_ms': int(audio_s * 500)}),
+        ('disconnect', {'disconnect_after_ms': int(audio_s * 500)}),
+    ]
+    print(f"样本: {audio_s:.1f}s, {'实时' if args.realtime else '不限速'}发送, 注入延迟 {args.latency_ms}ms")
+    print(f"{'场景':<14}{'连接ms':>10}{'首结果ms p50':>14}{'首结果ms p95':>14}{'吞吐x':>8}{'响应数':>8}  结束方式")
+    for name, options in scenarios:
+        results = []
+        for _ in range(args.sessions):
+            async with MockASRServer(response_latency_ms=args.latency_ms, **options) as server:
+                results.append(await run_session(server.url, pcm, args.realtime))
+        connect = [r['connect_ms'] for r in results]
+        first = [r['first_partial_ms'] for r in results if 'first_partial_ms' in r]
+        speed = sum(audio_s for _ in results) / sum(r['wall_s'] for r in results)
+        ending = results[-1]['codes'] or ({'完成'} if results[-1]['last'] else {'连接中断'})
+        print(f"{name:<14}{sum(connect) / len(connect):>10.1f}{percentile(first, 50):>14.1f}"
+              f"{percentile(first, 95):>14.1f}{speed:>8.1f}{results[-1]['responses']:>8}  {','.join(map(str, ending))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="基于本地ASR替身服务器的离线基准")
+    parser.add_argument('--wav', help="16bit WAV录音，缺省时使用合成语音")
+    parser.add_argument('--seconds', type=float, default=20.0, help="合成语音时长(秒)")
+    parser.add_argument('--realtime', action='store_true', help="按实时节奏发送音频")
+    parser.add_argument('--latency-ms', type=int, default=0, help="替身服务器每条响应的注入延迟")
+    parser.add_argument('--sessions', type=int, default=5, help="每个场景的会话数")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.CRITICAL)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
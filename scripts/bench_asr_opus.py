@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_asr_opus.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): Ogg/Opus上行基准 - 编码CPU开销、每分钟上行字节数及本地替身服务器往返校验
+# =============================================================
+
+"""
+Ogg/Opus上行基准
+
+    - 编码开销：每分钟音频的Opus编码CPU耗时
+    - 上行字节：每分钟音频在WebSocket上的字节数（pcm+gzip vs ogg_opus）
+    - 往返校验：VolcanoASRClientAsync 以 ogg_opus 格式连接本地ASR替身服务器（mock_asr_server），
+      校验完整客户端请求声明的格式、逐页校验Ogg CRC并解码Opus，核对音频时长与样本数
+
+依赖 opuslib 和系统 libopus，缺少时打印提示后跳过。
+
+用法:
+    python3 scripts/bench_asr_opus.py [--wav meeting.wav] [--seconds 60]
+"""
+
+import time
+import asyncio
+import argparse
+import logging
+
+from bench_common import load_speech_pcm
+from asr_client import AudioFrameEncoder, VolcanoASRClientAsync, ASR_SAMPLE_RATE
+from audio_codec import OggOpusEncoder, parse_ogg_pages, opuslib
+from mock_asr_server import MockASRServer
+
+CHUNK_MS = 200
+
+
+def wire_bytes_per_minute(pcm, audio_format):
+    chunk_bytes = ASR_SAMPLE_RATE * 2 * CHUNK_MS // 1000
+    opus = OggOpusEncoder(ASR_SAMPLE_RATE) if audio_format == 'ogg_opus' else None
+    encoder = AudioFrameEncoder('none' if opus else 'gzip')
+    total = 0
+    cpu_start = time.process_time()
+    for seq, offset in enumerate(range(0, len(pcm), chunk_bytes), start=1):
+        is_last = offset + chunk_bytes >= len(pcm)
+        payload = pcm[offset:offset + chunk_bytes]
+        if opus:
+            payload = opus.encode_chunk(payload, is_last)
+        total += len(encoder.encode(seq, payload, is_last))
+    cpu = time.process_time() - cpu_start
+    minutes = len(pcm) / 2 / ASR_SAMPLE_RATE / 60
+    return total / minutes, cpu / minutes
+
+
+async def roundtrip(pcm):
+    """经本地ASR替身服务器往返，校验格式声明、Ogg CRC并解码Opus"""
+    async def audio_generator():
+        chunk_bytes = ASR_SAMPLE_RATE * 2 * CHUNK_MS // 1000
+        for offset in range(0, len(pcm), chunk_bytes):
+            yield pcm[offset:offset + chunk_bytes], offset + chunk_bytes >= len(pcm)
+
+    async with MockASRServer(keep_audio=True) as server:
+        async with VolcanoASRClientAsync(audio_format='ogg_opus', ws_url=server.url) as asr:
+            await asr.run(audio_generator())
+        session = server.sessions[0]
+
+    pages = parse_ogg_pages(bytes(session.audio))
+    decoder = opuslib.Decoder(ASR_SAMPLE_RATE, 1)
+    samples = 0
+    for _, _, _, _, packets in pages[2:]:
+        for packet in packets:
+            samples += len(decoder.decode(packet, ASR_SAMPLE_RATE // 50)) // 2
+    return {
+        'audio': session.request['audio'],
+        'end_reason': session.end_reason,
+        'audio_ms': session.audio_ms,
+        'pages': len(pages),
+        'bytes': session.audio_bytes,
+        'decoded_samples': samples,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ogg/Opus上行基准")
+    parser.add_argument('--wav', help="16bit WAV录音，缺省时使用合成语音")
+    parser.add_argument('--seconds', type=float, default=60.0, help="合成语音时长(秒)")
+    args = parser.parse_args()
+    if opuslib is None:
+        print("跳过: Ogg/Opus上行基准需要 opuslib 和系统 libopus（pip install opuslib，并安装 libopus）")
+        return
+
+    pcm = load_speech_pcm(args.wav, args.seconds, ASR_SAMPLE_RATE)
+    print(f"样本: {len(pcm) / 2 / ASR_SAMPLE_RATE:.1f}s")
+    print(f"{'格式':<10}{'上行KB/分钟':>14}{'编码CPU秒/分钟':>18}")
+    for audio_format in ('pcm', 'ogg_opus'):
+        per_minute, cpu = wire_bytes_per_minute(pcm, audio_format)
+        print(f"{audio_format:<10}{per_minute / 1024:>14.1f}{cpu:>18.3f}")
+
+    logging.getLogger().setLevel(logging.WARNING)
+    result = asyncio.run(roundtrip(pcm[:ASR_SAMPLE_RATE * 2 * 5 + 3000]))
+    assert result['audio']['format'] == 'ogg' and result['audio']['codec'] == 'opus', result['audio']
+    assert result['end_reason'] == 'completed', result['end_reason']
+    assert result['audio_ms'] == 5093, result['audio_ms']
+    assert result['decoded_samples'] >= ASR_SAMPLE_RATE * 5 + 1500
+    print(f"往返校验通过: {result['pages']} 页, {result['bytes']} 字节, 解码 {result['decoded_samples']} 样本")
+
+
+if __name__ == "__main__":
+    main()
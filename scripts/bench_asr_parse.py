@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_asr_parse.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): ASR响应解析基准 - 旧版逐步切片解析 vs memoryview延迟解码解析
+# =============================================================
+
+"""
+ASR响应解析基准
+
+对照:
+    - legacy:      旧版 parse_response（逐步切片、gzip解压并完整json.loads）
+    - lazy/头部:   新版解析，仅访问 code / is_last_package（不解压、不解析JSON）
+    - lazy/完整:   新版解析并访问 payload_msg（当前JSON后端）
+    - lazy/json:   新版解析并访问 payload_msg，强制使用标准库json
+
+语料文件格式：连续的 [4字节大端长度][原始服务端消息]，可用 --corpus 指定抓包语料，
+缺省时按真实会话节奏合成（每200ms一条，utterances逐步增长并周期性固化）。
+
+用法:
+    python3 scripts/bench_asr_parse.py [--corpus responses.bin] [--messages 3000] [--save out.bin]
+"""
+
+import gzip
+import json
+import time
+import struct
+import argparse
+
+import bench_common  # noqa: F401  设置项目路径
+import asr_client
+from asr_client import (
+    ResponseParser, AsrResponse, MessageType, MessageTypeSpecificFlags,
+    SerializationType, CompressionType, ProtocolVersion,
+)
+
+SAMPLE_WORDS = "今天 我们 讨论 一下 下一页 的 季度 预算 安排 好的 Thank you next slide please".split()
+
+
+def legacy_parse(msg):
+    """旧版解析逻辑，作为对照基线"""
+    response = AsrResponse()
+    header_size = msg[0] & 0x0f
+    message_type = msg[1] >> 4
+    message_type_specific_flags = msg[1] & 0x0f
+    serialization_method = msg[2] >> 4
+    message_compression = msg[2] & 0x0f
+    payload = msg[header_size*4:]
+    if message_type_specific_flags & 0x01:
+        response.payload_sequence = struct.unpack('>i', payload[:4])[0]
+        payload = payload[4:]
+    if message_type_specific_flags & 0x02:
+        response.is_last_package = True
+    if message_type_specific_flags & 0x04:
+        response.event = struct.unpack('>i', payload[:4])[0]
+        payload = payload[4:]
+    if message_type == MessageType.SERVER_FULL_RESPONSE:
+        response.payload_size = struct.unpack('>I', payload[:4])[0]
+        payload = payload[4:]
+    elif message_type == MessageType.SERVER_ERROR_RESPONSE:
+        response.code = struct.unpack('>i', payload[:4])[0]
+        response.payload_size = struct.unpack('>I', payload[4:8])[0]
+        payload = payload[8:]
+    if not payload:
+        return response
+    if message_compression == CompressionType.GZIP:
+        payload = gzip.decompress(payload)
+    if serialization_method == SerializationType.JSON:
+        response.payload_msg = json.loads(payload.decode('utf-8'))
+    return response
+
+
+def synth_corpus(n_messages):
+    """合成服务端响应序列：当前分句逐步增长，约每3秒固化一句"""
+    corpus = []
+    utterances = []
+    current = []
+    t_ms = 0
+    for seq in range(1, n_messages + 1):
+        t_ms += 200
+        current.append(SAMPLE_WORDS[seq % len(SAMPLE_WORDS)])
+        definite = len(current) >= 15
+        utterances = utterances[-1:] if definite else utterances
+        live = {"text": "".join(current), "definite": definite,
+                "start_time": t_ms - 200 * len(current), "end_time": t_ms,
+                "words": [{"text": w, "start_time": t_ms, "end_time": t_ms} for w in current]}
+        body = {"result": {"text": "".join(u["text"] for u in utterances) + live["text"],
+                           "utterances": utterances + [live]},
+                "audio_info": {"duration": t_ms}}
+        if definite:
+            utterances = [live]
+            current = []
+        payload = gzip.compress(json.dumps(body, ensure_ascii=False).encode('utf-8'))
+        header = bytes([(ProtocolVersion.V1 << 4) | 1,
+                        (MessageType.SERVER_FULL_RESPONSE << 4) | MessageTypeSpecificFlags.POS_SEQUENCE,
+                        (SerializationType.JSON << 4) | CompressionType.GZIP, 0])
+        corpus.append(header + struct.pack('>iI', seq, len(payload)) + payload)
+    return corpus
+
+
+def load_corpus(path):
+    corpus = []
+    with open(path, 'rb') as f:
+        data = f.read()
+    offset = 0
+    while offset < len(data):
+        (size,) = struct.unpack_from('>I', data, offset)
+        corpus.append(data[offset + 4:offset + 4 + size])
+        offset += 4 + size
+    return corpus
+
+
+def save_corpus(path, corpus):
+    with open(path, 'wb') as f:
+        for msg in corpus:
+            f.write(struct.pack('>I', len(msg)) + msg)
+
+
+def run(corpus, parse, touch_payload, rounds):
+    start = time.perf_counter_ns()
+    for _ in range(rounds):
+        for msg in corpus:
+            response = parse(msg)
+            if response.code != 0 or response.is_last_package:
+                pass
+            if touch_payload:
+                response.payload_msg
+    return (time.perf_counter_ns() - start) / (rounds * len(corpus))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR响应解析基准")
+    parser.add_argument('--corpus', help="抓包语料文件，缺省时合成")
+    parser.add_argument('--messages', type=int, default=3000, help="合成语料消息数")
+    parser.add_argument('--rounds', type=int, default=3, help="重复轮数")
+    parser.add_argument('--save', help="将合成语料保存到文件")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else synth_corpus(args.messages)
+    if args.save:
+        save_corpus(args.save, corpus)
+    for msg in corpus[:50]:
+        assert ResponseParser.parse_response(msg).to_dict() == legacy_parse(msg).to_dict()
+
+    backend = asr_client._json_loads.__module__
+    print(f"语料: {len(corpus)} 条, 平均 {sum(map(len, corpus)) / len(corpus):.0f} 字节, JSON后端: {backend}")
+    print(f"{'实现':<16}{'ns/条':>12}")
+    print(f"{'legacy':<16}{run(corpus, legacy_parse, False, args.rounds):>12.0f}")
+    print(f"{'lazy/头部':<16}{run(corpus, ResponseParser.parse_response, False, args.rounds):>12.0f}")
+    print(f"{'lazy/完整':<16}{run(corpus, ResponseParser.parse_response, True, args.rounds):>12.0f}")
+    original_loads, asr_client._json_loads = asr_client._json_loads, json.loads
+    try:
+        print(f"{'lazy/json':<16}{run(corpus, ResponseParser.parse_response, True, args.rounds):>12.0f}")
+    finally:
+        asr_client._json_loads = original_loads
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_asr_prewarm.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): ASR预热连接基准 - 首个中间结果耗时（预热 vs 现场建连）
+# =============================================================
+
+"""
+ASR预热连接基准
+
+本地ASR替身服务器注入握手延迟（模拟DNS+TCP+TLS+WebSocket升级），按实时节奏运行若干会话：
+    - cold:      不启动预热任务，每次 acquire 现场建连
+    - prewarmed: 启动 AsrStandbyManager，会话间隔内后台补充待命连接
+另外验证待命连接在服务端等包超时之前会被替换（空闲时间 > 超时时间后仍可立即使用）。
+
+用法:
+    python3 scripts/bench_asr_prewarm.py [--connect-latency-ms 300] [--sessions 5]
+"""
+
+import asyncio
+import argparse
+import logging
+
+from bench_common import load_speech_pcm
+from asr_client import AsrStandbyManager, ASR_SAMPLE_RATE
+from mock_asr_server import MockASRServer
+
+CHUNK_MS = 200
+
+
+async def realtime_audio(pcm):
+    chunk_bytes = ASR_SAMPLE_RATE * 2 * CHUNK_MS // 1000
+    for offset in range(0, len(pcm), chunk_bytes):
+        yield pcm[offset:offset + chunk_bytes], offset + chunk_bytes >= len(pcm)
+        await asyncio.sleep(CHUNK_MS / 1000)
+
+
+async def run_sessions(manager, pcm, sessions, gap_s):
+    for _ in range(sessions):
+        asr = await manager.acquire()
+        async with asr:
+            await asr.run(realtime_audio(pcm))
+        await asyncio.sleep(gap_s)
+
+
+async def bench(args):
+    pcm = load_speech_pcm(None, 1.0, ASR_SAMPLE_RATE)
+    async with MockASRServer(connect_latency_ms=args.connect_latency_ms,
+                             packet_timeout_ms=args.packet_timeout_ms) as server:
+        cold = AsrStandbyManager(ws_url=server.url)
+        await run_sessions(cold, pcm, args.sessions, 0.1)
+
+        warm = AsrStandbyManager(standby_ttl=args.packet_timeout_ms / 1000 * 0.6, ws_url=server.url)
+        await warm.start()
+        await asyncio.sleep(args.connect_latency_ms / 1000 * 2)
+        await run_sessions(warm, pcm, args.sessions, args.connect_latency_ms / 1000 * 2)
+        # 空闲超过服务端等包超时，待命连接应已被替换
+        await asyncio.sleep(args.packet_timeout_ms / 1000 * 1.5)
+        await run_sessions(warm, pcm, 1, 0)
+        await warm.close()
+
+    print(f"注入握手延迟 {args.connect_latency_ms}ms, 服务端等包超时 {args.packet_timeout_ms}ms")
+    for name, manager in (('cold', cold), ('prewarmed', warm)):
+        for kind, values in manager.first_partial_ms.items():
+            if values:
+                print(f"{name:<10}{kind:<10} 首个中间结果 平均 {sum(values) / len(values):7.1f}ms"
+                      f"  最大 {max(values):7.1f}ms  ({len(values)}次)")
+    print(f"替身服务器会话: {len(server.sessions)}，"
+          f"等包超时关闭: {sum(1 for s in server.sessions if s.end_reason == 45000081)}")
+    assert len(warm.first_partial_ms['prewarmed']) == args.sessions + 1, warm.first_partial_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR预热连接基准")
+    parser.add_argument('--connect-latency-ms', type=int, default=300, help="注入的握手延迟")
+    parser.add_argument('--packet-timeout-ms', type=int, default=3000, help="替身服务器等包超时")
+    parser.add_argument('--sessions', type=int, default=5, help="每种模式的会话数")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
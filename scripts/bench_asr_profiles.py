@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_asr_profiles.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): ASR延迟档位基准 - 各档位的首个结果延迟、分句固化延迟与消息量
+# =============================================================
+
+"""
+ASR延迟档位基准
+
+按实时节奏（20ms采集块）为每个延迟档位运行一次会话，统计：
+    - 首个结果：首块音频采集到首个带文本响应的耗时
+    - 固化延迟：分句结束处音频被采集到收到该分句 UtteranceFinalized 的耗时（p50/p95）
+    - 响应数、上行帧数
+缺省连接本地ASR替身服务器（按服务地址和请求参数模拟各档位行为，数值仅用于相对比较）；
+加 --real 时使用已配置的火山ASR凭据连接各档位的真实服务地址，此时需提供 --wav 真实录音。
+
+用法:
+    python3 scripts/bench_asr_profiles.py [--seconds 15] [--latency-ms 50]
+    python3 scripts/bench_asr_profiles.py --real --wav meeting.wav
+"""
+
+import time
+import asyncio
+import argparse
+import logging
+
+from bench_common import load_speech_pcm, percentile
+from asr_client import (
+    VolcanoASRClientAsync, UtteranceFinalized, ASR_PROFILES, ASR_SAMPLE_RATE,
+)
+from mock_asr_server import MockASRServer
+
+CAPTURE_MS = 20
+
+
+async def run_profile(pcm, profile, ws_url):
+    stats = {'first_result_ms': None, 'finalize_ms': [], 'responses': 0}
+    capture = {'start': None}
+
+    def captured_at(audio_ms):
+        """会话时间 audio_ms 处的音频被采集的墙钟时间"""
+        return capture['start'] + (audio_ms - CAPTURE_MS) / 1000
+
+    def on_result(response):
+        stats['responses'] += 1
+        if stats['first_result_ms'] is None and response.payload_msg:
+            if (response.payload_msg.get('result') or {}).get('text'):
+                stats['first_result_ms'] = (time.perf_counter() - captured_at(CAPTURE_MS)) * 1000
+
+    async def audio_generator():
+        chunk_bytes = ASR_SAMPLE_RATE * 2 * CAPTURE_MS // 1000
+        capture['start'] = time.perf_counter()
+        for index, offset in enumerate(range(0, len(pcm), chunk_bytes)):
+            await asyncio.sleep(max(0.0, capture['start'] + index * CAPTURE_MS / 1000 - time.perf_counter()))
+            yield pcm[offset:offset + chunk_bytes], offset + chunk_bytes >= len(pcm)
+
+    async def consume(events):
+        async for event in events:
+            if isinstance(event, UtteranceFinalized):
+                end_ms = event.utterance.get('end_time')
+                if isinstance(end_ms, (int, float)):
+                    stats['finalize_ms'].append((time.perf_counter() - captured_at(end_ms)) * 1000)
+
+    client = VolcanoASRClientAsync(on_result=on_result, ws_url=ws_url, profile=profile)
+    events_task = asyncio.create_task(consume(client.events()))
+    async with client as asr:
+        await asr.run(audio_generator())
+    await events_task
+    stats['frames'] = client.frames_sent
+    return stats
+
+
+async def bench(args):
+    pcm = load_speech_pcm(args.wav, args.seconds, ASR_SAMPLE_RATE)
+    audio_s = len(pcm) / 2 / ASR_SAMPLE_RATE
+    target = "火山ASR真实服务" if args.real else f"本地替身服务器（注入延迟 {args.latency_ms}ms）"
+    print(f"样本: {audio_s:.1f}s 实时发送, {target}")
+    print(f"{'档位':<15}{'服务地址':<20}{'首个结果ms':>11}{'固化p50':>9}{'固化p95':>9}{'响应数':>8}{'上行帧':>8}")
+    server = None if args.real else MockASRServer(response_latency_ms=args.latency_ms)
+    if server:
+        await server.start()
+    try:
+        for profile, config in ASR_PROFILES.items():
+            url = None if args.real else server.url_for(config['endpoint'])
+            stats = await run_profile(pcm, profile, url)
+            first = stats['first_result_ms']
+            print(f"{profile:<15}{config['endpoint']:<20}{first if first is not None else float('nan'):>11.0f}"
+                  f"{percentile(stats['finalize_ms'], 50):>9.0f}{percentile(stats['finalize_ms'], 95):>9.0f}"
+                  f"{stats['responses']:>8}{stats['frames']:>8}")
+    finally:
+        if server:
+            await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR延迟档位基准")
+    parser.add_argument('--wav', help="16bit WAV录音，缺省时使用合成语音")
+    parser.add_argument('--seconds', type=float, default=15.0, help="合成语音时长(秒)")
+    parser.add_argument('--latency-ms', type=int, default=50, help="替身服务器每条响应的注入延迟")
+    parser.add_argument('--real', action='store_true', help="连接真实火山ASR服务")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.CRITICAL)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_asr_reconnect.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): ASR会话中断线重连基准 - 断连/错误码后重放音频，校验分句连续性与中断耗时
+# =============================================================
+
+"""
+ASR会话中断线重连基准
+
+本地ASR替身服务器仅在第一个会话中注入故障（fail_sessions=1），客户端应自动重连并重放
+重放缓冲中尚未固化的音频，最终得到一份时间连续、无重复的分句记录：
+    - disconnect:  中途断开TCP连接
+    - err45000081: 等包超时
+    - err55000031: 服务器繁忙
+
+用法:
+    python3 scripts/bench_asr_reconnect.py [--seconds 20] [--fail-at 0.5]
+"""
+
+import time
+import asyncio
+import argparse
+import logging
+
+from bench_common import load_speech_pcm
+from asr_client import VolcanoASRClientAsync, ASR_SAMPLE_RATE
+from mock_asr_server import MockASRServer
+
+CHUNK_MS = 200
+
+
+async def run_session(url, pcm):
+    definite = {}
+    stats = {'last': False, 'codes': set()}
+
+    def on_result(response):
+        if response.code:
+            stats['codes'].add(response.code)
+        if response.is_last_package:
+            stats['last'] = True
+        result = (response.payload_msg or {}).get('result') or {}
+        for utt in result.get('utterances', []):
+            if utt.get('definite'):
+                definite[(utt['start_time'], utt['end_time'])] = utt['text']
+
+    async def audio_generator():
+        chunk_bytes = ASR_SAMPLE_RATE * 2 * CHUNK_MS // 1000
+        for offset in range(0, len(pcm), chunk_bytes):
+            yield pcm[offset:offset + chunk_bytes], offset + chunk_bytes >= len(pcm)
+
+    start = time.perf_counter()
+    client = VolcanoASRClientAsync(on_result=on_result, ws_url=url)
+    client.reconnect_delay = 0.05
+    async with client as asr:
+        await asr.run(audio_generator())
+    stats['wall_s'] = time.perf_counter() - start
+    stats['utterances'] = sorted(definite)
+    stats.update(client.reconnect_stats())
+    return stats
+
+
+def check_continuous(spans, audio_ms):
+    """分句首尾相接、无重叠无缺口，且覆盖到音频末尾"""
+    position = 0
+    for start, end in spans:
+        assert start == position, f"分句不连续: 期望起点 {position}, 实际 {start}-{end}"
+        position = end
+    assert position == audio_ms, f"分句未覆盖到末尾: {position} / {audio_ms}"
+
+
+async def bench(args):
+    pcm = load_speech_pcm(args.wav, args.seconds, ASR_SAMPLE_RATE)
+    audio_ms = len(pcm) // 2 * 1000 // ASR_SAMPLE_RATE
+    fail_ms = int(audio_ms * args.fail_at)
+    scenarios = [
+        ('disconnect', {'disconnect_after_ms': fail_ms}),
+        ('err45000081', {'error_code': 45000081, 'error_after_ms': fail_ms}),
+        ('err55000031', {'error_code': 55000031, 'error_after_ms': fail_ms}),
+    ]
+    print(f"样本: {audio_ms / 1000:.1f}s, 故障注入于 {fail_ms}ms")
+    print(f"{'场景':<14}{'重连次数':>8}{'中断ms':>10}{'丢失ms':>8}{'分句数':>8}{'墙钟s':>8}  结果")
+    for name, options in scenarios:
+        async with MockASRServer(fail_sessions=1, **options) as server:
+            stats = await run_session(server.url, pcm)
+            sessions = len(server.sessions)
+        check_continuous(stats['utterances'], audio_ms)
+        assert stats['last'] and stats['reconnects'] == 1 and sessions == 2, (stats, sessions)
+        gap = sum(stats['gap_ms']) / max(len(stats['gap_ms']), 1)
+        print(f"{name:<14}{stats['reconnects']:>8}{gap:>10.1f}{stats['lost_audio_ms']:>8.0f}"
+              f"{len(stats['utterances']):>8}{stats['wall_s']:>8.2f}  分句连续，转写完整")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ASR会话中断线重连基准")
+    parser.add_argument('--wav', help="16bit WAV录音，缺省时使用合成语音")
+    parser.add_argument('--seconds', type=float, default=20.0, help="合成语音时长(秒)")
+    parser.add_argument('--fail-at', type=float, default=0.5, help="故障注入位置（占音频时长比例）")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.CRITICAL)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_asr_vad.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 客户端VAD门控基准 - 上行音频比例、分句固化延迟、首字是否被截、静音关闭后重新建连
+# =============================================================
+
+"""
+客户端VAD门控基准
+
+合成一段“对话”：若干轮说话（合成语音，轮内有短停顿），轮与轮之间是数秒低电平底噪。
+按实时节奏（200ms采集块，与 audio_stream_generator 一致）同时运行以下配置，
+每个配置连接一个按音频能量分句的本地ASR替身服务器（静音达到判停窗口后固化分句）：
+    - off:            不启用VAD，全部上行
+    - vad:            VAD门控，拖尾静音 = 判停窗口 + 200ms，静音期间每2秒100ms保活帧
+    - vad_idle:       同上，静音超过5秒关闭连接，说话时重新建连（替身服务器握手注入150ms）
+    - short_hangover: 拖尾静音仅300ms（短于判停窗口），演示分句合并、固化推迟的问题
+
+统计：上行（计费）音频时长与比例、固化分句数、固化延迟 p50/p95（分句结束处音频被采集到收到
+UtteranceFinalized 的耗时，分句时间经 VadGate.capture_ms 换算回采集时间）、分句起点相对 off 的偏移
+（检查预卷是否保住首字）、重新建连次数与耗时。
+
+用法:
+    python3 scripts/bench_asr_vad.py [--turns 6] [--seed 0]
+"""
+
+import time
+import asyncio
+import argparse
+import logging
+
+import numpy as np
+
+from bench_common import synth_speech_pcm, percentile
+from asr_client import VolcanoASRClientAsync, UtteranceFinalized, ASR_SAMPLE_RATE
+from mock_asr_server import MockASRServer
+
+CAPTURE_MS = 200
+SPEECH_THRESHOLD = 300   # 替身服务器能量分句阈值（10ms帧RMS），合成语音数千、底噪约30
+CONNECT_LATENCY_MS = 150
+CONFIGS = ('off', 'vad', 'vad_idle', 'short_hangover')
+
+
+def build_conversation(turns, seed):
+    """轮间静音2-8秒底噪，每轮2-5秒合成语音"""
+    rng = np.random.default_rng(seed)
+    parts = []
+    for turn in range(turns):
+        silence = rng.standard_normal(int(ASR_SAMPLE_RATE * rng.uniform(2, 8))) * 30
+        parts.append(silence.astype('<i2').tobytes())
+        parts.append(synth_speech_pcm(rng.uniform(2, 5), ASR_SAMPLE_RATE, seed=seed * 100 + turn))
+    parts.append((rng.standard_normal(ASR_SAMPLE_RATE * 2) * 30).astype('<i2').tobytes())
+    return b"".join(parts)
+
+
+def make_client(config, ws_url):
+    if config == 'off':
+        return VolcanoASRClientAsync(ws_url=ws_url, vad=False)
+    client = VolcanoASRClientAsync(ws_url=ws_url, vad=True)
+    gate = client.vad_gate
+    if config == 'vad_idle':
+        gate.idle_close_ms = 5000
+    elif config == 'short_hangover':
+        gate.hangover_ms = 300
+    return client
+
+
+async def run_config(config, pcm):
+    server = MockASRServer(partial_interval_ms=200, speech_threshold=SPEECH_THRESHOLD,
+                           connect_latency_ms=CONNECT_LATENCY_MS)
+    await server.start()
+    client = make_client(config, server.url_for('bigmodel_async'))
+    client.max_reconnects = 0
+    finals = []
+    capture = {'start': None}
+
+    def to_capture(ms):
+        return client.vad_gate.capture_ms(ms) if client.vad_gate else ms
+
+    async def audio_generator():
+        chunk_bytes = ASR_SAMPLE_RATE * 2 * CAPTURE_MS // 1000
+        capture['start'] = time.perf_counter()
+        for index, offset in enumerate(range(0, len(pcm), chunk_bytes)):
+            await asyncio.sleep(max(0.0, capture['start'] + (index + 1) * CAPTURE_MS / 1000 - time.perf_counter()))
+            yield pcm[offset:offset + chunk_bytes], offset + chunk_bytes >= len(pcm)
+
+    async def consume(events):
+        async for event in events:
+            if isinstance(event, UtteranceFinalized):
+                utt = event.utterance
+                start, end = to_capture(utt['start_time']), to_capture(utt['end_time'])
+                finals.append((start, end, (time.perf_counter() - capture['start'] - end / 1000) * 1000))
+
+    events_task = asyncio.create_task(consume(client.events()))
+    try:
+        async with client as asr:
+            await asr.run(audio_generator())
+        await events_task
+    finally:
+        await server.stop()
+    billed_ms = sum(session.audio_ms for session in server.sessions)
+    return {'finals': finals, 'billed_ms': billed_ms, 'sessions': len(server.sessions),
+            'vad': client.vad_stats()}
+
+
+async def bench(args):
+    pcm = build_conversation(args.turns, args.seed)
+    audio_ms = len(pcm) / 2 / ASR_SAMPLE_RATE * 1000
+    print(f"对话样本: {audio_ms / 1000:.1f}s（{args.turns}轮），实时发送，各配置并行运行")
+    results = dict(zip(CONFIGS, await asyncio.gather(*(run_config(config, pcm) for config in CONFIGS))))
+
+    reference = results['off']['finals']
+    print(f"{'配置':<16}{'上行s':>7}{'比例':>7}{'分句':>6}{'固化p50ms':>11}{'固化p95ms':>11}"
+          f"{'起点偏移ms':>12}{'连接数':>7}  重新建连ms")
+    for config in CONFIGS:
+        result = results[config]
+        finals = result['finals']
+        latencies = [latency for _, _, latency in finals]
+        if len(finals) == len(reference):
+            shift = max(abs(start - ref[0]) for (start, _, _), ref in zip(finals, reference))
+            shift_text = f"{shift:.0f}"
+        else:
+            shift_text = "分句数不同"
+        reopen = result['vad'].get('reopen_ms', [])
+        print(f"{config:<16}{result['billed_ms'] / 1000:>7.1f}{result['billed_ms'] / audio_ms:>7.0%}"
+              f"{len(finals):>6}{percentile(latencies, 50):>11.0f}{percentile(latencies, 95):>11.0f}"
+              f"{shift_text:>12}{result['sessions']:>7}  {' '.join(f'{ms:.0f}' for ms in reopen) or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="客户端VAD门控基准")
+    parser.add_argument('--turns', type=int, default=6, help="说话轮数")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
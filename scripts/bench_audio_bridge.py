@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_audio_bridge.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 采集线程到事件循环的桥接基准 - 每帧唤醒延迟、线程数、取消后残留线程
+# =============================================================
+
+"""
+采集线程到事件循环的桥接基准（不需要声卡）
+
+模拟采集线程按固定间隔发布帧，asyncio 消费者取帧，对比三种桥接方式：
+    - queue:    旧版 queue.Queue + run_in_executor(queue.get)，每帧占用一个线程池线程
+    - executor: AudioHub 线程订阅 + run_in_executor(sub.get)
+    - async:    AudioHub.subscribe_async，call_soon_threadsafe 唤醒事件循环（audio_stream_generator 当前做法）
+
+统计：
+    - 唤醒延迟：publish 到消费者拿到帧的耗时 p50/p99/max
+    - 线程数：运行期间进程线程数峰值（不含采集线程本身的基线）
+    - 取消：消费者在等待帧时被取消（如界面停止识别），0.2秒后仍阻塞在取帧上的线程数
+
+用法:
+    python3 scripts/bench_audio_bridge.py [--frames 1000] [--interval-ms 5]
+"""
+
+import time
+import queue
+import asyncio
+import argparse
+import threading
+
+import bench_common  # noqa: F401  (设置项目路径)
+from audio_hub import AudioHub
+
+FRAME = bytes(2048)
+MODES = ('queue', 'executor', 'async')
+
+
+class Source:
+    """模拟采集：queue 模式放入 queue.Queue，其余模式经 AudioHub 广播"""
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.queue = queue.Queue()
+        self.hub = AudioHub()
+        self.sent_at = {}
+
+    def publish(self, seq):
+        self.sent_at[seq] = time.perf_counter()
+        if self.mode == 'queue':
+            self.queue.put((seq, FRAME))
+        else:
+            self.hub.publish(FRAME)
+
+    def close(self):
+        if self.mode == 'queue':
+            self.queue.put(None)
+        else:
+            self.hub.close()
+
+    def reader(self):
+        """返回 (取帧协程函数, 取消订阅函数)，须在事件循环中调用"""
+        loop = asyncio.get_running_loop()
+        if self.mode == 'queue':
+            return (lambda: loop.run_in_executor(None, self.queue.get)), (lambda: None)
+        if self.mode == 'executor':
+            sub = self.hub.subscribe('asr', max_frames=512)
+            return (lambda: loop.run_in_executor(None, sub.get)), sub.close
+        sub = self.hub.subscribe_async('asr', max_frames=512)
+        return sub.get, sub.close
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run_latency(mode, frames, interval_ms):
+    source = Source(mode)
+    latencies = []
+    peak_threads = 0
+    ready = threading.Event()
+
+    def capture():
+        ready.wait()
+        start = time.perf_counter()
+        for seq in range(1, frames + 1):
+            delay = start + seq * interval_ms / 1000 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            source.publish(seq)
+        source.close()
+
+    async def consumer():
+        nonlocal peak_threads
+        get, _ = source.reader()
+        ready.set()
+        seq = 0
+        while True:
+            item = await get()
+            now = time.perf_counter()
+            if item is None:
+                return
+            seq += 1
+            latencies.append((now - source.sent_at[seq]) * 1e6)
+            peak_threads = max(peak_threads, threading.active_count())
+
+    baseline = threading.active_count()
+    thread = threading.Thread(target=capture)
+    thread.start()
+    asyncio.run(consumer())
+    thread.join()
+    assert len(latencies) == frames, f"{mode}: 收到 {len(latencies)}/{frames} 帧"
+    # 基线 + 采集线程之外的线程都是桥接占用的
+    return latencies, max(0, peak_threads - baseline - 1)
+
+
+def run_cancel(mode):
+    """消费者等待帧时被取消，返回 0.2 秒后仍阻塞在取帧上的线程数"""
+    source = Source(mode)
+    loop = asyncio.new_event_loop()
+
+    async def generator():
+        get, close = source.reader()
+        try:
+            while await get() is not None:
+                pass
+        finally:
+            close()
+
+    async def main():
+        task = asyncio.create_task(generator())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(0.2)
+        executor = loop._default_executor
+        if executor is None:
+            return 0
+        # 线程池线程总数减去空闲线程数，即仍在执行（阻塞在取帧上）的线程
+        return len(executor._threads) - executor._idle_semaphore._value
+
+    busy = loop.run_until_complete(main())
+    # 旧版需要放入结束标记才能释放阻塞的线程，否则 shutdown_default_executor 会一直等待
+    source.close()
+    loop.run_until_complete(loop.shutdown_default_executor())
+    loop.close()
+    return busy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="采集线程到事件循环的桥接基准")
+    parser.add_argument('--frames', type=int, default=1000, help="发布帧数")
+    parser.add_argument('--interval-ms', type=float, default=5.0, help="发布间隔（实际采集约64ms/帧）")
+    args = parser.parse_args()
+
+    print(f"{args.frames} 帧，间隔 {args.interval_ms}ms")
+    print(f"{'方式':<10}{'p50 µs':>9}{'p99 µs':>9}{'max µs':>9}{'桥接线程':>10}{'取消后阻塞线程':>16}")
+    for mode in MODES:
+        latencies, threads = run_latency(mode, args.frames, args.interval_ms)
+        stuck = run_cancel(mode)
+        print(f"{mode:<10}{percentile(latencies, 0.5):>9.0f}{percentile(latencies, 0.99):>9.0f}"
+              f"{max(latencies):>9.0f}{threads:>10}{stuck:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_audio_engine.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 进程级 PortAudio 引擎基准 - Mic ON 到首帧耗时（每次新建 PyAudio vs 常驻引擎）、关闭耗时、设备插拔切换
+# =============================================================
+
+"""
+进程级 PortAudio 引擎基准（需要 pyaudio 和可用的输入设备）
+
+    - 旧方式：每次 Mic ON 新建 PyAudio（初始化PortAudio并枚举设备）→ 打开采集流 → 首个回调，
+      关闭时停止流并 terminate
+    - 常驻引擎：AudioEngine 初始化一次（应用启动时后台进行，单独计时），之后每次
+      AudioStream(...).start() 到首帧经 hub 送达订阅者，以及 stop 耗时
+    - 插拔（--hotswap 秒数）：持续采集期间手动拔出并重新插入USB麦克风，统计重新打开次数、
+      帧间最大间隔，采集对象和 hub 全程不重建
+
+用法:
+    python3 scripts/bench_audio_engine.py [--cycles 10] [--device 序号] [--hotswap 30]
+"""
+
+import time
+import threading
+import argparse
+import statistics
+
+import pyaudio
+
+import bench_common  # noqa: F401  (设置项目路径)
+from bench_common import percentile
+from audio_engine import get_audio_engine
+from audio_capture_pyaudio import AudioStream
+
+
+def cold_cycle(device):
+    """旧方式：一次 Mic ON/OFF，返回 (首帧ms, 关闭ms)"""
+    first = threading.Event()
+
+    def callback(in_data, frame_count, time_info, status):
+        first.set()
+        return (None, pyaudio.paContinue)
+
+    start = time.perf_counter()
+    pa = pyaudio.PyAudio()
+    info = pa.get_default_input_device_info() if device is None else pa.get_device_info_by_index(device)
+    rate = int(info['defaultSampleRate'])
+    stream = pa.open(format=pyaudio.paInt16, channels=1, rate=rate, input=True, input_device_index=info['index'],
+                     frames_per_buffer=1024 * rate // 16000, stream_callback=callback)
+    stream.start_stream()
+    if not first.wait(5):
+        raise RuntimeError("5s 内没有收到采集回调")
+    first_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    stream.stop_stream()
+    stream.close()
+    pa.terminate()
+    return first_ms, (time.perf_counter() - start) * 1000
+
+
+def engine_cycle(device):
+    """常驻引擎：一次 Mic ON/OFF，首帧以订阅者收到为准"""
+    start = time.perf_counter()
+    audio = AudioStream(input_device_index=device)
+    sub = audio.subscribe('bench')
+    audio.start()
+    if sub.get(timeout=5) is None:
+        raise RuntimeError("5s 内没有收到采集帧")
+    first_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    audio.stop()
+    stop_ms = (time.perf_counter() - start) * 1000
+    return first_ms, stop_ms, audio.first_frame_ms
+
+
+def report(label, values):
+    print(f"  {label:<26} p50 {percentile(values, 50):7.1f}ms  p95 {percentile(values, 95):7.1f}ms  "
+          f"max {max(values):7.1f}ms")
+
+
+def hotswap(device, seconds):
+    audio = AudioStream(input_device_index=device)
+    sub = audio.subscribe('bench', max_frames=4096)
+    audio.start()
+    print(f"采集 {seconds:g}s，设备 {audio.device_name}：请在期间拔出并重新插入USB麦克风")
+    frames, gaps, last = 0, [], None
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        item = sub.get(timeout=0.5)
+        if item is None:
+            continue
+        now = time.monotonic()
+        if last is not None:
+            gaps.append((now - last) * 1000)
+        last = now
+        frames += 1
+    audio.stop()
+    if len(gaps) < 2:
+        raise RuntimeError("采集期间没有收到足够的帧")
+    print(f"  帧数 {frames}，重新打开 {audio.device_switches} 次，帧间隔中位数 {statistics.median(gaps):.0f}ms，"
+          f"最大 {max(gaps):.0f}ms（同一 AudioStream 和 hub，订阅未中断）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="进程级 PortAudio 引擎基准")
+    parser.add_argument('--cycles', type=int, default=10, help="Mic ON/OFF 次数")
+    parser.add_argument('--device', type=int, default=None, help="输入设备序号，缺省为默认输入设备")
+    parser.add_argument('--hotswap', type=float, default=0, help="插拔测试的采集秒数，0 为不测")
+    args = parser.parse_args()
+
+    cold = [cold_cycle(args.device) for _ in range(args.cycles)]
+    print(f"旧方式（每次新建 PyAudio），{args.cycles} 次")
+    report("Mic ON 到首个回调", [first for first, _ in cold])
+    report("关闭（含 terminate）", [stop for _, stop in cold])
+
+    engine = get_audio_engine()
+    engine.start_background()
+    engine.wait_ready()
+    print(f"常驻引擎：初始化一次 {engine.init_ms:.0f}ms（应用启动时后台进行），"
+          f"输入设备 {len(engine.input_devices())} 个")
+    warm = [engine_cycle(args.device) for _ in range(args.cycles)]
+    report("Mic ON 到订阅者收到首帧", [first for first, _, _ in warm])
+    report("start 到首帧广播", [first for _, _, first in warm])
+    report("stop", [stop for _, stop, _ in warm])
+
+    if args.hotswap:
+        hotswap(args.device, args.hotswap)
+
+
+if __name__ == "__main__":
+    main()
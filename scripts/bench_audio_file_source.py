@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_audio_file_source.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 录音文件回放音频源基准 - 实时/倍速/不限速的节奏精度、输出校验、驱动ASR端到端
+# =============================================================
+
+"""
+录音文件回放音频源基准（不需要声卡）
+
+把一段语音写成临时文件（16kHz单声道WAV、44.1kHz立体声WAV、16kHz原始PCM），由 FileAudioStream 回放：
+    - 节奏：1x / 4x / 不限速下每个200ms块送出时刻相对“该块录制完成”时刻的偏差 p50/p99/max，
+      总耗时与 音频时长/倍速 的比值。块由1024帧（64ms）回调块拼成，偏差含最多64ms的块粒度，与麦克风一致
+    - 输出：16kHz单声道文件逐字节一致；44.1kHz立体声经 PolyphaseResampler 转换后长度正确；
+      hub 订阅者收到的音频与生成器一致
+    - 端到端：回放驱动 VolcanoASRClientAsync 连接本地ASR替身服务器，统计耗时、固化分句数，
+      校验服务器收到的音频时长等于文件时长
+
+用法:
+    python3 scripts/bench_audio_file_source.py [--seconds 10] [--wav 录音.wav]
+"""
+
+import time
+import wave
+import asyncio
+import argparse
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from bench_common import load_speech_pcm, percentile
+from audio_capture_file import FileAudioStream
+from asr_client import VolcanoASRClientAsync, UtteranceFinalized
+from mock_asr_server import MockASRServer
+from resampler import PolyphaseResampler
+
+CHUNK_MS = 200
+RATE = 16000
+
+
+def write_wav(path, pcm, rate, channels):
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(pcm)
+
+
+def make_files(directory, pcm):
+    mono = directory / 'mono16k.wav'
+    write_wav(mono, pcm, RATE, 1)
+    raw = directory / 'mono16k.pcm'
+    raw.write_bytes(pcm)
+    # 44.1kHz立体声：由16kHz语音升采样，右声道衰减
+    upsampler = PolyphaseResampler(RATE, 44100)
+    up = np.frombuffer(upsampler.process(pcm) + upsampler.flush(), dtype='<i2')
+    stereo = np.stack([up, (up * 0.8).astype('<i2')], axis=1)
+    stereo_path = directory / 'stereo44k.wav'
+    write_wav(stereo_path, stereo.tobytes(), 44100, 2)
+    return mono, raw, stereo_path
+
+
+async def replay(source):
+    """返回 (输出PCM, 每块 (送出时刻, 已送出音频ms), 总耗时)"""
+    out = bytearray()
+    arrivals = []
+    start = time.perf_counter()
+    async for pcm, is_last in source.audio_stream_generator(CHUNK_MS):
+        out += pcm
+        arrivals.append((time.perf_counter() - start, len(out) / 2 / RATE * 1000))
+    return bytes(out), arrivals, time.perf_counter() - start
+
+
+async def pacing(path, duration_ms):
+    print(f"节奏（{duration_ms / 1000:.1f}s音频，{CHUNK_MS}ms块）")
+    print(f"{'倍速':<8}{'偏差p50ms':>11}{'偏差p99ms':>11}{'偏差maxms':>11}{'总耗时s':>10}{'耗时/期望':>11}")
+    for speed in (1.0, 4.0, 0):
+        _, arrivals, elapsed = await replay(FileAudioStream(path, speed=speed))
+        if speed:
+            # 最后一块（不足200ms的尾部）按文件结束时刻计
+            lags = [(at - audio_ms / 1000 / speed) * 1000 for at, audio_ms in arrivals]
+            expected = duration_ms / 1000 / speed
+            print(f"{f'{speed:g}x':<8}{percentile(lags, 50):>11.1f}{percentile(lags, 99):>11.1f}"
+                  f"{max(lags):>11.1f}{elapsed:>10.2f}{elapsed / expected:>11.3f}")
+        else:
+            print(f"{'不限速':<8}{'-':>11}{'-':>11}{'-':>11}{elapsed:>10.3f}"
+                  f"{f'{duration_ms / 1000 / elapsed:.0f}x实时':>11}")
+
+
+async def outputs(pcm, mono, raw, stereo):
+    got, _, _ = await replay(FileAudioStream(mono, speed=0))
+    assert got == pcm, "16kHz单声道WAV回放输出与文件内容不一致"
+    got, _, _ = await replay(FileAudioStream(raw, speed=0))
+    assert got == pcm, "原始PCM回放输出与文件内容不一致"
+
+    source = FileAudioStream(stereo, speed=0)
+    subscription = source.subscribe('check', max_frames=100000)
+    got, _, _ = await replay(source)
+    published = bytearray()
+    while (item := subscription.get(timeout=0)) is not None:
+        published += item[1]
+    with wave.open(str(stereo), 'rb') as wf:
+        expected_len = -(-wf.getnframes() * RATE // 44100) * 2
+    assert len(got) == expected_len, f"44.1kHz立体声回放输出 {len(got)} 字节，期望 {expected_len}"
+    assert bytes(published) == got, "hub订阅者收到的音频与生成器输出不一致"
+    corr = np.corrcoef(np.frombuffer(got, dtype='<i2')[:len(pcm) // 2],
+                       np.frombuffer(pcm, dtype='<i2')[:len(got) // 2])[0, 1]
+    print(f"输出: 16kHz WAV/原始PCM逐字节一致；44.1kHz立体声→16kHz单声道 {len(got)} 字节，"
+          f"与原语音相关系数 {corr:.4f}；hub订阅者收到的音频一致")
+
+
+async def end_to_end(path, duration_ms):
+    print("端到端（回放驱动ASR客户端 → 本地替身服务器）")
+    print(f"{'倍速':<8}{'耗时s':>8}{'固化分句':>10}{'服务器收到s':>13}")
+    for speed in (4.0, 0):
+        server = MockASRServer(partial_interval_ms=200)
+        await server.start()
+        finals = []
+
+        async def consume(events):
+            async for event in events:
+                if isinstance(event, UtteranceFinalized):
+                    finals.append(event.utterance)
+
+        client = VolcanoASRClientAsync(ws_url=server.url_for('bigmodel_async'))
+        events_task = asyncio.create_task(consume(client.events()))
+        start = time.perf_counter()
+        try:
+            async with client as asr:
+                await asr.run(FileAudioStream(path, speed=speed).audio_stream_generator(CHUNK_MS))
+            await events_task
+        finally:
+            await server.stop()
+        elapsed = time.perf_counter() - start
+        received_ms = sum(session.audio_ms for session in server.sessions)
+        assert abs(received_ms - duration_ms) < 1, f"服务器收到 {received_ms}ms 音频，文件 {duration_ms}ms"
+        label = f'{speed:g}x' if speed else '不限速'
+        print(f"{label:<8}{elapsed:>8.2f}{len(finals):>10}{received_ms / 1000:>13.1f}")
+
+
+async def bench(args):
+    pcm = load_speech_pcm(args.wav, args.seconds, RATE)
+    duration_ms = len(pcm) / 2 / RATE * 1000
+    with tempfile.TemporaryDirectory() as tmp:
+        mono, raw, stereo = make_files(Path(tmp), pcm)
+        await pacing(mono, duration_ms)
+        await outputs(pcm, mono, raw, stereo)
+        await end_to_end(mono, duration_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="录音文件回放音频源基准")
+    parser.add_argument('--seconds', type=float, default=10.0, help="合成语音时长（未指定 --wav 时）")
+    parser.add_argument('--wav', help="16bit WAV录音，缺省使用合成语音")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_audio_hub.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 音频采集中心校验与基准 - 多订阅者不丢帧、不重复，广播开销
+# =============================================================
+
+"""
+音频采集中心校验与基准（不需要声卡）
+
+    - legacy: 旧版两个消费者（_consume 线程 + audio_stream_generator）争抢同一采集队列，统计丢帧
+    - hub:    模拟采集线程发布带序号的帧，四个订阅者同时消费：
+              asr（asyncio 订阅，与 audio_stream_generator 相同）、recorder（close策略）、
+              vad（线程）、meter（慢消费者，小队列 drop_oldest）
+              校验前三者按序收到全部帧、无重复、内容与序号一致，且所有订阅者共享同一块内存；
+              meter 收到的帧序号严格递增且 收到+丢弃 = 总帧数
+    - 广播开销：每帧 publish 的耗时（4个订阅者）
+
+用法:
+    python3 scripts/bench_audio_hub.py [--frames 3000] [--interval-ms 1]
+"""
+
+import time
+import queue
+import struct
+import asyncio
+import argparse
+import threading
+
+import bench_common  # noqa: F401  (设置项目路径)
+from audio_hub import AudioHub
+
+FRAME_BYTES = 2048  # 1024帧 16bit 单声道，与 AudioStream 默认 frames_per_buffer 一致
+
+
+def make_frame(seq):
+    frame = bytearray(FRAME_BYTES)
+    struct.pack_into('>I', frame, 0, seq)
+    struct.pack_into('>I', frame, FRAME_BYTES - 4, seq)
+    return bytes(frame)
+
+
+def legacy_race(frames, interval_ms):
+    """旧版：_consume 线程与生成器同时读取同一队列，_consume 取走的帧交给空的 on_audio 后丢失"""
+    audio_queue = queue.Queue()
+    received = []
+    running = True
+
+    def consume():
+        while running:
+            try:
+                audio_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+    def capture():
+        for seq in range(1, frames + 1):
+            time.sleep(interval_ms / 1000)
+            audio_queue.put(make_frame(seq))
+
+    async def generator():
+        loop = asyncio.get_running_loop()
+        while True:
+            data = await loop.run_in_executor(None, lambda: audio_queue.get(timeout=0.5))
+            received.append(data)
+
+    threads = [threading.Thread(target=consume), threading.Thread(target=capture)]
+    for thread in threads:
+        thread.start()
+    try:
+        asyncio.run(generator())
+    except queue.Empty:
+        pass
+    running = False
+    for thread in threads:
+        thread.join()
+    return len(received)
+
+
+def check_sequence(name, items, frames):
+    seqs = [seq for seq, _ in items]
+    assert seqs == list(range(1, frames + 1)), f"{name}: 丢帧或重复（收到 {len(seqs)} 帧）"
+    for seq, view in items:
+        assert view.readonly, f"{name}: 帧不是只读的"
+        assert struct.unpack_from('>I', view, 0)[0] == seq == struct.unpack_from('>I', view, FRAME_BYTES - 4)[0], \
+            f"{name}: 帧 {seq} 内容不一致"
+
+
+def hub_check(frames, interval_ms):
+    hub = AudioHub()
+    recorder = hub.subscribe('recorder', max_frames=4096, overflow='close')
+    vad = hub.subscribe('vad', max_frames=512)
+    meter = hub.subscribe('meter', max_frames=8)
+    results = {'recorder': [], 'vad': [], 'meter': [], 'asr': []}
+
+    def drain(sub, slow=False):
+        while True:
+            item = sub.get()
+            if item is None:
+                return
+            results[sub.name].append(item)
+            if slow and item[0] % 50 == 0:
+                time.sleep(0.03)
+
+    async def asr_consumer():
+        asr = hub.subscribe_async('asr', max_frames=512)
+        ready.set()
+        while True:
+            item = await asr.get()
+            if item is None:
+                return
+            results['asr'].append(item)
+
+    ready = threading.Event()
+
+    def publisher():
+        ready.wait()
+        start = time.perf_counter()
+        for seq in range(1, frames + 1):
+            delay = start + seq * interval_ms / 1000 - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            hub.publish(make_frame(seq))
+        hub.close()
+
+    threads = [threading.Thread(target=drain, args=(recorder,)), threading.Thread(target=drain, args=(vad,)),
+               threading.Thread(target=drain, args=(meter, True)), threading.Thread(target=publisher)]
+    for thread in threads:
+        thread.start()
+    asyncio.run(asr_consumer())
+    for thread in threads:
+        thread.join()
+
+    for name in ('asr', 'recorder', 'vad'):
+        check_sequence(name, results[name], frames)
+    meter_seqs = [seq for seq, _ in results['meter']]
+    assert all(a < b for a, b in zip(meter_seqs, meter_seqs[1:])), "meter: 序号未严格递增"
+    assert len(meter_seqs) + meter.dropped == frames, "meter: 收到+丢弃 != 总帧数"
+    assert not recorder.overflowed
+    # 零拷贝：同一序号在各订阅者中引用同一块内存
+    for index in (0, frames // 2, frames - 1):
+        objs = {id(results[name][index][1].obj) for name in ('asr', 'recorder', 'vad')}
+        assert len(objs) == 1, "订阅者之间复制了帧数据"
+    return meter
+
+
+def publish_cost(frames, subscribers=4):
+    hub = AudioHub()
+    for index in range(subscribers):
+        hub.subscribe(f"sub{index}", max_frames=64)
+    data = make_frame(1)
+    start = time.perf_counter()
+    for _ in range(frames):
+        hub.publish(data)
+    return (time.perf_counter() - start) / frames * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description="音频采集中心校验与基准")
+    parser.add_argument('--frames', type=int, default=3000, help="发布帧数")
+    parser.add_argument('--interval-ms', type=float, default=1.0, help="发布间隔（实际采集约64ms/帧）")
+    args = parser.parse_args()
+
+    received = legacy_race(args.frames, args.interval_ms)
+    print(f"legacy: 生成器收到 {received}/{args.frames} 帧，丢失 {args.frames - received} 帧")
+
+    meter = hub_check(args.frames, args.interval_ms)
+    print(f"hub:    asr/recorder/vad 各收到全部 {args.frames} 帧，按序、无重复、内容一致、共享内存")
+    print(f"        meter（慢消费者）收到 {meter.delivered} 帧，按策略丢弃 {meter.dropped} 帧")
+    print(f"广播开销: {publish_cost(100000):.0f} ns/帧（4个订阅者）")
+
+
+if __name__ == "__main__":
+    main()
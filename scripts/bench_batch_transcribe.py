@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_batch_transcribe.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 批量转写基准 - 并发会话数与吞吐（音频小时/墙钟小时）、断点续跑、输出校验
+# =============================================================
+
+"""
+批量转写基准（本地替身服务，不需要网络）
+
+生成若干段不同时长的合成语音录音，用 BatchTranscriber 连接本地ASR替身服务器
+（处理速度上限 --server-speed 倍实时，模拟服务端限速）和本地LLM替身服务器（每个请求注入
+--llm-latency-ms 延迟）批量转写翻译：
+    - 吞吐：--jobs 1 / 4 / 8 下的墙钟耗时和音频小时/墙钟小时，翻译最大并发
+    - 对照：逐个录音实时回放（交互式应用的处理方式）所需时间
+    - 续跑：第二次运行全部跳过；删除一个录音的输出后只重新处理该录音
+    - 输出：JSONL 分句数与 SRT 字幕条数一致，每句都有对应的译文，时间单调递增
+
+用法:
+    python3 scripts/bench_batch_transcribe.py [--files 8] [--minutes 2]
+"""
+
+import json
+import time
+import wave
+import asyncio
+import argparse
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from bench_common import synth_speech_pcm
+from batch_transcribe import BatchTranscriber, find_audio_files
+from mock_asr_server import MockASRServer
+from mock_llm_server import MockLLMServer
+from translator import Translator
+
+RATE = 16000
+
+
+def make_archive(directory: Path, files, minutes, seed=0):
+    """时长在 0.5~1.5 倍 minutes 之间的录音，一半放在子目录"""
+    rng = np.random.default_rng(seed)
+    total_s = 0.0
+    for index in range(files):
+        seconds = minutes * 60 * rng.uniform(0.5, 1.5)
+        folder = directory / ('day2' if index % 2 else 'day1')
+        folder.mkdir(parents=True, exist_ok=True)
+        with wave.open(str(folder / f"meeting_{index:02d}.wav"), 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(RATE)
+            wf.writeframes(synth_speech_pcm(seconds, RATE, seed=seed * 100 + index))
+        total_s += seconds
+    return total_s
+
+
+def check_outputs(output_dir: Path, files):
+    utterances = 0
+    for path, rel in files:
+        base = output_dir / rel.parent / rel.stem
+        records = [json.loads(line) for line in base.with_suffix('.jsonl').read_text(encoding='utf-8').splitlines()]
+        srt_entries = base.with_suffix('.srt').read_text(encoding='utf-8').strip().split("\n\n")
+        assert len(records) == len(srt_entries) > 0, f"{rel}: JSONL {len(records)} 句，SRT {len(srt_entries)} 条"
+        starts = [record['start_ms'] for record in records]
+        assert starts == sorted(starts), f"{rel}: 分句时间未按顺序输出"
+        for record in records:
+            assert record['translation'].endswith(record['text']), f"{rel}: 译文与分句不对应 {record}"
+        utterances += len(records)
+    return utterances
+
+
+async def run_batch(archive, output_dir, asr_url, llm_url, jobs):
+    transcriber = BatchTranscriber(output_dir, jobs=jobs, ws_url=asr_url, translate=True,
+                                   translator=Translator(llm_url), translate_jobs=8)
+    return await transcriber.run(find_audio_files([archive]))
+
+
+async def bench(args):
+    asr = MockASRServer(partial_interval_ms=200, max_speed=args.server_speed)
+    llm = MockLLMServer(latency_ms=args.llm_latency_ms)
+    await asr.start()
+    await llm.start()
+    asr_url = asr.url_for('bigmodel_async')
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = Path(tmp) / 'archive'
+            audio_s = make_archive(archive, args.files, args.minutes)
+            files = find_audio_files([archive])
+            print(f"录音 {args.files} 个，共 {audio_s / 60:.1f} 分钟；替身ASR限速 {args.server_speed:g}x实时，"
+                  f"替身LLM延迟 {args.llm_latency_ms}ms")
+            print(f"逐个实时回放（交互式应用）需要 {audio_s / 60:.1f} 分钟")
+            print(f"{'并发会话':<10}{'墙钟s':>8}{'音频小时/墙钟小时':>18}{'分句':>7}{'翻译最大并发':>14}{'失败':>6}")
+            for jobs in args.jobs:
+                llm.max_in_flight = 0
+                output_dir = Path(tmp) / f'out_{jobs}'
+                report = await run_batch(archive, output_dir, asr_url, llm.url, jobs)
+                utterances = check_outputs(output_dir, files)
+                assert report['utterances'] == utterances and report['failed'] == 0
+                print(f"{jobs:<10}{report['wall_hours'] * 3600:>8.1f}{report['audio_hours_per_wall_hour']:>18.1f}"
+                      f"{utterances:>7}{llm.max_in_flight:>14}{report['failed']:>6}")
+
+            output_dir = Path(tmp) / f'out_{args.jobs[-1]}'
+            sessions = len(asr.sessions)
+            report = await run_batch(archive, output_dir, asr_url, llm.url, args.jobs[-1])
+            assert report['done'] == 0 and len(report['skipped']) == len(files) and len(asr.sessions) == sessions
+            path, rel = files[0]
+            (output_dir / rel.parent / rel.stem).with_suffix('.srt').unlink()
+            started = time.perf_counter()
+            report = await run_batch(archive, output_dir, asr_url, llm.url, args.jobs[-1])
+            assert report['done'] == 1 and len(report['skipped']) == len(files) - 1
+            check_outputs(output_dir, files)
+            print(f"续跑: 第二次运行跳过全部 {len(files)} 个录音（无ASR会话）；删除 {rel} 的SRT后只重新处理该录音"
+                  f"（{time.perf_counter() - started:.1f}s）")
+    finally:
+        await asr.stop()
+        await llm.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量转写基准")
+    parser.add_argument('--files', type=int, default=8, help="录音个数")
+    parser.add_argument('--minutes', type=float, default=2.0, help="录音平均时长（分钟）")
+    parser.add_argument('--jobs', type=int, nargs='+', default=[1, 4, 8], help="并发会话数")
+    parser.add_argument('--server-speed', type=float, default=20.0, help="替身ASR服务处理速度上限（实时倍数）")
+    parser.add_argument('--llm-latency-ms', type=int, default=300)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
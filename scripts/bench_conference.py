@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_conference.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 会议模式基准 - 1~8路并发ASR会话与翻译的CPU占用、分句固化延迟、翻译延迟、声道拆分开销
+# =============================================================
+
+"""
+会议模式基准（不需要声卡）
+
+生成 N 声道录音（每个声道不同的合成语音，各自在不同时刻停顿），由 FileAudioStream 按实时回放，
+ChannelSplitter 拆成 N 路，ConferenceSession 运行 N 个ASR会话和翻译方向。ASR/LLM替身服务器
+运行在子进程中，统计的CPU只包含客户端（采集回放、拆分、ASR协议、翻译请求）：
+    - CPU：每路数增加时客户端进程CPU占单核比例，其中声道拆分耗时（µs/每秒音频），对照逐样点Python循环
+    - 延迟：分句固化延迟 p50/p95（分句结束处音频送出到收到固化结果），翻译延迟 p50（固化到译文到达）
+    - 对话记录：各路分句数、合并记录按起始时间排序
+    - 拆分校验：不限速回放3声道录音，拆分结果与各声道原始PCM逐字节一致
+
+用法:
+    python3 scripts/bench_conference.py [--seconds 20] [--channels 1 2 4 8]
+"""
+
+import sys
+import time
+import wave
+import socket
+import asyncio
+import argparse
+import logging
+import tempfile
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+import bench_common
+from bench_common import synth_speech_pcm, percentile
+from asr_client import VolcanoASRClientAsync
+from audio_capture_file import FileAudioStream
+from conference import ChannelSplitter, ConferenceSession
+from translator import Translator
+
+RATE = 16000
+PROJECT_ROOT = Path(bench_common.__file__).resolve().parent.parent
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(script, port, *extra):
+    proc = subprocess.Popen([sys.executable, str(PROJECT_ROOT / script), '--port', str(port), *extra],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f"{script} 未能启动")
+
+
+def channel_signals(channels, seconds):
+    """每个声道：合成语音，第 c 路在不同位置插入2秒静音，使各路分句交错"""
+    signals = []
+    for channel in range(channels):
+        pcm = np.frombuffer(synth_speech_pcm(seconds, RATE, seed=channel + 1), dtype='<i2').copy()
+        gap = int((1 + channel * 1.7) % max(seconds - 2, 1) * RATE)
+        pcm[gap:gap + 2 * RATE] = 0
+        signals.append(pcm)
+    return signals
+
+
+def write_multichannel(path, signals):
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(len(signals))
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(np.stack(signals, axis=1).tobytes())
+
+
+def python_split_us(signals):
+    """对照：逐样点Python循环拆分1秒音频的耗时"""
+    interleaved = np.stack(signals, axis=1).tobytes()[:RATE * 2 * len(signals)]
+    start = time.perf_counter()
+    parts = [bytearray() for _ in signals]
+    for index in range(0, len(interleaved), 2):
+        parts[(index // 2) % len(signals)] += interleaved[index:index + 2]
+    return (time.perf_counter() - start) * 1e6
+
+
+async def run_conference(path, channels, speed, asr_url, llm_url):
+    source = FileAudioStream(path, channels=channels, speed=speed)
+    splitter = ChannelSplitter(source, channels)
+    finalized_at = {}
+    latencies = []
+    translate_ms = []
+    started = {}
+
+    def on_entry(entry, position):
+        now = time.perf_counter()
+        finalized_at[id(entry)] = now
+        latencies.append((now - started['t'] - entry['end_ms'] / 1000 / (speed or float('inf'))) * 1000)
+
+    def on_update(entry):
+        translate_ms.append((time.perf_counter() - finalized_at[id(entry)]) * 1000)
+
+    session = ConferenceSession(
+        [f"S{channel + 1}" for channel in range(channels)],
+        [('zh', 'en') if channel % 2 == 0 else ('en', 'zh') for channel in range(channels)],
+        translator=Translator(llm_url), translate_jobs=8, on_entry=on_entry, on_update=on_update,
+        client_factory=lambda channel: VolcanoASRClientAsync(ws_url=asr_url))
+    cpu = time.process_time()
+    started['t'] = time.perf_counter()
+    transcript = await session.run(splitter.streams())
+    cpu = time.process_time() - cpu
+    return session, splitter, transcript, cpu, latencies, translate_ms
+
+
+async def verify_split(directory):
+    """不限速回放3声道录音，直接读取拆分后的各路与原始声道比较"""
+    signals = channel_signals(3, 5)
+    path = directory / 'verify.wav'
+    write_multichannel(path, signals)
+    splitter = ChannelSplitter(FileAudioStream(path, channels=3, speed=0), 3)
+
+    async def collect(stream):
+        out = bytearray()
+        async for pcm, is_last in stream:
+            out += pcm
+        return bytes(out)
+
+    outputs = await asyncio.gather(*(collect(stream) for stream in splitter.streams()))
+    for channel, (out, signal) in enumerate(zip(outputs, signals)):
+        assert out == signal.tobytes(), f"第{channel + 1}路拆分结果与原始声道不一致"
+    print("拆分校验: 3声道录音拆分后各路与原始声道逐字节一致")
+
+
+async def bench(args):
+    asr_port, llm_port = free_port(), free_port()
+    servers = [start_server('mock_asr_server.py', asr_port, '--partial-interval-ms', '200'),
+               start_server('mock_llm_server.py', llm_port, '--latency-ms', str(args.llm_latency_ms))]
+    asr_url = f"ws://127.0.0.1:{asr_port}/api/v3/sauc/bigmodel_async"
+    llm_url = f"http://127.0.0.1:{llm_port}/api/v3/chat/completions"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            await verify_split(directory)
+            print(f"每路 {args.seconds:.0f}s 录音按实时回放，替身LLM延迟 {args.llm_latency_ms}ms（ASR/LLM替身在子进程）")
+            print(f"{'路数':<6}{'CPU占单核':>10}{'拆分µs/s':>10}{'Python循环µs/s':>16}{'分句':>6}"
+                  f"{'固化p50ms':>11}{'固化p95ms':>11}{'翻译p50ms':>11}  各路分句数")
+            for channels in args.channels:
+                signals = channel_signals(channels, args.seconds)
+                path = directory / f'conf_{channels}.wav'
+                write_multichannel(path, signals)
+                session, splitter, transcript, cpu, latencies, translate_ms = await run_conference(
+                    path, channels, 1.0, asr_url, llm_url)
+                keys = [(entry['start_ms'], entry['channel']) for entry in transcript]
+                assert keys == sorted(keys), "合并的对话记录未按时间排序"
+                assert all(outcome == 'last' for outcome in session.outcomes), session.outcomes
+                assert all(entry['translation'] for entry in transcript), "有分句没有收到译文"
+                per_channel = [sum(entry['channel'] == channel for entry in transcript) for channel in range(channels)]
+                print(f"{channels:<6}{cpu / args.seconds:>10.1%}{splitter.split_ns / 1000 / args.seconds:>10.1f}"
+                      f"{python_split_us(signals):>16.0f}{len(transcript):>6}"
+                      f"{percentile(latencies, 50):>11.0f}{percentile(latencies, 95):>11.0f}"
+                      f"{percentile(translate_ms, 50):>11.0f}  {'/'.join(map(str, per_channel))}")
+    finally:
+        for proc in servers:
+            proc.terminate()
+            proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会议模式基准")
+    parser.add_argument('--seconds', type=float, default=20.0, help="每路录音时长")
+    parser.add_argument('--channels', type=int, nargs='+', default=[1, 2, 4, 8], help="路数")
+    parser.add_argument('--llm-latency-ms', type=int, default=300)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_pcm_buffer.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): PCM累积方式基准 - bytes拼接切片 vs 环形缓冲，每秒音频的复制字节数、分配次数与耗时
+# =============================================================
+
+"""
+PCM累积方式基准
+
+模拟 audio_stream_generator：PortAudio 每次回调 1024 帧（2048字节），累积成 200ms 块输出。
+    - legacy: buf += data / buf[:n] / buf = buf[n:]
+    - ring:   PcmRingBuffer.write / read_chunk
+统计每秒音频的复制字节数、按音频大小分配的缓冲区个数（不含固定大小的 memoryview 头）以及耗时；
+另用随机（含奇数）长度写入校验环形缓冲输出与输入逐字节一致、块边界对齐到16bit采样。
+
+用法:
+    python3 scripts/bench_pcm_buffer.py [--seconds 60]
+"""
+
+import time
+import random
+import argparse
+
+from bench_common import synth_speech_pcm
+from pcm_buffer import PcmRingBuffer
+
+RATE = 16000
+BUFFER_BYTES = 2048
+CHUNK_BYTES = RATE * 2 * 200 // 1000
+
+
+def legacy(frames, stats):
+    buf = b""
+    for data in frames:
+        buf += data
+        stats['copied'] += len(buf)
+        stats['allocs'] += 1
+        while len(buf) >= CHUNK_BYTES:
+            pcm = buf[:CHUNK_BYTES]
+            buf = buf[CHUNK_BYTES:]
+            stats['copied'] += len(pcm) + len(buf)
+            stats['allocs'] += 2
+            yield pcm
+    if buf:
+        yield buf
+
+
+def ring(frames, stats):
+    buffer = PcmRingBuffer(CHUNK_BYTES)
+    for data in frames:
+        buffer.write(data)
+        stats['copied'] += len(data)
+        while (pcm := buffer.read_chunk()) is not None:
+            yield pcm
+    tail = buffer.read_tail()
+    if tail is not None:
+        yield tail
+
+
+def measure(func, frames, audio_s, repeat=30):
+    best = float('inf')
+    for _ in range(repeat):
+        stats = {'copied': 0, 'allocs': 0}
+        start = time.perf_counter()
+        for _ in func(frames, stats):
+            pass
+        best = min(best, time.perf_counter() - start)
+    return stats['copied'] / audio_s, stats['allocs'] / audio_s, best / audio_s * 1e6
+
+
+def check_odd_writes(pcm, trials=200):
+    """随机长度（含奇数）写入，输出必须与输入一致，且每块从偶数字节偏移开始"""
+    rng = random.Random(7)
+    for _ in range(trials):
+        data = pcm[:rng.randint(0, len(pcm))]
+        buffer = PcmRingBuffer(CHUNK_BYTES)
+        out = bytearray()
+        pos = 0
+        while pos < len(data):
+            step = rng.randint(1, 3 * BUFFER_BYTES)
+            buffer.write(data[pos:pos + step])
+            pos += step
+            while (chunk := buffer.read_chunk()) is not None:
+                assert len(out) % 2 == 0 and len(chunk) == CHUNK_BYTES
+                out += chunk
+        tail = buffer.read_tail()
+        if tail is not None:
+            assert len(out) % 2 == 0 and len(tail) % 2 == 0
+            out += tail
+        assert bytes(out) == data[:len(data) - len(data) % 2], "环形缓冲输出与输入不一致"
+        assert buffer.dropped_bytes == len(data) % 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PCM累积方式基准")
+    parser.add_argument('--seconds', type=float, default=60.0, help="音频时长(秒)")
+    args = parser.parse_args()
+
+    pcm = synth_speech_pcm(args.seconds, RATE)
+    frames = [pcm[i:i + BUFFER_BYTES] for i in range(0, len(pcm), BUFFER_BYTES)]
+    audio_s = len(pcm) / 2 / RATE
+    assert b"".join(legacy(frames, {'copied': 0, 'allocs': 0})) == \
+        b"".join(bytes(c) for c in ring(frames, {'copied': 0, 'allocs': 0})) == pcm
+
+    print(f"样本: {audio_s:.0f}s, {len(frames)} 个 {BUFFER_BYTES} 字节采集块 -> {CHUNK_BYTES} 字节(200ms)块")
+    print(f"{'方式':<8}{'复制KB/秒音频':>14}{'缓冲区分配/秒音频':>18}{'耗时 µs/秒音频':>16}")
+    for name, func in (('legacy', legacy), ('ring', ring)):
+        copied, allocs, cpu = measure(func, frames, audio_s)
+        print(f"{name:<8}{copied / 1024:>14.1f}{allocs:>18.1f}{cpu:>16.1f}")
+
+    check_odd_writes(pcm[:RATE * 2 * 3])
+    print("奇数长度写入校验通过：输出与输入一致，块边界对齐到16bit采样")
+
+
+if __name__ == "__main__":
+    main()
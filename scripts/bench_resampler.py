@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_resampler.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 原生采样率采集转换基准 - 每秒音频CPU耗时、与参考重采样器对照、抗混叠
+# =============================================================
+
+"""
+原生采样率采集转换基准（不需要声卡）
+
+按 AudioStream 的回调块大小（输出1024帧对应的原生帧数）把设备原生格式的PCM送入
+PolyphaseResampler，转换为16kHz单声道：
+    - CPU：每秒音频的转换耗时（µs）及占单核比例；对照 scipy.signal.resample_poly 整段处理、
+      逐块线性插值（np.interp）
+    - 对照：分块流式输出与 resample_poly 整段输出逐样点比较（最大误差LSB、信噪比）
+    - 抗混叠：1kHz + 9kHz/11kHz 双音输入，高音超出16kHz采样的奈奎斯特频率，分别折叠到7kHz/5kHz；
+      统计折叠处相对1kHz的电平（越低越好），对照线性插值和直接抽取。9kHz位于滤波器过渡带内，
+      11kHz位于阻带
+
+用法:
+    python3 scripts/bench_resampler.py [--seconds 30]
+"""
+
+import time
+import argparse
+
+import numpy as np
+
+import bench_common  # noqa: F401  (设置项目路径)
+from bench_common import synth_speech_pcm
+from resampler import PolyphaseResampler
+
+DST_RATE = 16000
+FRAMES_PER_BUFFER = 1024   # AudioStream 缺省值，按输出采样率计
+FORMATS = ((48000, 2), (44100, 2), (48000, 1), (44100, 1), (32000, 1))
+
+
+def native_signal(rate, channels, seconds):
+    """按原生采样率合成的语音，多声道时各声道略有差异"""
+    mono = np.frombuffer(synth_speech_pcm(seconds, rate), dtype='<i2').astype(np.float64)
+    if channels == 1:
+        return mono.astype('<i2')
+    delayed = np.concatenate([np.zeros(7), mono[:-7]])
+    return np.stack([mono, 0.8 * delayed], axis=1).astype('<i2')
+
+
+def stream(resampler, native, block_frames):
+    out = bytearray()
+    data = native.tobytes()
+    block_bytes = block_frames * native.itemsize * (native.shape[1] if native.ndim > 1 else 1)
+    for offset in range(0, len(data), block_bytes):
+        out += resampler.process(data[offset:offset + block_bytes])
+    out += resampler.flush()
+    return np.frombuffer(bytes(out), dtype='<i2')
+
+
+def downmix(native):
+    return native.astype(np.float64).mean(axis=1) if native.ndim > 1 else native.astype(np.float64)
+
+
+def linear_blocks(native, rate, block_frames):
+    """逐块线性插值（块间相位按累计样点数接续）"""
+    mono = downmix(native)
+    out = []
+    step = rate / DST_RATE
+    produced = 0
+    for offset in range(0, len(mono), block_frames):
+        block = mono[offset:offset + block_frames]
+        end = (offset + len(block)) / step
+        positions = np.arange(produced, int(np.ceil(end))) * step - offset
+        out.append(np.interp(positions, np.arange(len(block)), block))
+        produced += len(positions)
+    return np.concatenate(out)
+
+
+def snr_db(signal, reference):
+    n = min(len(signal), len(reference))
+    noise = signal[:n] - reference[:n]
+    return 10 * np.log10(np.sum(reference[:n] ** 2) / max(np.sum(noise ** 2), 1e-12))
+
+
+def tone_level_db(samples, freq, rate=DST_RATE):
+    """samples 中 freq 处的电平（dB，Hann窗FFT峰值）"""
+    spectrum = np.abs(np.fft.rfft(samples * np.hanning(len(samples))))
+    freqs = np.fft.rfftfreq(len(samples), 1 / rate)
+    band = np.abs(freqs - freq) < 30
+    return 20 * np.log10(spectrum[band].max() + 1e-9)
+
+
+def cpu_and_quality(seconds):
+    from scipy.signal import resample_poly
+    print(f"CPU与对照（{seconds:.0f}s音频，回调块 = 输出{FRAMES_PER_BUFFER}帧）")
+    print(f"{'原生格式':<14}{'本实现µs/s':>12}{'单核占比':>9}{'scipy整段µs/s':>15}{'线性插值µs/s':>14}"
+          f"{'最大误差LSB':>13}{'SNR dB':>9}{'线性SNR dB':>12}")
+    for rate, channels in FORMATS:
+        native = native_signal(rate, channels, seconds)
+        block_frames = FRAMES_PER_BUFFER * rate // DST_RATE
+
+        start = time.perf_counter()
+        ours = stream(PolyphaseResampler(rate, DST_RATE, channels, 1), native, block_frames)
+        ours_us = (time.perf_counter() - start) / seconds * 1e6
+
+        start = time.perf_counter()
+        reference = resample_poly(downmix(native), DST_RATE, rate)
+        ref_us = (time.perf_counter() - start) / seconds * 1e6
+
+        start = time.perf_counter()
+        linear = linear_blocks(native, rate, block_frames)
+        linear_us = (time.perf_counter() - start) / seconds * 1e6
+
+        assert len(ours) == len(reference), "输出长度与 resample_poly 不一致"
+        reference_i16 = np.clip(np.rint(reference), -32768, 32767)
+        max_err = np.abs(ours - reference_i16).max()
+        assert max_err <= 1, f"{rate}Hz/{channels}ch: 与参考输出相差 {max_err} LSB"
+        print(f"{f'{rate}Hz/{channels}ch':<14}{ours_us:>12.0f}{ours_us / 1e6:>9.2%}{ref_us:>15.0f}{linear_us:>14.0f}"
+              f"{max_err:>13.0f}{snr_db(ours.astype(np.float64), reference):>9.1f}"
+              f"{snr_db(linear, reference):>12.1f}")
+
+
+def block_invariance():
+    """不同分块方式的输出必须与整段处理一致"""
+    native = native_signal(44100, 2, 3)
+    whole = stream(PolyphaseResampler(44100, DST_RATE, 2, 1), native, len(native))
+    rng = np.random.default_rng(1)
+    resampler = PolyphaseResampler(44100, DST_RATE, 2, 1)
+    out = bytearray()
+    offset = 0
+    while offset < len(native):
+        size = int(rng.integers(1, 4000))
+        out += resampler.process(native[offset:offset + size].tobytes())
+        offset += size
+    out += resampler.flush()
+    assert np.array_equal(np.frombuffer(bytes(out), dtype='<i2'), whole), "分块输出与整段输出不一致"
+    print("分块一致性: 随机块大小（1~4000帧）的输出与整段处理逐样点一致")
+
+
+def aliasing():
+    print("抗混叠（1kHz + 高音等幅双音，折叠频率处相对1kHz的电平）")
+    for rate in (48000, 44100):
+        for tone in (9000, 11000):
+            t = np.arange(rate * 2) / rate
+            native = (8000 * np.sin(2 * np.pi * 1000 * t) + 8000 * np.sin(2 * np.pi * tone * t)).astype('<i2')
+            block_frames = FRAMES_PER_BUFFER * rate // DST_RATE
+            results = {
+                '本实现': stream(PolyphaseResampler(rate, DST_RATE), native, block_frames).astype(np.float64),
+                '线性插值': linear_blocks(native, rate, block_frames),
+            }
+            if rate % DST_RATE == 0:
+                results['直接抽取'] = native[::rate // DST_RATE].astype(np.float64)
+            alias = DST_RATE - tone
+            text = "  ".join(f"{name} {tone_level_db(y[2000:-2000], alias) - tone_level_db(y[2000:-2000], 1000):.0f}dB"
+                             for name, y in results.items())
+            print(f"  {rate}Hz {tone // 1000}kHz→{alias // 1000}kHz: {text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="原生采样率采集转换基准")
+    parser.add_argument('--seconds', type=float, default=30.0, help="每种格式的音频时长")
+    args = parser.parse_args()
+    cpu_and_quality(args.seconds)
+    block_invariance()
+    aliasing()
+
+
+if __name__ == "__main__":
+    main()
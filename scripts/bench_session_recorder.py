@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_session_recorder.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 会话录音基准 - 采集线程额外开销、写入线程耗时、进程被杀后的恢复、分句O(1)切片
+# =============================================================
+
+"""
+会话录音基准（不需要声卡）
+
+    - 采集线程开销：AudioHub.publish 每帧耗时（1024帧/64ms），只有ASR订阅者 vs 再加录音订阅者
+    - 写入线程：每秒音频的写入耗时（含文件扩展、定期msync），每小时文件大小
+    - 崩溃恢复：子进程录音并写入分句索引，中途 SIGKILL；重新打开后校验已提交音频逐字节正确、
+      丢失不超过一帧、分句索引完整
+    - 切片：1小时录音中按分句取音频（零拷贝memoryview）的耗时，对照整段读入WAV后切片，
+      位于文件开头和末尾的分句耗时相同
+
+用法:
+    python3 scripts/bench_session_recorder.py [--frames 20000] [--hours 1]
+"""
+
+import os
+import sys
+import time
+import wave
+import signal
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+import bench_common  # noqa: F401  (设置项目路径)
+from bench_common import percentile
+from audio_hub import AudioHub
+from session_recorder import SessionRecorder, SessionRecording
+
+RATE = 16000
+FRAME_BYTES = 1024 * 2   # AudioStream 每次回调输出1024帧16bit单声道
+FRAME_MS = 64
+
+
+class _Source:
+    """只提供 subscribe 的音频源，直接由基准驱动 hub"""
+
+    def __init__(self):
+        self.hub = AudioHub()
+
+    def subscribe(self, name, max_frames=512, overflow='drop_oldest'):
+        return self.hub.subscribe(name, max_frames, overflow)
+
+
+def frame_pattern(index):
+    """第 index 帧的内容：帧号写在每个样点中，便于校验"""
+    return np.full(FRAME_BYTES // 2, index % 32768, dtype='<i2').tobytes()
+
+
+def publish_cost(frames, directory):
+    print(f"采集线程 publish 每帧耗时（{frames} 帧）")
+    frame = frame_pattern(1)
+    for label, with_recorder in (('仅ASR订阅者', False), ('ASR + 录音', True)):
+        source = _Source()
+        asr = source.subscribe('asr', max_frames=frames + 1)
+        recorder = SessionRecorder(directory / 'publish.tcrec').attach(source) if with_recorder else None
+        costs = []
+        for _ in range(frames):
+            start = time.perf_counter_ns()
+            source.hub.publish(frame)
+            costs.append((time.perf_counter_ns() - start) / 1000)
+            # 每帧之间让出CPU，接近实时采集时写入线程与采集交替运行的情况
+            time.sleep(0)
+        source.hub.close()
+        if recorder is not None:
+            recorder.close()
+            assert recorder.data_bytes == frames * FRAME_BYTES and recorder.gap_frames == 0
+        print(f"  {label:<12} p50 {percentile(costs, 50):5.1f}µs  p99 {percentile(costs, 99):5.1f}µs  "
+              f"max {max(costs):7.1f}µs  （每帧间隔 {FRAME_MS}ms）")
+        del asr
+
+
+def writer_cost(hours, directory):
+    frames = int(hours * 3600 * 1000 / FRAME_MS)
+    frame = frame_pattern(1)
+    path = directory / 'long.tcrec'
+    start = time.perf_counter()
+    recorder = SessionRecorder(path, prealloc_seconds=600)
+    flush_every = int(recorder.flush_interval * 1000 / FRAME_MS)
+    for index in range(frames):
+        recorder.write(frame)
+        if index % flush_every == 0:
+            recorder.flush()
+    recorder.close()
+    elapsed = time.perf_counter() - start
+    size_mb = os.path.getsize(path) / 1e6
+    print(f"写入线程：{hours:g} 小时音频 {frames} 帧，总耗时 {elapsed:.2f}s，"
+          f"每秒音频 {elapsed / (hours * 3600) * 1e6:.0f}µs，文件 {size_mb:.0f} MB")
+    return path
+
+
+def crash_child(path, frames, kill_after):
+    """子进程：按帧写入并每秒记录一个分句，写到 kill_after 帧时自行 SIGKILL"""
+    source = _Source()
+    recorder = SessionRecorder(path, prealloc_seconds=5).attach(source)
+    for index in range(frames):
+        source.hub.publish(frame_pattern(index))
+        if index and index % 16 == 0:
+            recorder.add_utterance((index - 16) * FRAME_MS, index * FRAME_MS)
+        if index == kill_after:
+            # 等写入线程追上，模拟实时采集中被杀
+            while recorder.data_bytes < (index + 1) * FRAME_BYTES:
+                time.sleep(0.001)
+            os.kill(os.getpid(), signal.SIGKILL)
+        time.sleep(0.0005)
+
+
+def crash_recovery(directory):
+    path = directory / 'crash.tcrec'
+    kill_after = 1200
+    proc = subprocess.run([sys.executable, __file__, '--crash-child', str(path), '--kill-after', str(kill_after)])
+    assert proc.returncode == -signal.SIGKILL, f"子进程退出码 {proc.returncode}"
+    with SessionRecording(path) as rec:
+        assert not rec.clean_close
+        frames = rec.data_bytes // FRAME_BYTES
+        assert frames >= kill_after, f"已提交 {frames} 帧，期望至少 {kill_after}"
+        for index in (0, frames // 2, frames - 1):
+            pcm = rec.slice(index * FRAME_MS, (index + 1) * FRAME_MS)
+            assert bytes(pcm) == frame_pattern(index), f"第 {index} 帧内容不一致"
+            pcm.release()
+        expected_utts = kill_after // 16
+        assert len(rec.utterances) == expected_utts, f"分句索引 {len(rec.utterances)} 条，期望 {expected_utts}"
+        pcm = rec.utterance_pcm(len(rec.utterances) - 1)
+        assert len(pcm) == 16 * FRAME_BYTES
+        pcm.release()
+        print(f"崩溃恢复：SIGKILL 于第 {kill_after} 帧，重新打开得到 {frames} 帧（{rec.duration_ms / 1000:.1f}s）"
+              f"，内容逐字节正确，分句索引 {len(rec.utterances)} 条完整，文件头标记未正常关闭")
+
+
+def slicing(path, directory):
+    with SessionRecording(path) as rec:
+        duration_ms = rec.duration_ms
+    utterance_ms = 5000
+    spans = [(start, start + utterance_ms) for start in range(0, int(duration_ms) - utterance_ms, utterance_ms)]
+    wav_path = directory / 'long.wav'
+    with SessionRecording(path) as rec, wave.open(str(wav_path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        step = 60 * 1000
+        for start in range(0, int(duration_ms), step):
+            pcm = rec.slice(start, start + step)
+            wf.writeframes(pcm)
+            pcm.release()
+
+    def time_mmap(span):
+        start = time.perf_counter_ns()
+        with SessionRecording(path) as rec:
+            pcm = rec.slice(*span)
+            total = int(np.frombuffer(pcm, dtype='<i2')[::160].sum())
+            pcm.release()
+        return (time.perf_counter_ns() - start) / 1000, total
+
+    def time_wave(span):
+        # 对照：整段读入后切片（bench_common.load_wav_pcm 的做法）
+        start = time.perf_counter_ns()
+        with wave.open(str(wav_path), 'rb') as wf:
+            data = wf.readframes(wf.getnframes())
+        begin = int(span[0] * RATE / 1000) * 2
+        pcm = data[begin:begin + int((span[1] - span[0]) * RATE / 1000) * 2]
+        total = int(np.frombuffer(pcm, dtype='<i2')[::160].sum())
+        return (time.perf_counter_ns() - start) / 1000, total
+
+    print(f"切片：{duration_ms / 3600000:.1f} 小时录音中取 5s 分句（打开文件 + 定位 + 访问）")
+    for label, span in (('开头', spans[0]), ('中间', spans[len(spans) // 2]), ('末尾', spans[-1])):
+        mm_costs, wave_costs = [], []
+        for _ in range(10):
+            mm_us, mm_total = time_mmap(span)
+            wave_us, wave_total = time_wave(span)
+            assert mm_total == wave_total
+            mm_costs.append(mm_us)
+            wave_costs.append(wave_us)
+        print(f"  {label}: 内存映射切片 p50 {percentile(mm_costs, 50):8.0f}µs   整段读入WAV后切片 p50 "
+              f"{percentile(wave_costs, 50):8.0f}µs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="会话录音基准")
+    parser.add_argument('--frames', type=int, default=20000, help="publish 开销测量帧数")
+    parser.add_argument('--hours', type=float, default=1.0, help="写入与切片测试的录音时长")
+    parser.add_argument('--crash-child', help=argparse.SUPPRESS)
+    parser.add_argument('--kill-after', type=int, default=1200, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.crash_child:
+        crash_child(args.crash_child, args.kill_after * 2, args.kill_after)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        publish_cost(args.frames, directory)
+        path = writer_cost(args.hours, directory)
+        crash_recovery(directory)
+        slicing(path, directory)
+
+
+if __name__ == "__main__":
+    main()
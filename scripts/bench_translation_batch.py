@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_translation_batch.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 批量翻译基准 - 不同凑批时间窗口下的请求数、每句词元数、吞吐与翻译延迟，损坏JSON时逐条重试
+# =============================================================
+
+"""
+批量翻译基准（本地LLM替身服务器，不需要网络）
+
+模拟节奏很快的对话：分句按指数分布的间隔陆续固化，放入翻译队列；消费端与界面的翻译工作协程
+相同（collect_batch 凑批，一条走 translate，多条走 translate_batch），逐批顺序翻译：
+    - 逐句（TRANSLATE_BATCH_MAX=1）与不同 TRANSLATE_BATCH_WINDOW_MS 对比：请求数、平均批大小、
+      每句输入/输出词元（替身服务的 usage 估算）、吞吐（句/秒）、固化到译文的延迟 p50/p95
+    - 损坏的JSON：批量响应无法解析时逐条重试，结果仍与分句一一对应
+
+用法:
+    python3 scripts/bench_translation_batch.py [--utterances 60] [--gap-ms 300] [--latency-ms 400]
+"""
+
+import time
+import asyncio
+import argparse
+import logging
+
+import numpy as np
+
+import bench_common  # noqa: F401  (设置项目路径)
+from bench_common import percentile
+from mock_llm_server import MockLLMServer
+from translator import Translator, collect_batch
+
+
+def conversation(utterances, gap_ms, seed=0):
+    """(到达间隔秒, 文本, 源语言, 目标语言) 列表，中英混合"""
+    rng = np.random.default_rng(seed)
+    items = []
+    for index in range(utterances):
+        if index % 3 == 2:
+            text, src, tgt = f"Let's move on to item {index} on the agenda", 'en', 'zh'
+        else:
+            text, src, tgt = f"好的，我们看一下第{index}项，这个数字需要再确认", 'zh', 'en'
+        items.append((rng.exponential(gap_ms / 1000), text, src, tgt))
+    return items
+
+
+async def worker(translator, queue, max_items, window_s, done):
+    """与界面的 _translation_worker 相同的凑批逻辑"""
+    while True:
+        items, ended = await collect_batch(queue, max_items, window_s)
+        if len(items) == 1:
+            text, src, tgt, _ = items[0]
+            results = [await translator.translate(text, src_lang=src, tgt_lang=tgt)]
+        elif items:
+            results = await translator.translate_batch([item[:3] for item in items])
+        for item, result in zip(items, results):
+            assert result['translation'] == f"[{item[2]}] {item[0]}", (item, result)
+            done.append(time.perf_counter() - item[3])
+        if ended:
+            break
+
+
+async def run(server, items, max_items, window_ms):
+    translator = Translator(server.url)
+    await translator.warm_up()
+    queue, done = asyncio.Queue(), []
+    task = asyncio.create_task(worker(translator, queue, max_items, window_ms / 1000, done))
+    start = time.perf_counter()
+    for gap, text, src, tgt in items:
+        await asyncio.sleep(gap)
+        queue.put_nowait((text, src, tgt, time.perf_counter()))
+    queue.put_nowait(None)
+    await task
+    elapsed = time.perf_counter() - start
+    await translator.close()
+    usage = translator.usage
+    count = len(items)
+    return (usage['requests'], count / usage['requests'], usage['prompt_tokens'] / count,
+            usage['completion_tokens'] / count, count / elapsed,
+            percentile(done, 50) * 1000, percentile(done, 95) * 1000)
+
+
+async def broken_json(server):
+    items = [(f"第{index}句", 'zh', 'en') for index in range(5)]
+    translator = Translator(server.url)
+    server.broken_batches = 1
+    before = server.requests
+    results = await translator.translate_batch(items)
+    await translator.close()
+    assert [result['translation'] for result in results] == [f"[en] 第{index}句" for index in range(5)], results
+    print(f"损坏的JSON：5 条批量响应无法解析，逐条重试后结果与分句一一对应（请求 {server.requests - before} 次）")
+
+
+async def bench(args):
+    items = conversation(args.utterances, args.gap_ms)
+    async with MockLLMServer(latency_ms=args.latency_ms, token_ms=args.token_ms) as server:
+        print(f"{args.utterances} 句，平均固化间隔 {args.gap_ms}ms；替身LLM首个词元前 {args.latency_ms}ms，"
+              f"每词元 {args.token_ms}ms；逐批顺序翻译")
+        print(f"{'':<16}{'请求数':>8}{'平均批大小':>12}{'输入词元/句':>12}{'输出词元/句':>12}{'吞吐句/s':>10}"
+              f"{'延迟p50ms':>11}{'延迟p95ms':>11}")
+        configs = [('逐句', 1, 0)] + [(f"窗口 {window}ms", args.max_items, window) for window in args.windows]
+        for label, max_items, window in configs:
+            row = await run(server, items, max_items, window)
+            print(f"{label:<16}{row[0]:>8}{row[1]:>12.1f}{row[2]:>12.0f}{row[3]:>12.0f}{row[4]:>10.2f}"
+                  f"{row[5]:>11.0f}{row[6]:>11.0f}")
+        await broken_json(server)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量翻译基准")
+    parser.add_argument('--utterances', type=int, default=60)
+    parser.add_argument('--gap-ms', type=int, default=300, help="分句固化的平均间隔")
+    parser.add_argument('--latency-ms', type=int, default=400, help="替身LLM首个词元之前的耗时")
+    parser.add_argument('--token-ms', type=int, default=5, help="替身LLM每个词元的耗时")
+    parser.add_argument('--max-items', type=int, default=8, help="每批最多条数")
+    parser.add_argument('--windows', type=int, nargs='+', default=[0, 50, 150, 300], help="凑批时间窗口（毫秒）")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_translation_cache.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 翻译缓存基准 - 会议分句流的命中率、上游调用数与翻译总耗时，重启后磁盘命中，单飞合并，TTL与按条数淘汰
+# =============================================================
+
+"""
+翻译缓存基准（本地LLM替身服务器，不需要网络）
+
+模拟会议分句流：一部分是反复出现的短句（“好的”“Thank you”“下一页”……，按 Zipf 分布抽取，
+带全角/多余空格等写法差异），其余是不重复的句子。与界面的翻译工作协程一样逐句翻译：
+    - 无缓存 / 只用内存 / 内存+SQLite：上游调用数、命中率、翻译总耗时、估算节省时间
+    - 重启：新的 CachedTranslator 打开同一个SQLite文件，第二场会议的常用短句直接磁盘命中
+    - 单飞：同一句话并发翻译，上游只调用一次
+    - 开销：内存命中、磁盘命中的耗时（µs），未命中时缓存查找增加的耗时
+    - TTL 与按条数淘汰
+
+用法:
+    python3 scripts/bench_translation_cache.py [--utterances 300] [--llm-latency-ms 100]
+"""
+
+import time
+import asyncio
+import argparse
+import logging
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+import bench_common  # noqa: F401  (设置项目路径)
+from bench_common import percentile
+from mock_llm_server import MockLLMServer
+from translator import Translator
+from translation_cache import CachedTranslator, TranslationStore, normalize_text
+
+COMMON_PHRASES = [
+    ("好的", 'zh', 'en'), ("Thank you", 'en', 'zh'), ("下一页", 'zh', 'en'), ("对", 'zh', 'en'),
+    ("OK", 'en', 'zh'), ("没问题", 'zh', 'en'), ("明白了", 'zh', 'en'), ("Yes", 'en', 'zh'),
+    ("可以", 'zh', 'en'), ("Sounds good", 'en', 'zh'), ("稍等一下", 'zh', 'en'), ("谢谢大家", 'zh', 'en'),
+    ("Next slide please", 'en', 'zh'), ("听得到吗", 'zh', 'en'), ("是的", 'zh', 'en'), ("Right", 'en', 'zh'),
+    ("我们继续", 'zh', 'en'), ("Any questions", 'en', 'zh'), ("好的好的", 'zh', 'en'), ("收到", 'zh', 'en'),
+]
+# 同一短句的不同写法（全角、多余空白），规范化后应命中同一条缓存
+VARIANTS = [lambda text: text, lambda text: f" {text} ",
+            lambda text: ''.join(chr(ord(c) + 0xFEE0) if '!' <= c <= '~' else c for c in text)]
+
+
+def meeting(utterances, repeat_ratio, seed):
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, len(COMMON_PHRASES) + 1)
+    weights /= weights.sum()
+    items = []
+    for index in range(utterances):
+        if rng.random() < repeat_ratio:
+            text, src, tgt = COMMON_PHRASES[rng.choice(len(COMMON_PHRASES), p=weights)]
+            items.append((VARIANTS[rng.integers(len(VARIANTS))](text), src, tgt))
+        else:
+            items.append((f"第{seed}场会议的第{index}句发言内容", 'zh', 'en'))
+    return items
+
+
+async def run_meeting(translator, items):
+    start = time.perf_counter()
+    for text, src, tgt in items:
+        result = await translator.translate(text, src_lang=src, tgt_lang=tgt)
+        assert normalize_text(result['translation']).endswith(normalize_text(text)), (text, result)
+    return time.perf_counter() - start
+
+
+def describe(label, elapsed, requests, translator=None):
+    line = f"  {label:<14} 上游调用 {requests:>4}  翻译总耗时 {elapsed:6.1f}s"
+    if translator is not None:
+        line += f"  {translator.report()}"
+    print(line)
+
+
+async def compare(server, items, db_path, repeat):
+    print(f"会议分句 {len(items)} 句（常用短句占比约 {repeat:.0%}），替身LLM延迟 {server.latency_ms}ms，逐句翻译")
+    base = server.requests
+    plain = Translator(server.url)
+    elapsed = await run_meeting(plain, items)
+    describe("无缓存", elapsed, server.requests - base)
+    await plain.close()
+
+    base = server.requests
+    memory = CachedTranslator(Translator(server.url))
+    elapsed = await run_meeting(memory, items)
+    describe("只用内存", elapsed, server.requests - base, memory)
+    await memory.close()
+
+    base = server.requests
+    tiered = CachedTranslator(Translator(server.url), store=TranslationStore(db_path))
+    elapsed = await run_meeting(tiered, items)
+    describe("内存+SQLite", elapsed, server.requests - base, tiered)
+    await tiered.close()
+    tiered.close_store()
+
+
+async def restart(server, db_path, utterances, repeat):
+    items = meeting(utterances, repeat, seed=2)
+    base = server.requests
+    translator = CachedTranslator(Translator(server.url), store=TranslationStore(db_path))
+    elapsed = await run_meeting(translator, items)
+    describe("重启后第二场", elapsed, server.requests - base, translator)
+    assert translator.stats['disk_hits'] > 0
+    await translator.close()
+    translator.close_store()
+
+
+async def single_flight(server, n):
+    base = server.requests
+    translator = CachedTranslator(Translator(server.url))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(translator.translate("同时说的一句话", 'zh', 'en') for _ in range(n)))
+    elapsed = (time.perf_counter() - start) * 1000
+    assert len({result['translation'] for result in results}) == 1
+    print(f"单飞：{n} 个相同请求并发，上游调用 {server.requests - base} 次，耗时 {elapsed:.0f}ms，"
+          f"合并 {translator.stats['coalesced']} 次")
+    await translator.close()
+
+
+async def overhead(server, db_path):
+    translator = CachedTranslator(Translator(server.url), store=TranslationStore(db_path))
+    await translator.translate("开销测试", 'zh', 'en')
+    memory_us = []
+    for _ in range(2000):
+        start = time.perf_counter_ns()
+        await translator.translate("开销测试", 'zh', 'en')
+        memory_us.append((time.perf_counter_ns() - start) / 1000)
+    disk_us = []
+    for _ in range(200):
+        translator._memory.clear()
+        start = time.perf_counter_ns()
+        await translator.translate("开销测试", 'zh', 'en')
+        disk_us.append((time.perf_counter_ns() - start) / 1000)
+    # 未命中时缓存增加的耗时：键计算 + SQLite查找（上游调用本身不计）
+    store = translator.store
+    miss_us = []
+    for index in range(200):
+        start = time.perf_counter_ns()
+        await asyncio.get_running_loop().run_in_executor(translator._db, store.get, f"missing-{index}")
+        miss_us.append((time.perf_counter_ns() - start) / 1000)
+    print(f"开销：内存命中 p50 {percentile(memory_us, 50):.1f}µs，磁盘命中 p50 {percentile(disk_us, 50):.0f}µs，"
+          f"未命中时的磁盘查找 p50 {percentile(miss_us, 50):.0f}µs")
+    await translator.close()
+    translator.close_store()
+
+
+def eviction(directory):
+    store = TranslationStore(directory / 'ttl.db', ttl_s=0.2)
+    store.put('a', {'translation': 'x'})
+    assert store.get('a') is not None
+    time.sleep(0.3)
+    assert store.get('a') is None
+    store.close()
+    store = TranslationStore(directory / 'rows.db', max_rows=1000)
+    for index in range(1500):
+        store.put(f"k{index}", {'translation': str(index)})
+    assert len(store) <= 1000 and store.get('k1499') is not None and store.get('k0') is None
+    print(f"淘汰：TTL过期条目视为未命中并删除；上限1000条写入1500条后保留 {len(store)} 条，最新条目仍在")
+    store.close()
+
+
+async def bench(args):
+    async with MockLLMServer(latency_ms=args.llm_latency_ms) as server:
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp)
+            db_path = directory / 'cache.db'
+            await compare(server, meeting(args.utterances, args.repeat, seed=1), db_path, args.repeat)
+            await restart(server, db_path, args.utterances, args.repeat)
+            await single_flight(server, 50)
+            await overhead(server, directory / 'overhead.db')
+            eviction(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="翻译缓存基准")
+    parser.add_argument('--utterances', type=int, default=300, help="每场会议的分句数")
+    parser.add_argument('--repeat', type=float, default=0.4, help="常用短句占比")
+    parser.add_argument('--llm-latency-ms', type=int, default=100)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_translation_stream.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 流式翻译基准 - 首个译文词元耗时 vs 完整响应耗时、界面更新合并次数、增量段落解析校验
+# =============================================================
+
+"""
+流式翻译基准（本地LLM替身服务器，不需要网络）
+
+替身服务器在首个词元前等待 --latency-ms，之后每个词元（2个字符）等待 --token-ms：
+    - 非流式：translate 返回（完整响应）的耗时
+    - 流式：首个纠错原文字符、首个译文字符出现的耗时，以及全部完成的耗时
+    - 界面更新：每句的增量回调次数，经 ThrottledUpdater（--update-ms）合并后的更新次数
+    - 解析校验：随机内容按随机长度切块送入 SectionParser，结果与按行解析完整响应一致
+      （标记被拆在不同数据块、行首空白、多余行、重复段落）
+
+用法:
+    python3 scripts/bench_translation_stream.py [--latency-ms 300] [--token-ms 25]
+"""
+
+import time
+import random
+import asyncio
+import argparse
+import logging
+
+import bench_common  # noqa: F401  (设置项目路径)
+from bench_common import percentile
+from mock_llm_server import MockLLMServer
+from translator import Translator, SectionParser, ThrottledUpdater, parse_sections
+
+SENTENCES = {
+    '短句': "好的没问题",
+    '中句': "我们下周二上午十点在三楼会议室讨论预算",
+    '长句': "关于第三季度的销售数据，我们需要先和财务部门确认口径，然后再根据各区域的实际情况调整下个季度的目标和资源分配",
+}
+
+
+async def measure(translator, text, update_s):
+    start = time.perf_counter()
+    full = await translator.translate(text, src_lang='zh', tgt_lang='en')
+    full_ms = (time.perf_counter() - start) * 1000
+
+    marks = {}
+    updates = ThrottledUpdater(lambda corrected, translation: None, update_s)
+
+    def on_partial(corrected, translation):
+        now = (time.perf_counter() - start) * 1000
+        if corrected:
+            marks.setdefault('corrected', now)
+        if translation:
+            marks.setdefault('translation', now)
+        marks['partials'] = marks.get('partials', 0) + 1
+        updates.update(corrected, translation)
+
+    start = time.perf_counter()
+    streamed = await translator.translate(text, src_lang='zh', tgt_lang='en', on_partial=on_partial)
+    stream_ms = (time.perf_counter() - start) * 1000
+    updates.cancel()
+    assert streamed == full, (streamed, full)
+    # 最终结果另行更新一次
+    return full_ms, marks['corrected'], marks['translation'], stream_ms, marks['partials'], updates.calls + 1
+
+
+def fuzz_parser(cases, seed=0):
+    rng = random.Random(seed)
+    pieces = ["【纠错后原文】", "【翻译结果】", "【语义无法识别】", "  ", "\n", "\n\n", "你好", "Hello world",
+              "【", "】", "翻译", "纠错后原文", "[en] ", "下一页。"]
+    for _ in range(cases):
+        content = ''.join(rng.choice(pieces) for _ in range(rng.randint(1, 30)))
+        parser = SectionParser()
+        position = 0
+        while position < len(content):
+            size = rng.randint(1, 6)
+            parser.feed(content[position:position + size])
+            position += size
+        expected = parse_sections(content)
+        # parse_sections 会去掉行内所有标记，只比较不含重复标记的行
+        if any(line.strip().count('【纠错后原文】') + line.strip().count('【翻译结果】') > 1
+               for line in content.splitlines()):
+            continue
+        assert (parser.corrected, parser.translation) == expected, (content, parser.sections, expected)
+    print(f"解析校验：{cases} 条随机内容按1~6字符随机切块，增量解析与按行解析完整响应一致")
+
+
+async def bench(args):
+    async with MockLLMServer(latency_ms=args.latency_ms, token_ms=args.token_ms) as server:
+        translator = Translator(server.url)
+        await translator.warm_up()
+        print(f"替身LLM：首个词元前 {args.latency_ms}ms，每词元（2字符）{args.token_ms}ms；每项 {args.repeat} 次取中位数")
+        print(f"{'':<6}{'完整响应ms':>12}{'首个纠错字符ms':>16}{'首个译文字符ms':>16}{'流式完成ms':>12}"
+              f"{'增量回调':>10}{'界面更新':>10}")
+        for label, text in SENTENCES.items():
+            rows = [await measure(translator, text, args.update_ms / 1000) for _ in range(args.repeat)]
+            columns = list(zip(*rows))
+            print(f"{label:<6}{percentile(columns[0], 50):>12.0f}{percentile(columns[1], 50):>16.0f}"
+                  f"{percentile(columns[2], 50):>16.0f}{percentile(columns[3], 50):>12.0f}"
+                  f"{percentile(columns[4], 50):>10.0f}{percentile(columns[5], 50):>10.0f}")
+        await translator.close()
+    fuzz_parser(args.fuzz)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式翻译基准")
+    parser.add_argument('--latency-ms', type=int, default=300, help="替身LLM首个词元之前的耗时")
+    parser.add_argument('--token-ms', type=int, default=25, help="替身LLM每个词元的耗时")
+    parser.add_argument('--update-ms', type=int, default=100, help="界面更新最小间隔")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--fuzz', type=int, default=5000, help="解析校验的随机内容条数")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_translation_workers.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 翻译工作池基准 - 偶发慢响应时单协程 vs 并发工作池的排队深度、排队等待、顺序等待与总耗时
+# =============================================================
+
+"""
+翻译工作池基准（本地LLM替身服务器，不需要网络）
+
+分句按指数分布的间隔陆续固化并提交给 TranslationPool；替身LLM每隔 --slow-every 个请求
+注入一次 --slow-ms 的慢响应（接近5秒超时）。处理函数与界面相同（一条走 translate，多条走
+translate_batch）：
+    - 并发 1（旧的单个翻译协程）与 2/4/8 对比，按序交付与完成即交付对比
+    - 排队深度（每100ms采样的平均值和最大值）、同时翻译最多条数
+    - 每条的排队等待、顺序等待（已完成但等前面的分句）、总耗时 p50/p95
+    - 按序交付时校验交付顺序与提交顺序一致，所有译文与分句对应
+
+用法:
+    python3 scripts/bench_translation_workers.py [--utterances 80] [--gap-ms 400] [--slow-ms 4000]
+"""
+
+import asyncio
+import argparse
+import logging
+
+import numpy as np
+
+import bench_common  # noqa: F401  (设置项目路径)
+from bench_common import percentile
+from mock_llm_server import MockLLMServer
+from translator import Translator
+from translation_pool import TranslationPool
+
+
+async def run(server, args, width, ordered, max_items):
+    translator = Translator(server.url)
+    await translator.warm_up()
+    delivered = []
+
+    async def handler(entries):
+        if len(entries) == 1:
+            text = entries[0][1]
+            return [await translator.translate(text, src_lang='zh', tgt_lang='en')]
+        return await translator.translate_batch([(text, 'zh', 'en') for _, text in entries])
+
+    def deliver(text, result):
+        assert result['translation'] == f"[en] {text}", (text, result)
+        delivered.append(int(text.split('#')[1]))
+
+    pool = TranslationPool(handler, deliver, width=width, ordered=ordered, max_items=max_items).start()
+    depths = []
+
+    async def sample():
+        while True:
+            depths.append(pool.queue_depth)
+            await asyncio.sleep(0.1)
+
+    sampler = asyncio.create_task(sample())
+    rng = np.random.default_rng(0)
+    before = server.requests
+    for index in range(args.utterances):
+        await asyncio.sleep(rng.exponential(args.gap_ms / 1000))
+        pool.submit(f"我们来看第几项的数字 #{index}")
+    await pool.close()
+    sampler.cancel()
+    await translator.close()
+    assert sorted(delivered) == list(range(args.utterances))
+    if ordered:
+        assert delivered == list(range(args.utterances)), delivered
+    return pool, depths, server.requests - before
+
+
+async def bench(args):
+    async with MockLLMServer(latency_ms=args.latency_ms, token_ms=5,
+                             slow_every=args.slow_every, slow_ms=args.slow_ms) as server:
+        print(f"{args.utterances} 句，平均固化间隔 {args.gap_ms}ms；替身LLM首个词元前 {args.latency_ms}ms，"
+              f"每 {args.slow_every} 个请求有一个慢 {args.slow_ms}ms")
+        print(f"{'':<22}{'请求':>6}{'排队平均':>9}{'排队最多':>9}{'同时翻译':>9}"
+              f"{'排队等待p50/p95ms':>20}{'顺序等待p95ms':>15}{'总耗时p50/p95ms':>18}")
+        configs = [('单协程（旧）', 1, True, 1)]
+        configs += [(f"并发{width} 按序", width, True, 1) for width in (2, 4, 8)]
+        configs += [("并发4 完成即交付", 4, False, 1), ("并发4 按序+批量8", 4, True, 8)]
+        for label, width, ordered, max_items in configs:
+            pool, depths, requests = await run(server, args, width, ordered, max_items)
+            print(f"{label:<22}{requests:>6}{sum(depths) / len(depths):>9.1f}{pool.max_queue_depth:>9}"
+                  f"{pool.max_in_flight:>9}"
+                  f"{percentile(pool.wait_ms, 50):>11.0f}/{percentile(pool.wait_ms, 95):<8.0f}"
+                  f"{percentile(pool.hold_ms, 95):>15.0f}"
+                  f"{percentile(pool.total_ms, 50):>10.0f}/{percentile(pool.total_ms, 95):<7.0f}")
+    print("按序交付的配置：交付顺序与分句顺序一致；所有配置的译文与分句一一对应")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="翻译工作池基准")
+    parser.add_argument('--utterances', type=int, default=80)
+    parser.add_argument('--gap-ms', type=int, default=400, help="分句固化的平均间隔")
+    parser.add_argument('--latency-ms', type=int, default=400, help="替身LLM首个词元之前的耗时")
+    parser.add_argument('--slow-every', type=int, default=10, help="每隔多少个请求注入一次慢响应")
+    parser.add_argument('--slow-ms', type=int, default=4000, help="慢响应额外耗时")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# =============================================================
+# 文件名(File): bench_translator_pool.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 翻译连接池基准 - 每次新建会话 vs 常驻会话的每请求开销、建立的连接数、预热、空闲断开后重试
+# =============================================================
+
+"""
+翻译连接池基准（本地LLM替身服务器，不需要网络）
+
+替身服务器不注入生成延迟，测得的就是每个翻译请求在模型之外的开销：
+    - 每次新建会话（旧实现）vs 常驻会话：顺序翻译的耗时 p50/p95 和建立的连接数，
+      分别在本机回环（纯客户端开销）和注入新连接建连耗时（--connect-ms，模拟到远端服务的
+      DNS+TCP+TLS）两种情况下
+    - 预热：warm_up 后首个翻译请求的耗时
+    - 并发：突发并发请求时连接数不超过 TRANSLATE_MAX_CONNECTIONS
+    - 空闲断开：服务端关闭空闲连接后下一次翻译仍然成功
+
+用法:
+    python3 scripts/bench_translator_pool.py [-n 50] [--connect-ms 150]
+"""
+
+import time
+import asyncio
+import argparse
+import logging
+
+import aiohttp
+
+import bench_common  # noqa: F401  (设置项目路径)
+from bench_common import percentile
+from mock_llm_server import MockLLMServer
+from translator import Translator
+
+
+class PerRequestSessionTranslator(Translator):
+    """对照：旧实现，每次翻译新建 ClientSession"""
+
+    async def _post(self, headers, payload):
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.api_url, headers=headers, json=payload, timeout=5) as resp:
+                if resp.status != 200:
+                    return resp.status, None
+                return resp.status, await resp.json()
+
+
+async def sequential(translator, n):
+    costs = []
+    for index in range(n):
+        start = time.perf_counter()
+        result = await translator.translate(f"第{index}句", src_lang='zh', tgt_lang='en')
+        costs.append((time.perf_counter() - start) * 1000)
+        assert result['translation'] == f"[en] 第{index}句", result
+    return costs
+
+
+async def compare(n, connect_ms):
+    async with MockLLMServer(connect_latency_ms=connect_ms) as server:
+        for label, translator in (('每次新建会话', PerRequestSessionTranslator(server.url)),
+                                  ('常驻会话', Translator(server.url))):
+            before = server.connections
+            costs = await sequential(translator, n)
+            await translator.close()
+            print(f"  {label:<10} p50 {percentile(costs, 50):7.2f}ms  p95 {percentile(costs, 95):7.2f}ms  "
+                  f"连接 {server.connections - before:>3} 个 / {n} 次翻译")
+
+
+async def warm_up(connect_ms):
+    async with MockLLMServer(connect_latency_ms=connect_ms) as server:
+        for label, warm in (('未预热', False), ('已预热', True)):
+            translator = Translator(server.url)
+            if warm:
+                await translator.warm_up()
+            start = time.perf_counter()
+            await translator.translate("第一句", src_lang='zh', tgt_lang='en')
+            print(f"  {label}：首个翻译 {(time.perf_counter() - start) * 1000:7.2f}ms")
+            await translator.close()
+
+
+async def burst(n):
+    async with MockLLMServer(latency_ms=50) as server:
+        translator = Translator(server.url)
+        results = await asyncio.gather(*(translator.translate(f"并发{index}") for index in range(n)))
+        await translator.close()
+        assert all(result['translation'].endswith(f"并发{index}") for index, result in enumerate(results))
+        print(f"  {n} 个并发翻译：连接 {server.connections} 个，服务端最大并发 {server.max_in_flight}")
+
+
+async def idle_close():
+    async with MockLLMServer(keepalive_s=0.3) as server:
+        translator = Translator(server.url)
+        await translator.translate("空闲之前")
+        await asyncio.sleep(1.0)
+        result = await translator.translate("空闲之后")
+        await translator.close()
+        assert result['translation'].endswith("空闲之后"), result
+        print(f"  服务端0.3s后关闭空闲连接，1s后再次翻译成功（连接 {server.connections} 个）")
+
+
+async def bench(args):
+    print(f"顺序翻译 {args.n} 次（本机回环，无注入延迟）")
+    await compare(args.n, 0)
+    print(f"顺序翻译 {args.n} 次（新连接注入 {args.connect_ms}ms 建连耗时）")
+    await compare(args.n, args.connect_ms)
+    print(f"预热（新连接注入 {args.connect_ms}ms 建连耗时）")
+    await warm_up(args.connect_ms)
+    print("并发")
+    await burst(args.burst)
+    print("空闲断开")
+    await idle_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="翻译连接池基准")
+    parser.add_argument('-n', type=int, default=50, help="顺序翻译次数")
+    parser.add_argument('--connect-ms', type=int, default=150, help="注入的新连接建连耗时（DNS+TCP+TLS）")
+    parser.add_argument('--burst', type=int, default=32, help="并发翻译数")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.ERROR)
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
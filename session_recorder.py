@@ -0,0 +1,252 @@
+# =============================================================
+# 文件名(File): session_recorder.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 会话录音 - 采集音频追加写入预分配的内存映射容器文件，带分句索引，崩溃后可恢复、按分句O(1)切片
+# =============================================================
+
+"""
+会话录音
+
+SessionRecorder 作为 AudioHub 的订阅者，在独立写入线程中把采集帧复制进预分配的内存映射文件，
+采集线程只多一次订阅队列追加。容器文件布局（小端）：
+
+    [0, 4096)              文件头：格式、采样率、已提交的音频字节数、索引条数等
+    [4096, data_offset)    分句索引：每条 (start_ms, end_ms)，固定槽位
+    [data_offset, ...)     PCM数据，按 prealloc_seconds 预分配，写满时扩展
+
+崩溃安全：
+    - 每帧先写数据再更新文件头中的已提交字节数，进程崩溃时已写入页缓存的数据由内核写回，
+      重新打开时以已提交字节数为准，最多丢失正在写的一帧
+    - 写入线程每 flush_interval 秒 msync 一次，系统掉电时最多丢失这段时间的音频
+    - 预分配用 posix_fallocate 实际占用磁盘块，避免磁盘写满时访问映射页触发 SIGBUS
+
+订阅队列溢出丢帧时按帧序号补零，录音时间与采集时间保持一致，会话时间到文件偏移为
+固定换算；分句起止时间由上层从ASR结果写入索引。SessionRecording 只读映射整个文件，
+任意分句的音频切片为零拷贝 memoryview，无需读入整个文件。
+"""
+
+import os
+import time
+import mmap
+import struct
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+RECORDING_MAGIC = b'TCREC\x00\x00\x01'
+RECORDING_VERSION = 1
+HEADER_SIZE = 4096
+# magic, version, sample_rate, channels, sample_width, started_at, data_offset, index_capacity
+_HEADER = struct.Struct('<8sIIHHdQI')
+# 随写入更新的字段各自独立存放：写入线程只更新已提交音频字节数，add_utterance 只更新索引条数
+_DATA_BYTES = struct.Struct('<Q')
+_DATA_BYTES_OFFSET = 64
+_INDEX_COUNT = struct.Struct('<I')
+_INDEX_COUNT_OFFSET = 72
+_CLOSED = struct.Struct('<B')
+_CLOSED_OFFSET = 76
+_INDEX_ENTRY = struct.Struct('<QQ')
+
+def _round_up(value, unit):
+    return -(-value // unit) * unit
+
+class SessionRecorder:
+    """
+    会话录音写入端。
+
+    path: 容器文件路径（已存在时覆盖）
+    sample_rate / channels: 录音格式，与采集输出格式一致（16bit PCM）
+    prealloc_seconds: 每次预分配的音频时长，写满时再扩展同样时长
+    index_capacity: 分句索引槽位数，写满后不再记录新的分句
+    flush_interval: 写入线程 msync 的间隔（秒）
+    """
+
+    def __init__(self, path, sample_rate=16000, channels=1, prealloc_seconds=600, index_capacity=8192,
+                 flush_interval=1.0):
+        self.path = str(path)
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_bytes = 2 * channels
+        self.bytes_per_ms = sample_rate * self.frame_bytes / 1000
+        self.index_capacity = index_capacity
+        self.flush_interval = flush_interval
+        self.data_offset = _round_up(HEADER_SIZE + index_capacity * _INDEX_ENTRY.size, mmap.ALLOCATIONGRANULARITY)
+        self._grow_bytes = _round_up(int(prealloc_seconds * sample_rate) * self.frame_bytes, mmap.PAGESIZE)
+        self.data_bytes = 0
+        self.utterance_count = 0
+        self.gap_frames = 0
+        self.unindexed = 0
+        self.closed = False
+        self._thread = None
+        self._sub = None
+        self._file = open(self.path, 'w+b')
+        self._capacity = 0
+        self._allocate(self._grow_bytes)
+        self._meta = mmap.mmap(self._file.fileno(), self.data_offset)
+        _HEADER.pack_into(self._meta, 0, RECORDING_MAGIC, RECORDING_VERSION, sample_rate, channels, 2,
+                          time.time(), self.data_offset, index_capacity)
+        self._data = mmap.mmap(self._file.fileno(), self._capacity, offset=self.data_offset)
+
+    def _allocate(self, capacity):
+        size = self.data_offset + capacity
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(self._file.fileno(), 0, size)
+        else:
+            self._file.truncate(size)
+        self._capacity = capacity
+
+    def attach(self, source, max_frames=4096):
+        """订阅音频源（AudioStream / FileAudioStream）并启动写入线程；应在音频源开始采集之前调用"""
+        self._sub = source.subscribe('recorder', max_frames=max_frames)
+        # 订阅时 hub 已发布的帧不属于本次录音
+        self._thread = threading.Thread(target=self._run, args=(source.hub.seq,), name='session-recorder', daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self, last_seq):
+        sub = self._sub
+        last_flush = time.monotonic()
+        while True:
+            item = sub.get(timeout=self.flush_interval)
+            if item is not None:
+                seq, view = item
+                if seq > last_seq + 1:
+                    # 订阅队列溢出丢帧：按当前帧长度补零，保持录音与采集时间对齐
+                    missing = seq - last_seq - 1
+                    self.gap_frames += missing
+                    self.write(bytes(len(view) * missing))
+                last_seq = seq
+                self.write(view)
+            elif sub.closed:
+                break
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self.flush()
+                last_flush = time.monotonic()
+
+    def write(self, pcm):
+        """追加PCM；未使用 attach 时可直接调用（单一写入者）"""
+        n = len(pcm)
+        if self.data_bytes + n > self._capacity:
+            self._grow(self.data_bytes + n)
+        self._data[self.data_bytes:self.data_bytes + n] = pcm
+        self.data_bytes += n
+        _DATA_BYTES.pack_into(self._meta, _DATA_BYTES_OFFSET, self.data_bytes)
+
+    def _grow(self, needed):
+        capacity = self._capacity
+        while capacity < needed:
+            capacity += self._grow_bytes
+        self._data.flush()
+        self._data.close()
+        self._allocate(capacity)
+        self._data = mmap.mmap(self._file.fileno(), capacity, offset=self.data_offset)
+
+    def add_utterance(self, start_ms, end_ms):
+        """记录一个分句的起止时间（录音时间），返回索引号；索引已满时返回 None"""
+        if self.utterance_count >= self.index_capacity:
+            self.unindexed += 1
+            if self.unindexed == 1:
+                logger.warning(f"录音分句索引已满（{self.index_capacity}条），之后的分句不再记录")
+            return None
+        index = self.utterance_count
+        _INDEX_ENTRY.pack_into(self._meta, HEADER_SIZE + index * _INDEX_ENTRY.size, int(start_ms), int(end_ms))
+        self.utterance_count += 1
+        _INDEX_COUNT.pack_into(self._meta, _INDEX_COUNT_OFFSET, self.utterance_count)
+        return index
+
+    @property
+    def duration_ms(self) -> float:
+        return self.data_bytes / self.bytes_per_ms
+
+    def flush(self):
+        """把已写入的数据和文件头写回磁盘"""
+        if not self.closed:
+            self._data.flush()
+            self._meta.flush()
+
+    def close(self):
+        """停止订阅，写完剩余帧后截掉未使用的预分配空间"""
+        if self.closed:
+            return
+        if self._sub is not None:
+            self._sub.close()
+            self._thread.join()
+        _CLOSED.pack_into(self._meta, _CLOSED_OFFSET, 1)
+        self._data.flush()
+        self._meta.flush()
+        self._data.close()
+        self._meta.close()
+        self._file.truncate(self.data_offset + self.data_bytes)
+        self._file.close()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class SessionRecording:
+    """
+    只读打开会话录音容器（包括崩溃后未正常关闭的文件）。
+
+    slice / utterance_pcm 返回只读映射上的 memoryview，不复制数据；释放这些切片后再调用 close。
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = open(self.path, 'rb')
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.sample_rate, self.channels, sample_width, self.started_at, self.data_offset,
+         self.index_capacity) = _HEADER.unpack_from(self._mm, 0)
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            self.close()
+            raise ValueError(f"不是会话录音文件或版本不支持: {self.path}")
+        data_bytes, = _DATA_BYTES.unpack_from(self._mm, _DATA_BYTES_OFFSET)
+        utterance_count, = _INDEX_COUNT.unpack_from(self._mm, _INDEX_COUNT_OFFSET)
+        closed, = _CLOSED.unpack_from(self._mm, _CLOSED_OFFSET)
+        self.frame_bytes = sample_width * self.channels
+        self.bytes_per_ms = self.sample_rate * self.frame_bytes / 1000
+        # 崩溃后以已提交字节数为准，并不超过文件实际大小
+        available = len(self._mm) - self.data_offset
+        self.data_bytes = min(data_bytes, available) // self.frame_bytes * self.frame_bytes
+        self.clean_close = bool(closed)
+        self.utterances = [_INDEX_ENTRY.unpack_from(self._mm, HEADER_SIZE + i * _INDEX_ENTRY.size)
+                           for i in range(min(utterance_count, self.index_capacity))]
+        self._view = memoryview(self._mm)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.data_bytes / self.bytes_per_ms
+
+    def offset(self, ms) -> int:
+        """录音时间对应的文件偏移（按帧对齐，限制在已提交范围内）"""
+        position = int(ms * self.bytes_per_ms) // self.frame_bytes * self.frame_bytes
+        return self.data_offset + min(max(position, 0), self.data_bytes)
+
+    def slice(self, start_ms, end_ms) -> memoryview:
+        """[start_ms, end_ms) 的PCM"""
+        return self._view[self.offset(start_ms):self.offset(end_ms)]
+
+    def utterance_pcm(self, index) -> memoryview:
+        start_ms, end_ms = self.utterances[index]
+        return self.slice(start_ms, end_ms)
+
+    def close(self):
+        view = getattr(self, '_view', None)
+        if view is not None:
+            view.release()
+            self._view = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
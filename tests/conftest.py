@@ -0,0 +1,12 @@
+# =============================================================
+# 文件名(File): conftest.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): pytest 公共配置 - 将项目根目录加入模块搜索路径
+# =============================================================
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,70 @@
+# =============================================================
+# 文件名(File): test_asr_reconnect.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 断线重连测试 - 没有事件消费者、on_result 不读取payload时，重连仍只重放未固化的音频
+# =============================================================
+
+import asyncio
+
+from asr_client import ASR_SAMPLE_RATE, VolcanoASRClientAsync
+from mock_asr_server import MockASRServer
+
+AUDIO_MS = 12000
+CHUNK_MS = 200
+
+
+def audio_generator():
+    chunk_bytes = ASR_SAMPLE_RATE * 2 * CHUNK_MS // 1000
+    total = AUDIO_MS // CHUNK_MS
+
+    async def generate():
+        for index in range(total):
+            yield bytes(chunk_bytes), index == total - 1
+    return generate()
+
+
+def run_with_disconnect(on_result):
+    async def main():
+        async with MockASRServer(utterance_ms=3000, disconnect_after_ms=AUDIO_MS // 2, fail_sessions=1) as server:
+            client = VolcanoASRClientAsync(on_result=on_result, ws_url=server.url)
+            client.reconnect_delay = 0.05
+            async with client as asr:
+                await asr.run(audio_generator())
+            return client, [session.audio_ms for session in server.sessions]
+    return asyncio.run(main())
+
+
+def test_replay_starts_at_acked_without_payload_consumers():
+    ended = []
+
+    def on_result(response):
+        # 只看结束标记，不解码payload
+        if response.is_last_package:
+            ended.append(True)
+
+    client, sessions = run_with_disconnect(on_result)
+    assert ended and client.reconnect_count == 1 and len(sessions) == 2
+    # 断线前已固化的分句不重放：第二个会话只收到已固化位置之后的音频
+    assert client._acked_ms >= AUDIO_MS // 2 - 3000
+    assert sessions[1] <= AUDIO_MS - client._conn_offset_ms
+    assert sessions[1] < AUDIO_MS
+
+
+def test_no_duplicate_finalized_utterances_after_reconnect():
+    definite = []
+
+    def on_result(response):
+        result = (response.payload_msg or {}).get('result') or {}
+        for utt in result.get('utterances', []):
+            if utt.get('definite') and (utt['start_time'], utt['end_time']) not in definite:
+                definite.append((utt['start_time'], utt['end_time']))
+
+    run_with_disconnect(on_result)
+    # 分句首尾相接、无重叠，覆盖到音频末尾
+    position = 0
+    for start, end in definite:
+        assert start == position, definite
+        position = end
+    assert position == AUDIO_MS
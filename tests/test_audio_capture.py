@@ -0,0 +1,127 @@
+# =============================================================
+# 文件名(File): test_audio_capture.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 采集流断开检测测试 - 用假的音频引擎验证首帧较慢时不重开、停止送帧后重开且 hub 不中断
+# =============================================================
+
+import time
+import threading
+
+import pytest
+
+pytest.importorskip("pyaudio")
+
+import audio_capture_pyaudio
+from audio_capture_pyaudio import AudioStream
+
+FRAME_BYTES = 320     # 10ms 16kHz 单声道
+
+
+class FakeStream:
+    """按计划调用采集回调：首帧前等待 first_delay 秒，之后每 interval 秒一帧，共 count 帧"""
+
+    def __init__(self, callback, first_delay, count, interval=0.01):
+        self.callback = callback
+        self.plan = (first_delay, count, interval)
+        self.closed = threading.Event()
+        self.thread = None
+
+    def start_stream(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        first_delay, count, interval = self.plan
+        if self.closed.wait(first_delay):
+            return
+        for _ in range(count):
+            self.callback(bytes(FRAME_BYTES), FRAME_BYTES // 2, {}, 0)
+            if self.closed.wait(interval):
+                return
+
+    def stop_stream(self):
+        self.closed.set()
+
+    def close(self):
+        self.closed.set()
+
+
+class FakeEngine:
+    """AudioEngine 的替身：每次 open_input 按 plans 中的下一项创建 FakeStream"""
+
+    INFO = {'index': 0, 'name': "Fake Mic", 'defaultSampleRate': 16000, 'maxInputChannels': 1}
+
+    def __init__(self, plans):
+        self.plans = list(plans)
+        self.opened = []
+        self.refreshes = 0
+
+    def default_input_info(self):
+        return self.INFO
+
+    def device_info(self, index):
+        return self.INFO
+
+    def find_input_device(self, name):
+        return self.INFO if name == self.INFO['name'] else None
+
+    def open_input(self, stream_callback, **kwargs):
+        first_delay, count = self.plans.pop(0) if self.plans else (0, 1000)
+        stream = FakeStream(stream_callback, first_delay, count)
+        self.opened.append(stream)
+        return stream
+
+    def close_stream(self, stream):
+        stream.stop_stream()
+        stream.close()
+
+    def refresh(self):
+        self.refreshes += 1
+        return True
+
+
+@pytest.fixture
+def short_timeouts(monkeypatch):
+    monkeypatch.setattr(audio_capture_pyaudio, 'DEVICE_STALL_S', 0.1)
+    monkeypatch.setattr(audio_capture_pyaudio, 'DEVICE_FIRST_FRAME_S', 0.6)
+
+
+def capture(engine, seconds):
+    audio = AudioStream(engine=engine)
+    sub = audio.subscribe('test', max_frames=10000)
+    audio.start()
+    time.sleep(seconds)
+    audio.stop()
+    frames = []
+    while (item := sub.get(timeout=0)) is not None:
+        frames.append(item[0])
+    return audio, frames
+
+
+def test_slow_first_frame_not_reopened(short_timeouts):
+    # 首帧在 0.3s 后才到：超过 DEVICE_STALL_S，但未超过 DEVICE_FIRST_FRAME_S
+    engine = FakeEngine([(0.3, 1000)])
+    audio, frames = capture(engine, 0.6)
+    assert len(engine.opened) == 1 and engine.refreshes == 0 and audio.device_switches == 0
+    assert frames and audio.first_frame_ms >= 250
+
+
+def test_stalled_stream_reopened_without_interrupting_hub(short_timeouts):
+    # 第一个流送 10 帧后停止，重新打开的流继续送帧
+    engine = FakeEngine([(0, 10), (0, 1000)])
+    audio, frames = capture(engine, 0.6)
+    assert len(engine.opened) == 2 and engine.refreshes == 1 and audio.device_switches == 1
+    # hub 的帧序号在重开前后连续，订阅者没有被关闭
+    assert len(frames) > 10 and frames == list(range(1, len(frames) + 1))
+
+
+def test_stream_without_first_frame_reopened_after_first_frame_timeout(short_timeouts):
+    engine = FakeEngine([(10, 0), (0, 1000)])
+    started = time.perf_counter()
+    audio, frames = capture(engine, 0.9)
+    assert len(engine.opened) == 2 and audio.device_switches == 1 and frames
+    # 重开发生在 DEVICE_FIRST_FRAME_S 之后，而不是 DEVICE_STALL_S
+    assert audio.first_frame_ms >= 550
+    assert time.perf_counter() - started < 5
@@ -0,0 +1,46 @@
+# =============================================================
+# 文件名(File): test_audio_codec.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): Ogg页封装/解析测试 - 往返、255字节倍数的lacing、CRC校验；Opus编码往返需要opuslib
+# =============================================================
+
+import pytest
+
+from audio_codec import (OGG_FLAG_BOS, OGG_FLAG_EOS, OggOpusEncoder, build_ogg_page, opuslib,
+                         parse_ogg_pages)
+
+
+def test_ogg_page_roundtrip():
+    packets = [b'a' * 10, b'', b'b' * 255, b'c' * 600]
+    data = build_ogg_page(packets[:2], 0, 7, 0, OGG_FLAG_BOS) + build_ogg_page(packets[2:], 960, 7, 1, OGG_FLAG_EOS)
+    pages = parse_ogg_pages(data)
+    assert [(flags, granule, serial, seq) for flags, granule, serial, seq, _ in pages] == \
+        [(OGG_FLAG_BOS, 0, 7, 0), (OGG_FLAG_EOS, 960, 7, 1)]
+    assert [packet for *_, page_packets in pages for packet in page_packets] == packets
+
+
+def test_ogg_crc_mismatch_rejected():
+    page = bytearray(build_ogg_page([b'payload'], 0, 1, 0))
+    page[-1] ^= 0xFF
+    with pytest.raises(ValueError):
+        parse_ogg_pages(bytes(page))
+
+
+def test_ogg_page_lacing_limit():
+    with pytest.raises(ValueError):
+        build_ogg_page([b'x' * 255 * 255], 0, 1, 0)
+
+
+@pytest.mark.skipif(opuslib is None, reason="需要opuslib和系统libopus")
+def test_opus_encoder_stream_is_valid_ogg():
+    encoder = OggOpusEncoder(16000)
+    pcm = bytes(16000 * 2)  # 1秒静音
+    data = encoder.encode_chunk(pcm[:16000], False) + encoder.encode_chunk(pcm[16000:], True)
+    pages = parse_ogg_pages(data)
+    assert pages[0][0] & OGG_FLAG_BOS
+    assert pages[-1][0] & OGG_FLAG_EOS
+    # EOS页 granule 只计真实样本（48kHz）加 pre_skip
+    assert pages[-1][1] == encoder.pre_skip + 48000
+    encoder.close()
@@ -0,0 +1,126 @@
+# =============================================================
+# 文件名(File): test_audio_hub.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 音频采集中心测试 - 多订阅者不丢帧、不重复、共享内存，溢出策略，关闭与异步订阅
+# =============================================================
+
+import asyncio
+import threading
+
+import pytest
+
+from audio_hub import AudioHub
+
+
+def drain(sub):
+    frames = []
+    while True:
+        item = sub.get(timeout=0)
+        if item is None:
+            return frames
+        frames.append(item)
+
+
+def test_every_subscriber_gets_every_frame_once():
+    hub = AudioHub()
+    subs = [hub.subscribe(f"s{index}", max_frames=1000) for index in range(3)]
+    payloads = [bytes([index]) * 4 for index in range(200)]
+    for payload in payloads:
+        hub.publish(payload)
+    for sub in subs:
+        frames = drain(sub)
+        assert [seq for seq, _ in frames] == list(range(1, 201))
+        assert [bytes(view) for _, view in frames] == payloads
+        assert sub.dropped == 0
+
+
+def test_frames_shared_and_readonly():
+    hub = AudioHub()
+    a, b = hub.subscribe('a'), hub.subscribe('b')
+    hub.publish(bytearray(b'\x01\x02'))
+    (_, view_a), (_, view_b) = a.get(timeout=0), b.get(timeout=0)
+    assert view_a.obj is view_b.obj
+    assert view_a.readonly
+    with pytest.raises(TypeError):
+        view_a[0] = 0
+
+
+def test_concurrent_consumer_sees_no_gaps():
+    hub = AudioHub()
+    sub = hub.subscribe('reader', max_frames=10000)
+    received = []
+
+    def reader():
+        while True:
+            item = sub.get(timeout=2)
+            if item is None:
+                return
+            received.append(item[0])
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for index in range(5000):
+        hub.publish(index.to_bytes(4, 'little'))
+    hub.close()
+    thread.join(5)
+    assert received == list(range(1, 5001))
+
+
+@pytest.mark.parametrize('policy, expected', [('drop_oldest', [3, 4]), ('drop_newest', [1, 2])])
+def test_overflow_policies(policy, expected):
+    hub = AudioHub()
+    sub = hub.subscribe('slow', max_frames=2, overflow=policy)
+    for index in range(4):
+        hub.publish(bytes([index]))
+    assert [seq for seq, _ in drain(sub)] == expected
+    assert sub.dropped == 2
+
+
+def test_overflow_close_marks_subscription():
+    hub = AudioHub()
+    sub = hub.subscribe('recorder', max_frames=2, overflow='close')
+    other = hub.subscribe('asr', max_frames=10)
+    for index in range(3):
+        hub.publish(bytes([index]))
+    assert sub.overflowed and sub.closed
+    # 关闭前已排队的帧仍可取出，之后返回 None
+    assert [seq for seq, _ in drain(sub)] == [1, 2]
+    assert sub.get(timeout=0) is None
+    # 其他订阅者不受影响
+    assert [seq for seq, _ in drain(other)] == [1, 2, 3]
+
+
+def test_unsubscribe_stops_delivery():
+    hub = AudioHub()
+    sub = hub.subscribe('a')
+    hub.publish(b'\x00')
+    sub.close()
+    hub.publish(b'\x01')
+    assert hub.subscribers == ()
+    assert [seq for seq, _ in drain(sub)] == [1]
+
+
+def test_async_subscription_from_publisher_thread():
+    async def main():
+        hub = AudioHub()
+        sub = hub.subscribe_async('async', max_frames=1000)
+
+        def publisher():
+            for index in range(300):
+                hub.publish(index.to_bytes(2, 'little'))
+            hub.close()
+
+        thread = threading.Thread(target=publisher)
+        thread.start()
+        seqs = []
+        while True:
+            item = await asyncio.wait_for(sub.get(), 5)
+            if item is None:
+                break
+            seqs.append(item[0])
+        thread.join()
+        return seqs
+
+    assert asyncio.run(main()) == list(range(1, 301))
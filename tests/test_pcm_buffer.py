@@ -0,0 +1,67 @@
+# =============================================================
+# 文件名(File): test_pcm_buffer.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): PCM环形缓冲测试 - 奇数长度写入、尾巴截断到整采样、跨越末尾、溢出丢弃
+# =============================================================
+
+import random
+
+import pytest
+
+from pcm_buffer import PcmRingBuffer
+
+
+def test_odd_length_writes_keep_stream_intact():
+    rng = random.Random(1)
+    stream = bytes(rng.randrange(256) for _ in range(10001))
+    buffer = PcmRingBuffer(chunk_bytes=640, capacity_chunks=4)
+    out = bytearray()
+    position = 0
+    while position < len(stream):
+        size = rng.choice([1, 3, 7, 333, 641])
+        buffer.write(stream[position:position + size])
+        position += size
+        while (chunk := buffer.read_chunk()) is not None:
+            assert len(chunk) == 640
+            out += chunk
+    tail = buffer.read_tail()
+    out += tail
+    # 10001 字节：最后一个不成整采样的字节被丢弃
+    assert bytes(out) == stream[:10000]
+    assert len(tail) % 2 == 0
+    assert buffer.dropped_bytes == 1
+    assert len(buffer) == 0
+
+
+def test_tail_with_only_half_sample():
+    buffer = PcmRingBuffer(chunk_bytes=4, capacity_chunks=2)
+    buffer.write(b'\x01')
+    assert buffer.read_chunk() is None
+    assert buffer.read_tail() is None
+    assert buffer.dropped_bytes == 1
+
+
+def test_chunk_size_aligned_to_sample_width():
+    assert PcmRingBuffer(chunk_bytes=641).chunk_bytes == 640
+    with pytest.raises(ValueError):
+        PcmRingBuffer(chunk_bytes=1)
+    with pytest.raises(ValueError):
+        PcmRingBuffer(chunk_bytes=4, capacity_chunks=1)
+
+
+def test_overflow_drops_oldest_whole_chunks():
+    buffer = PcmRingBuffer(chunk_bytes=4, capacity_chunks=2)
+    buffer.write(bytes(range(10)))
+    # 容量8字节：丢弃最旧的一整块（4字节），保留之后的数据
+    assert buffer.dropped_bytes == 4
+    assert bytes(buffer.read_chunk()) == bytes(range(4, 8))
+    assert bytes(buffer.read_tail()) == bytes(range(8, 10))
+
+
+def test_chunks_are_readonly_views():
+    buffer = PcmRingBuffer(chunk_bytes=4, capacity_chunks=2)
+    buffer.write(b'\x00' * 4)
+    chunk = buffer.read_chunk()
+    assert isinstance(chunk, memoryview) and chunk.readonly
@@ -0,0 +1,64 @@
+# =============================================================
+# 文件名(File): test_translation_pool.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 翻译工作池测试 - 乱序完成时按序交付、处理函数异常、结果条数不符时不阻塞后续分句
+# =============================================================
+
+import asyncio
+
+from translation_pool import TranslationPool
+
+
+def run_pool(handler, count, **kwargs):
+    delivered = []
+
+    async def main():
+        pool = TranslationPool(handler, lambda item, result: delivered.append((item, result)), **kwargs).start()
+        for index in range(count):
+            pool.submit(index)
+        await asyncio.wait_for(pool.close(), 5)
+        return pool
+
+    return asyncio.run(main()), delivered
+
+
+async def reversed_delay(entries):
+    # 序号越小完成越晚
+    await asyncio.sleep(0.01 * (10 - entries[0][0]))
+    return [f"t{item}" for _, item in entries]
+
+
+def test_ordered_delivery_when_completing_out_of_order():
+    pool, delivered = run_pool(reversed_delay, 10, width=4)
+    assert delivered == [(index, f"t{index}") for index in range(10)]
+    assert pool.max_in_flight == 4 and len(pool.total_ms) == 10
+
+
+def test_unordered_delivery_delivers_on_completion():
+    _, delivered = run_pool(reversed_delay, 4, width=4, ordered=False)
+    assert [item for item, _ in delivered] == [3, 2, 1, 0]
+
+
+def test_handler_exception_fails_batch_only():
+    async def handler(entries):
+        if entries[0][1] == 1:
+            raise ValueError("boom")
+        return [f"t{item}" for _, item in entries]
+
+    _, delivered = run_pool(handler, 3, width=1)
+    assert [item for item, _ in delivered] == [0, 1, 2]
+    assert isinstance(delivered[1][1], ValueError) and delivered[2][1] == "t2"
+
+
+def test_short_results_do_not_stall_ordered_delivery():
+    async def handler(entries):
+        # 批量处理丢了最后一条结果
+        return [f"t{item}" for _, item in entries][:-1]
+
+    # 提交时工作任务尚未运行，第一批取满3条
+    _, delivered = run_pool(handler, 4, width=1, max_items=3)
+    assert [item for item, _ in delivered] == [0, 1, 2, 3]
+    assert delivered[0][1] == "t0" and delivered[1][1] == "t1"
+    assert isinstance(delivered[2][1], RuntimeError) and isinstance(delivered[3][1], RuntimeError)
@@ -0,0 +1,174 @@
+# =============================================================
+# 文件名(File): test_translator.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 翻译测试 - 流式段落增量解析（标记跨数据块）、损坏的SSE数据行、批量JSON解析与逐条重试、连接预热
+# =============================================================
+
+import json
+import asyncio
+
+from aiohttp import web
+
+from mock_llm_server import MockLLMServer
+from translator import SectionParser, Translator, parse_batch, parse_sections
+
+RESPONSE = "【纠错后原文】我们下周二开会\n【翻译结果】We meet next Tuesday\n"
+
+
+def feed_in_chunks(content, size):
+    parser = SectionParser()
+    for start in range(0, len(content), size):
+        parser.feed(content[start:start + size])
+    return parser
+
+
+def test_markers_split_across_chunks():
+    # 每种切块大小都会把标记拆在不同数据块中
+    for size in range(1, len(RESPONSE) + 1):
+        parser = feed_in_chunks(RESPONSE, size)
+        assert (parser.corrected, parser.translation) == parse_sections(RESPONSE), size
+        assert parser.content == RESPONSE
+
+
+def test_feed_reports_changes_only_for_section_content():
+    parser = SectionParser()
+    assert parser.feed("【纠错") is False
+    assert parser.feed("后原文】") is True and parser.corrected == ""
+    assert parser.feed("你好") is True and parser.corrected == "你好"
+    assert parser.feed("\n多余的一行\n") is False
+    assert parser.feed("  【翻译结果】Hello") is True
+    assert (parser.corrected, parser.translation) == ("你好", "Hello")
+
+
+def test_repeated_section_keeps_last():
+    content = "【翻译结果】first\n【翻译结果】second\n"
+    parser = feed_in_chunks(content, 3)
+    assert parser.translation == "second" == parse_sections(content)[1]
+
+
+def serve_sse(lines):
+    """启动本地SSE服务器，按行返回 lines，返回 (runner, url)"""
+    async def handle(request):
+        resp = web.StreamResponse(headers={'Content-Type': 'text/event-stream'})
+        await resp.prepare(request)
+        for line in lines:
+            await resp.write(f"data: {line}\n\n".encode())
+        await resp.write(b"data: [DONE]\n\n")
+        return resp
+
+    async def start():
+        app = web.Application()
+        app.router.add_post('/{tail:.*}', handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return runner, f"http://127.0.0.1:{port}/chat/completions"
+    return start()
+
+
+def delta(content):
+    return json.dumps({'choices': [{'delta': {'content': content}}]}, ensure_ascii=False)
+
+
+def translate_stream(lines):
+    async def main():
+        runner, url = await serve_sse(lines)
+        translator = Translator(url)
+        partials = []
+        try:
+            return await translator.translate("我们下周二开会", src_lang='zh', tgt_lang='en',
+                                              on_partial=lambda *args: partials.append(args)), partials
+        finally:
+            await translator.close()
+            await runner.cleanup()
+    return asyncio.run(main())
+
+
+def test_malformed_sse_line_skipped():
+    result, partials = translate_stream([delta("【纠错后原文】我们下周二开会\n"), '{"choices": [', "not json",
+                                         delta("【翻译结果】We meet next Tuesday")])
+    assert (result['corrected'], result['translation']) == ("我们下周二开会", "We meet next Tuesday")
+    assert partials[-1] == ("我们下周二开会", "We meet next Tuesday")
+
+
+def test_stream_with_only_malformed_lines_fails():
+    result, partials = translate_stream(['{"choices": [', "not json"])
+    assert result['corrected'] == "[异常]" and result['translation'] == "我们下周二开会"
+    assert partials == []
+
+
+def batch_json(*items):
+    return json.dumps({'items': [{'id': index, 'corrected': corrected, 'translation': translation}
+                                 for index, corrected, translation in items]}, ensure_ascii=False)
+
+
+def test_parse_batch_valid():
+    content = batch_json((1, "你好", "Hello"), (2, " 谢谢 ", " Thanks "))
+    assert parse_batch(content, 2) == {0: ("你好", "Hello"), 1: ("谢谢", "Thanks")}
+
+
+def test_parse_batch_tolerates_fence_and_extra_text():
+    content = "好的，结果如下：\n```json\n" + batch_json((1, "你好", "Hello")) + "\n```\n以上。"
+    assert parse_batch(content, 1) == {0: ("你好", "Hello")}
+
+
+def test_parse_batch_broken_json():
+    assert parse_batch('{"items": [{"id": 1, "corrected": "你好"', 1) == {}
+    assert parse_batch("没有JSON", 1) == {}
+    assert parse_batch('{"items": "x"}', 1) == {}
+    assert parse_batch('[{"id": 1}]', 1) == {}
+
+
+def test_parse_batch_skips_missing_and_invalid_items():
+    content = json.dumps({'items': [
+        {'id': 1, 'corrected': "一", 'translation': "one"},
+        {'id': 3, 'corrected': "三", 'translation': "three"},      # 超出条数
+        {'id': 0, 'corrected': "零", 'translation': "zero"},       # 编号从1开始
+        {'id': "x", 'corrected': "x", 'translation': "x"},
+        {'corrected': "无编号", 'translation': "no id"},
+        {'id': 2, 'corrected': "  ", 'translation': ""},            # 内容为空
+        "not an item",
+    ]}, ensure_ascii=False)
+    assert parse_batch(content, 2) == {0: ("一", "one")}
+
+
+def test_parse_batch_string_ids():
+    assert parse_batch('{"items": [{"id": "2", "corrected": "二", "translation": "two"}]}', 2) == {1: ("二", "two")}
+
+
+def test_translate_batch_retries_items_when_json_broken():
+    async def main():
+        async with MockLLMServer(broken_batches=1) as server:
+            translator = Translator(server.url)
+            try:
+                results = await translator.translate_batch([(f"第{index}句", 'zh', 'en') for index in range(3)])
+            finally:
+                await translator.close()
+            return results, server.requests
+
+    results, requests = asyncio.run(main())
+    assert [result['translation'] for result in results] == [f"[en] 第{index}句" for index in range(3)]
+    # 一次损坏的批量请求 + 三次逐条重试
+    assert requests == 4
+
+
+def test_warm_up_connection_reused_without_calling_api():
+    async def main():
+        # 替身服务根路径返回空响应（HEAD 时不带 Content-Length）
+        async with MockLLMServer() as server:
+            translator = Translator(server.url)
+            try:
+                await translator.warm_up()
+                warmed = (server.connections, server.requests)
+                await translator.translate("你好", src_lang='zh', tgt_lang='en')
+            finally:
+                await translator.close()
+            return warmed, server.connections
+
+    warmed, connections = asyncio.run(main())
+    assert warmed == (1, 0)
+    assert connections == 1
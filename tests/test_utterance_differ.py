@@ -0,0 +1,55 @@
+# =============================================================
+# 文件名(File): test_utterance_differ.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 分句增量事件测试 - 固化分句去重、中间结果只在变化时产出、已固化位置
+# =============================================================
+
+from asr_client import PartialUpdated, UtteranceDiffer, UtteranceFinalized
+
+
+def message(*utterances):
+    return {'result': {'utterances': [
+        {'text': text, 'start_time': start, 'end_time': end, 'definite': definite}
+        for text, start, end, definite in utterances]}}
+
+
+def test_finalized_utterances_reported_once():
+    differ = UtteranceDiffer()
+    first = differ.feed(message(("你好", 0, 800, True), ("今天", 900, 1200, False)))
+    assert [type(event) for event in first] == [UtteranceFinalized, PartialUpdated]
+    assert first[0].utterance['text'] == "你好" and first[1].text == "今天"
+
+    # 服务端每次下发完整列表：已固化的分句不再产出，新固化的按时间顺序产出
+    second = differ.feed(message(("你好", 0, 800, True), ("今天天气", 900, 1500, True),
+                                 ("不错", 1600, 1900, True)))
+    assert [event.utterance['text'] for event in second if isinstance(event, UtteranceFinalized)] == \
+        ["今天天气", "不错"]
+    assert differ.feed(message(("你好", 0, 800, True), ("今天天气", 900, 1500, True),
+                               ("不错", 1600, 1900, True))) == []
+
+
+def test_partial_only_when_changed():
+    differ = UtteranceDiffer()
+    events = differ.feed(message(("一", 0, 100, False)))
+    assert len(events) == 1 and isinstance(events[0], PartialUpdated) and events[0].text == "一"
+    assert differ.feed(message(("一", 0, 100, False))) == []
+    # 中间结果被固化后清空
+    events = differ.feed(message(("一二", 0, 300, True)))
+    assert isinstance(events[-1], PartialUpdated) and events[-1].text == ""
+
+
+def test_acked_ms_tracks_latest_finalized_end():
+    differ = UtteranceDiffer()
+    differ.feed(message(("一", 0, 500, True), ("二", 600, 900, False)))
+    assert differ.acked_ms == 500
+    differ.feed(message(("一", 0, 500, True), ("二", 600, 1100, True)))
+    assert differ.acked_ms == 1100
+
+
+def test_empty_or_foreign_payload():
+    differ = UtteranceDiffer()
+    assert differ.feed(None) == []
+    assert differ.feed({'result': 'x'}) == []
+    assert differ.feed({'result': {}}) == []
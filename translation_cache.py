@@ -0,0 +1,323 @@
+# =============================================================
+# 文件名(File): translation_cache.py
+# 版本(Version): v1.2.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 翻译缓存 - 内存LRU + SQLite持久层（TTL、按条数淘汰），相同请求并发时只调用一次上游
+# 修改记录(Changes):
+#   - translate 支持 on_partial：未命中时流式调用上游；命中和合并的请求直接得到完整结果
+#   - 新增 translate_batch：逐条查缓存，只把未命中的条目合并为一个上游批量请求
+#   - TRANSLATE_CACHE_DB 为相对路径时放在应用数据目录下，不再随工作目录变化
+# =============================================================
+
+"""
+翻译缓存
+
+会议中“好的”“Thank you”“下一页”之类的短句反复出现，每次都完整调用一次LLM。CachedTranslator
+包在 Translator 外面，接口相同（translate / translate_batch / warm_up / close）：
+
+    - 缓存键：规范化文本（NFKC、合并空白）+ 源/目标语言 + 模型 + 提示词版本（PROMPT_VERSION）
+    - 内存层：OrderedDict LRU，最多 memory_entries 条
+    - 磁盘层：SQLite（WAL），超过 ttl_s 的条目视为未命中并删除，超过 max_rows 时按最近访问时间淘汰；
+      所有数据库操作在单独的一个线程中执行，不阻塞事件循环
+    - 单飞：相同键的请求正在调用上游时，后来的请求等待同一个结果，不再重复调用
+    - 只缓存成功的翻译（corrected 不是 TRANSLATION_FAILURES 中的失败标记）
+
+stats 中统计各层命中、合并、未命中次数，以及按上游平均耗时估算的节省时间。
+"""
+
+import os
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import logging
+import unicodedata
+import collections
+from concurrent.futures import ThreadPoolExecutor
+
+from config_manager import config_manager
+from translator import Translator, PROMPT_VERSION, TRANSLATION_FAILURES
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    key TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+)
+"""
+
+def normalize_text(text) -> str:
+    """NFKC（全角转半角等）并合并空白；不改变大小写和标点"""
+    return ' '.join(unicodedata.normalize('NFKC', text).split())
+
+def cache_key(text, src_lang, tgt_lang, model) -> str:
+    raw = json.dumps([PROMPT_VERSION, model, src_lang, tgt_lang, normalize_text(text)], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class TranslationStore:
+    """
+    SQLite 持久层，方法均为阻塞调用，只在 CachedTranslator 的数据库线程中使用。
+
+    ttl_s: 条目有效期（秒），0 为不过期
+    max_rows: 最多保存的条目数，超出时淘汰最久未访问的约10%
+    """
+
+    def __init__(self, path, ttl_s=30 * 86400, max_rows=100000):
+        self.path = str(path)
+        self.ttl_s = ttl_s
+        self.max_rows = max_rows
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS translations_accessed ON translations (accessed)")
+        self._conn.commit()
+        self._rows = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def get(self, key):
+        row = self._conn.execute("SELECT result, created FROM translations WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if self.ttl_s and now - row[1] > self.ttl_s:
+            self._conn.execute("DELETE FROM translations WHERE key = ?", (key,))
+            self._conn.commit()
+            self._rows -= 1
+            return None
+        self._conn.execute("UPDATE translations SET accessed = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        now = time.time()
+        inserted = self._conn.execute(
+            "INSERT OR REPLACE INTO translations (key, result, created, accessed) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(result, ensure_ascii=False), now, now)).rowcount
+        self._rows += inserted
+        if self._rows > self.max_rows:
+            self._evict(now)
+        self._conn.commit()
+
+    def _evict(self, now):
+        """删除过期条目；仍然超出时按最近访问时间删除最旧的一批"""
+        if self.ttl_s:
+            self._conn.execute("DELETE FROM translations WHERE created < ?", (now - self.ttl_s,))
+        self._rows = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        excess = self._rows - self.max_rows
+        if excess > 0:
+            batch = excess + self.max_rows // 10
+            self._conn.execute("DELETE FROM translations WHERE key IN "
+                               "(SELECT key FROM translations ORDER BY accessed LIMIT ?)", (batch,))
+            self._rows = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def __len__(self):
+        return self._rows
+
+    def close(self):
+        self._conn.close()
+
+class CachedTranslator:
+    """
+    带缓存的翻译器，接口与 Translator 相同。
+
+    translator: 上游 Translator
+    memory_entries: 内存LRU条数
+    store: TranslationStore，None 表示只用内存层
+    """
+
+    def __init__(self, translator=None, memory_entries=2048, store=None):
+        self.translator = translator or Translator()
+        self.memory_entries = memory_entries
+        self.store = store
+        self._memory = collections.OrderedDict()
+        self._in_flight = {}
+        self._db = ThreadPoolExecutor(max_workers=1, thread_name_prefix='translation-cache') if store is not None else None
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'coalesced': 0, 'misses': 0,
+                      'upstream_ms': 0.0, 'saved_ms': 0.0}
+
+    @property
+    def api_url(self):
+        return self.translator.api_url
+
+    @property
+    def usage(self):
+        return self.translator.usage
+
+    async def warm_up(self):
+        await self.translator.warm_up()
+
+    async def close(self):
+        """关闭上游连接池；缓存保持可用"""
+        await self.translator.close()
+
+    def close_store(self):
+        """应用退出时关闭磁盘层"""
+        if self._db is not None:
+            self._db.submit(self.store.close).result()
+            self._db.shutdown()
+            self._db = None
+
+    async def translate(self, text, src_lang='auto', tgt_lang='en', on_partial=None):
+        key = cache_key(text, src_lang, tgt_lang, config_manager.get('LLM_MODEL'))
+        result = self._memory.get(key)
+        if result is not None:
+            self._memory.move_to_end(key)
+            self._hit('memory_hits')
+            return dict(result)
+        future = self._in_flight.get(key)
+        if future is not None:
+            self._hit('coalesced')
+            return dict(await asyncio.shield(future))
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._lookup_or_fetch(key, text, src_lang, tgt_lang, on_partial)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有等待者时避免“Future exception was never retrieved”
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            del self._in_flight[key]
+        return dict(result)
+
+    async def translate_batch(self, items):
+        """items 为 [(text, src_lang, tgt_lang), ...]；逐条查缓存，未命中的条目合并为一个上游批量请求"""
+        model = config_manager.get('LLM_MODEL')
+        keys = [cache_key(text, src_lang, tgt_lang, model) for text, src_lang, tgt_lang in items]
+        results = [None] * len(keys)
+        waiting = {}
+        owned = {}
+        for index, key in enumerate(keys):
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self._hit('memory_hits')
+                results[index] = dict(result)
+            elif key in self._in_flight:
+                # 其他请求（或本批中相同的一条）正在翻译
+                self._hit('coalesced')
+                waiting[index] = self._in_flight[key]
+            else:
+                owned[index] = self._in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            fetched = await self._lookup_or_fetch_batch([(keys[index], items[index]) for index in owned])
+        except asyncio.CancelledError:
+            for future in owned.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in owned.values():
+                future.set_exception(e)
+                future.exception()
+            raise
+        else:
+            for (index, future), result in zip(owned.items(), fetched):
+                future.set_result(result)
+                results[index] = dict(result)
+        finally:
+            for index in owned:
+                del self._in_flight[keys[index]]
+        for index, future in waiting.items():
+            results[index] = dict(await asyncio.shield(future))
+        return results
+
+    async def _lookup(self, key):
+        """磁盘层查找，命中时放入内存层"""
+        if self._db is None:
+            return None
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._db, self.store.get, key)
+        except sqlite3.Error as e:
+            logger.warning(f"翻译缓存读取失败: {e}")
+            return None
+        if result is not None:
+            self._remember(key, result)
+            self._hit('disk_hits')
+        return result
+
+    def _store(self, key, result):
+        """成功的翻译写入内存层和磁盘层"""
+        if result.get('corrected') not in TRANSLATION_FAILURES:
+            self._remember(key, result)
+            if self._db is not None:
+                asyncio.get_running_loop().run_in_executor(self._db, self._put, key, result)
+
+    async def _lookup_or_fetch(self, key, text, src_lang, tgt_lang, on_partial):
+        result = await self._lookup(key)
+        if result is not None:
+            return result
+        start = time.perf_counter()
+        result = await self.translator.translate(text, src_lang=src_lang, tgt_lang=tgt_lang, on_partial=on_partial)
+        self.stats['misses'] += 1
+        self.stats['upstream_ms'] += (time.perf_counter() - start) * 1000
+        self._store(key, result)
+        return result
+
+    async def _lookup_or_fetch_batch(self, entries):
+        """entries 为 [(key, item), ...]，按顺序返回结果"""
+        results = [await self._lookup(key) for key, _ in entries]
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            start = time.perf_counter()
+            fetched = await self.translator.translate_batch([entries[index][1] for index in missing])
+            self.stats['misses'] += len(missing)
+            self.stats['upstream_ms'] += (time.perf_counter() - start) * 1000
+            for index, result in zip(missing, fetched):
+                self._store(entries[index][0], result)
+                results[index] = result
+        return results
+
+    def _put(self, key, result):
+        try:
+            self.store.put(key, result)
+        except sqlite3.Error as e:
+            logger.warning(f"翻译缓存写入失败: {e}")
+
+    def _remember(self, key, result):
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _hit(self, kind):
+        self.stats[kind] += 1
+        # 每次命中按上游平均耗时计为节省的时间
+        if self.stats['misses']:
+            self.stats['saved_ms'] += self.stats['upstream_ms'] / self.stats['misses']
+
+    def report(self) -> str:
+        stats = self.stats
+        hits = stats['memory_hits'] + stats['disk_hits'] + stats['coalesced']
+        total = hits + stats['misses']
+        rate = hits / total if total else 0.0
+        return (f"命中 {hits}/{total}（{rate:.0%}，内存 {stats['memory_hits']}，磁盘 {stats['disk_hits']}，"
+                f"合并 {stats['coalesced']}），节省约 {stats['saved_ms'] / 1000:.1f}s")
+
+def cached_translator(translator=None):
+    """按配置给 Translator 加上缓存；TRANSLATE_CACHE 关闭时原样返回"""
+    translator = translator or Translator()
+    if str(config_manager.get('TRANSLATE_CACHE', True)).lower() not in ('1', 'true', 'yes', 'on'):
+        return translator
+    store = None
+    db_path = config_manager.get('TRANSLATE_CACHE_DB', '')
+    if db_path:
+        # 相对路径放在应用数据目录下，不随启动时的工作目录变化
+        db_path = config_manager.get_data_path(db_path)
+        try:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            store = TranslationStore(db_path, ttl_s=float(config_manager.get('TRANSLATE_CACHE_TTL_DAYS', 30)) * 86400,
+                                     max_rows=int(config_manager.get('TRANSLATE_CACHE_MAX_ROWS', 100000)))
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"翻译缓存数据库不可用，只使用内存缓存: {e}")
+    return CachedTranslator(translator, int(config_manager.get('TRANSLATE_CACHE_MEMORY', 2048)), store)
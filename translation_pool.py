@@ -0,0 +1,157 @@
+# =============================================================
+# 文件名(File): translation_pool.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 翻译工作池 - 固定数量的并发翻译任务，结果按分句顺序（或完成顺序）交付，统计排队与等待
+# =============================================================
+
+"""
+翻译工作池
+
+单个翻译协程逐句等待 translate 返回时，一个慢响应（最长到5秒超时）会拖住后面所有分句。
+TranslationPool 用 width 个工作任务并发处理同一个队列：
+
+    - 每个工作任务用 collect_batch 取一批（max_items / window_s，与批量翻译相同），交给 handler
+    - ordered=True 时结果按提交顺序交付：先完成的后续分句暂存，等前面的分句交付后再交付；
+      ordered=False 时完成即交付
+    - in_turn(seq) 表示该条之前的分句都已交付，流式中间结果可据此决定是否显示
+
+handler(batch) 为协程，batch 是 [(seq, item), ...]，按顺序返回结果列表；抛出异常时这一批的
+结果都是该异常对象，返回的条数不足时缺少的条目结果为 RuntimeError。deliver(item, result) 在事件循环中调用。
+
+统计：queue_depth（排队条数）、in_flight（翻译中条数）、每条的排队等待、顺序等待和总耗时。
+"""
+
+import time
+import asyncio
+import logging
+
+from translator import collect_batch
+
+logger = logging.getLogger(__name__)
+
+class TranslationPool:
+    """
+    并发翻译工作池。
+
+    handler: 协程 handler(batch)，batch 为 [(seq, item), ...]，返回与之等长的结果列表
+    deliver: deliver(item, result)，按 ordered 规定的顺序调用
+    width: 同时进行的翻译任务数
+    ordered: True 按提交顺序交付，False 完成即交付
+    max_items / window_s: 每个工作任务取批的条数上限和凑批等待时间，见 collect_batch
+    """
+
+    def __init__(self, handler, deliver, width=4, ordered=True, max_items=1, window_s=0):
+        self.handler = handler
+        self.deliver = deliver
+        self.width = max(1, width)
+        self.ordered = ordered
+        self.max_items = max(1, max_items)
+        self.window_s = window_s
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.max_in_flight = 0
+        # 每条分句：排队等待（提交到开始翻译）、顺序等待（翻译完成到交付）、总耗时，单位毫秒
+        self.wait_ms = []
+        self.hold_ms = []
+        self.total_ms = []
+        self._queue = None
+        self._workers = []
+        self._next_seq = 0
+        self._next_delivery = 0
+        self._done = {}
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        """在当前事件循环上启动工作任务"""
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.width)]
+        return self
+
+    def submit(self, item) -> int:
+        """提交一条，返回其序号"""
+        seq = self._next_seq
+        self._next_seq += 1
+        self._queue.put_nowait((seq, item, time.perf_counter()))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return seq
+
+    def in_turn(self, seq) -> bool:
+        """该条之前的分句是否都已交付（ordered=False 时总是 True）"""
+        return not self.ordered or seq == self._next_delivery
+
+    async def close(self):
+        """处理完已提交的条目后停止工作任务"""
+        if self._queue is None:
+            return
+        for _ in self._workers:
+            self._queue.put_nowait(None)
+        await asyncio.gather(*self._workers)
+        self._workers = []
+        self._queue = None
+
+    async def _worker(self):
+        while True:
+            entries, ended = await collect_batch(self._queue, self.max_items, self.window_s)
+            if entries:
+                await self._run(entries)
+            if ended:
+                break
+
+    async def _run(self, entries):
+        started = time.perf_counter()
+        self.wait_ms.extend((started - submitted) * 1000 for _, _, submitted in entries)
+        self.in_flight += len(entries)
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            results = await self.handler([(seq, item) for seq, item, _ in entries])
+        except Exception as e:
+            logger.warning(f"翻译任务失败: {e}")
+            results = [e] * len(entries)
+        finally:
+            self.in_flight -= len(entries)
+        results = list(results)
+        if len(results) != len(entries):
+            # 结果条数不符时缺少的条目记为失败，否则其序号永远等不到交付，按序交付会停住
+            error = RuntimeError(f"翻译处理函数返回 {len(results)} 条结果，应为 {len(entries)} 条")
+            logger.warning(str(error))
+            results = (results + [error] * len(entries))[:len(entries)]
+        finished = time.perf_counter()
+        for (seq, item, submitted), result in zip(entries, results):
+            self._done[seq] = (item, result, submitted, finished)
+        self._flush()
+
+    def _flush(self):
+        """交付已完成的条目：按序模式下只交付从下一个待交付序号起连续完成的部分"""
+        if self.ordered:
+            seqs = []
+            while self._next_delivery in self._done:
+                seqs.append(self._next_delivery)
+                self._next_delivery += 1
+        else:
+            seqs = sorted(self._done)
+        now = time.perf_counter()
+        for seq in seqs:
+            item, result, submitted, finished = self._done.pop(seq)
+            self.hold_ms.append((now - finished) * 1000)
+            self.total_ms.append((now - submitted) * 1000)
+            try:
+                self.deliver(item, result)
+            except Exception as e:
+                logger.warning(f"翻译结果交付失败: {e}")
+
+    def report(self) -> str:
+        """排队与等待统计"""
+        if not self.total_ms:
+            return "暂无数据"
+
+        def summary(values):
+            return f"平均{sum(values) / len(values):.0f}ms 最长{max(values):.0f}ms"
+
+        return (f"{len(self.total_ms)} 句，并发 {self.width}{'（按序交付）' if self.ordered else ''}，"
+                f"排队最多 {self.max_queue_depth} 句，同时翻译最多 {self.max_in_flight} 句；"
+                f"排队等待 {summary(self.wait_ms)}，顺序等待 {summary(self.hold_ms)}，总耗时 {summary(self.total_ms)}")
@@ -1,25 +1,339 @@
 # =============================================================
 # 文件名(File): translator.py
-# 版本(Version): v1.5.0
+# 版本(Version): v1.9.0
 # 最后更新(Updated): 2025/07/29
 # 作者(Author): 深圳王哥 & AI
 # 创建日期(Created): 2025/07/29
 # 简介(Description): 翻译 + ASR纠偏，返回纠错&翻译结果结构
+# 修改记录(Changes):
+#   - 可指定翻译服务地址 api_url（本地替身服务、批量转写工具），缺省使用 TRANSLATE_API_URL
+#   - 常驻 ClientSession + 调优的 TCPConnector（keep-alive、每主机连接上限、DNS缓存），
+#     不再每次翻译新建会话；warm_up 预先建立连接，close 随应用关闭；复用的空闲连接已被服务端关闭时重试一次
+#   - 新增 PROMPT_VERSION（翻译缓存键的一部分）和失败标记 TRANSLATION_FAILURES
+#   - translate 传入 on_partial 时以流式（SSE）请求，SectionParser 增量识别段落标记（可跨数据块），
+#     纠错原文和译文随生成回调；ThrottledUpdater 合并过密的界面更新
+#   - 新增 translate_batch：多条分句合并为一个请求（带编号的JSON输入输出），解析失败的条目逐条重试；
+#     collect_batch 从翻译队列按时间窗口/条数凑批；usage 累计请求数和词元用量
 # =============================================================
 
+import json
+import time
 import aiohttp
 import asyncio
 import logging
+from yarl import URL
 from config_manager import config_manager
 
 # 日志配置
 logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
 
-class Translator:
+# 提示词版本：修改提示词或结果格式时加一，使旧的翻译缓存失效
+PROMPT_VERSION = 1
+# 请求失败/解析失败时 corrected 字段的取值
+TRANSLATION_FAILURES = ('[请求失败]', '[异常]', '[解析失败]')
+# 单次翻译请求超时（秒）
+TRANSLATE_TIMEOUT_S = 5
+# 预热请求超时（秒）
+WARM_UP_TIMEOUT_S = 5
+
+# 批量翻译提示词中待处理条目之前的标记（本地替身服务据此识别批量请求）
+BATCH_ITEMS_MARKER = "待处理条目（JSON）："
+
+BATCH_PROMPT = """
+你是一个高精度语音识别后处理专家，下面是若干条自动语音识别（ASR）分句，请逐条处理：
+
+步骤一：根据语义上下文和发音相似原则纠错，包括掉字、同音字、错别字、中文语序问题、
+英文误识别（如“狗狗妈”→“Google Map”）、拼音或音译词不标准；
+步骤二：将纠错后的句子翻译为该条 tgt 指定的语言，精准传达语义，不要解释或注释，
+无法理解的内容标注：【语义无法识别】。src 为 auto 时自行判断源语言。
+
+只返回如下JSON，不要返回其他内容，每个 id 对应一条：
+{"items": [{"id": <编号>, "corrected": "<修正后的原文>", "translation": "<翻译后的内容>"}]}
+
+""" + BATCH_ITEMS_MARKER + "\n"
+
+SECTION_MARKERS = (("【纠错后原文】", 'corrected'), ("【翻译结果】", 'translation'))
+
+def parse_sections(content) -> tuple:
+    """按行解析完整响应，返回 (纠错后原文, 翻译结果)"""
+    corrected = ""
+    translation = ""
+    for line in content.splitlines():
+        line = line.strip()
+        if line.startswith("【纠错后原文】"):
+            corrected = line.replace("【纠错后原文】", "").strip()
+        elif line.startswith("【翻译结果】"):
+            translation = line.replace("【翻译结果】", "").strip()
+    return corrected, translation
+
+def parse_batch(content, count) -> dict:
+    """
+    解析批量翻译的JSON响应，返回 {序号(0起): (纠错后原文, 翻译结果)}。
+    容忍代码块包裹和前后多余文字；整体无法解析时返回空字典，缺少或不完整的条目不出现在结果中。
+    """
+    start, end = content.find('{'), content.rfind('}')
+    if start < 0 or end < start:
+        return {}
+    try:
+        data = json.loads(content[start:end + 1])
+    except ValueError:
+        return {}
+    items = data.get('items') if isinstance(data, dict) else None
+    results = {}
+    for item in items if isinstance(items, list) else ():
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item.get('id')) - 1
+        except (TypeError, ValueError):
+            continue
+        corrected, translation = item.get('corrected'), item.get('translation')
+        if 0 <= index < count and isinstance(corrected, str) and isinstance(translation, str) \
+                and (corrected.strip() or translation.strip()):
+            results[index] = (corrected.strip(), translation.strip())
+    return results
+
+async def collect_batch(queue, max_items, window_s):
+    """
+    从翻译队列取一批条目：等到第一条后，凑满 max_items 条或距第一条 window_s 秒为止
+    （window_s 为 0 时只取已在队列中的条目，不额外等待）。
+    返回 (条目列表, 是否收到结束信号 None)；结束信号之前的条目照常返回。
+    """
+    item = await queue.get()
+    if item is None:
+        return [], True
+    batch = [item]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + window_s
+    while len(batch) < max_items:
+        try:
+            item = queue.get_nowait()
+        except asyncio.QueueEmpty:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+        if item is None:
+            return batch, True
+        batch.append(item)
+    return batch, False
+
+class SectionParser:
+    """
+    流式响应的增量段落解析，与 parse_sections 的按行规则一致：以标记开头的行，其余部分是该段内容。
+
+    每行开头先缓存，直到能确定是否以标记开头（标记可能被拆在两个数据块中）；确定之后该行的
+    内容直接追加到所属段，不再重复扫描已收到的文本。
+    """
+
     def __init__(self):
-        pass
+        self.sections = {'corrected': '', 'translation': ''}
+        self.content = ''
+        self._head = ''          # 当前行中尚未判定的开头
+        self._section = None     # 当前行所属段
+        self._decided = False
+
+    @property
+    def corrected(self) -> str:
+        return self.sections['corrected'].strip()
+
+    @property
+    def translation(self) -> str:
+        return self.sections['translation'].strip()
+
+    def feed(self, delta) -> bool:
+        """追加一段增量文本，返回段落内容是否有变化"""
+        self.content += delta
+        changed = False
+        lines = delta.split('\n')
+        for index, piece in enumerate(lines):
+            if index:
+                # 换行：开始新的一行
+                self._head, self._section, self._decided = '', None, False
+            if not piece:
+                continue
+            if self._decided:
+                if self._section:
+                    self.sections[self._section] += piece
+                    changed = True
+                continue
+            self._head += piece
+            head = self._head.lstrip()
+            for marker, name in SECTION_MARKERS:
+                if head.startswith(marker):
+                    self._decided, self._section = True, name
+                    # 同一段再次出现时以最后一次为准（与 parse_sections 一致）
+                    self.sections[name] = head[len(marker):]
+                    changed = True
+                    break
+                if marker.startswith(head):
+                    break
+            else:
+                self._decided = True
+        return changed
+
+class ThrottledUpdater:
+    """
+    在事件循环中限制回调频率：两次调用至少间隔 interval 秒，期间的更新合并为一次尾随调用。
+    最终结果另行更新前调用 cancel，丢弃尚未执行的中间更新。
+    """
+
+    def __init__(self, callback, interval=0.1):
+        self.callback = callback
+        self.interval = interval
+        self.calls = 0
+        self._last = 0.0
+        self._pending = None
+        self._handle = None
+
+    def update(self, *args):
+        self._pending = args
+        if self._handle is not None:
+            return
+        wait = self._last + self.interval - time.monotonic()
+        if wait <= 0:
+            self._fire()
+        else:
+            self._handle = asyncio.get_running_loop().call_later(wait, self._fire)
+
+    def _fire(self):
+        self._handle = None
+        if self._pending is not None:
+            args, self._pending = self._pending, None
+            self._last = time.monotonic()
+            self.calls += 1
+            self.callback(*args)
+
+    def cancel(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        self._pending = None
+
+class Translator:
+    """
+    翻译 + ASR纠偏。
+
+    每个事件循环上持有一个常驻 aiohttp.ClientSession，连接在请求之间保持（keep-alive），
+    翻译请求不再重复 DNS 解析、TCP 和 TLS 握手。会话在首次使用时创建，绑定当时的事件循环；
+    close 之后再次翻译会重新创建。
+    """
+
+    def __init__(self, api_url=None):
+        self.api_url = api_url or config_manager.get('TRANSLATE_API_URL')
+        self._session = None
+        self._loop = None
+        # 累计用量：请求数与服务端返回的词元数（usage）
+        self.usage = {'requests': 0, 'prompt_tokens': 0, 'completion_tokens': 0}
+
+    def _count_usage(self, usage):
+        self.usage['requests'] += 1
+        if isinstance(usage, dict):
+            self.usage['prompt_tokens'] += usage.get('prompt_tokens') or 0
+            self.usage['completion_tokens'] += usage.get('completion_tokens') or 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """当前事件循环上的常驻会话，首次使用或换了事件循环时创建"""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=int(config_manager.get('TRANSLATE_MAX_CONNECTIONS', 8)),
+                keepalive_timeout=float(config_manager.get('TRANSLATE_KEEPALIVE_S', 60)),
+                use_dns_cache=True,
+                ttl_dns_cache=int(config_manager.get('TRANSLATE_DNS_CACHE_S', 300)),
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=TRANSLATE_TIMEOUT_S))
+            self._loop = loop
+        return self._session
 
-    async def translate(self, text, src_lang='auto', tgt_lang='en'):
+    async def warm_up(self):
+        """
+        预先完成 DNS 解析和 TCP/TLS 握手，连接留在连接池中供下一次翻译复用；失败只记录日志。
+        只向服务根路径发送一个小的 GET，不访问翻译接口，不需要鉴权也不占用接口限流；响应体读完后
+        连接才会放回连接池（HEAD 响应不带 Content-Length 时 aiohttp 会关闭连接，因此不用 HEAD）。
+        """
+        try:
+            origin = URL(self.api_url).origin()
+            async with self._get_session().get(
+                    origin, allow_redirects=False, timeout=aiohttp.ClientTimeout(total=WARM_UP_TIMEOUT_S)) as resp:
+                await resp.read()
+        except Exception as e:
+            logging.warning("翻译服务连接预热失败: %s", e)
+
+    async def close(self):
+        """关闭常驻会话和连接池（应用退出、批量任务结束时调用）"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _post(self, headers, payload):
+        """发送翻译请求，返回 (状态码, JSON或None)；复用的空闲连接已被服务端关闭时重试一次"""
+        for attempt in range(2):
+            try:
+                async with self._get_session().post(self.api_url, headers=headers, json=payload) as resp:
+                    if resp.status != 200:
+                        return resp.status, None
+                    data = await resp.json()
+                    self._count_usage(data.get('usage'))
+                    return resp.status, data
+            except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError) as e:
+                if attempt or isinstance(e, aiohttp.ClientConnectorError):
+                    raise
+
+    async def _post_stream(self, headers, payload, on_partial):
+        """流式请求（SSE），段落内容变化时调用 on_partial(corrected, translation)；返回 (状态码, 完整内容或None)"""
+        for attempt in range(2):
+            parser = SectionParser()
+            try:
+                async with self._get_session().post(self.api_url, headers=headers, json=payload) as resp:
+                    if resp.status != 200:
+                        return resp.status, None
+                    usage = None
+                    skipped = 0
+                    async for line in resp.content:
+                        line = line.strip()
+                        if not line.startswith(b'data:'):
+                            continue
+                        data = line[5:].strip()
+                        if data == b'[DONE]':
+                            break
+                        try:
+                            chunk = json.loads(data)
+                            choices = chunk.get('choices') or [{}]
+                            delta = choices[0].get('delta', {}).get('content')
+                        except (ValueError, AttributeError, IndexError) as e:
+                            # 单个数据行损坏时跳过，不中断整个流
+                            skipped += 1
+                            logging.warning("跳过无法解析的流式数据行: %s (%s)", data[:80], e)
+                            continue
+                        usage = chunk.get('usage') or usage
+                        if delta and parser.feed(delta):
+                            on_partial(parser.corrected, parser.translation)
+                    self._count_usage(usage)
+                    if skipped and not parser.content:
+                        raise ValueError(f"流式响应的 {skipped} 个数据行都无法解析")
+                    return resp.status, parser.content
+            except (aiohttp.ServerDisconnectedError, aiohttp.ClientOSError) as e:
+                # 已经收到内容时不重试，避免重复回调
+                if attempt or isinstance(e, aiohttp.ClientConnectorError) or parser.content:
+                    raise
+
+    async def translate(self, text, src_lang='auto', tgt_lang='en', on_partial=None):
+        """
+        翻译并纠错，返回 {corrected, translation, raw}。
+        on_partial(corrected, translation): 传入时以流式请求，纠错原文和译文随生成回调（可能很频繁）
+        """
         # 构造 prompt，返回两个部分：纠错原文 + 翻译结果
         if src_lang == 'auto':
             prompt = f"""
@@ -61,11 +375,59 @@ class Translator:
 {text}
 """
 
-        headers = {
+        headers = self._headers()
+        payload = self._payload(prompt)
+
+        try:
+            if on_partial is not None:
+                payload["stream"] = True
+                status, content = await self._post_stream(headers, payload, on_partial)
+            else:
+                status, data = await self._post(headers, payload)
+                if status == 200:
+                    content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+            if status == 200:
+                content = content.strip()
+
+                # 简单解析两个部分
+                corrected, translation = parse_sections(content)
+
+                if not corrected and not translation:
+                    logging.warning("无法解析结构化响应，原始返回：%s", content)
+                    return {
+                        "corrected": "[解析失败]",
+                        "translation": "[翻译失败]",
+                        "raw": content
+                    }
+
+                return {
+                    "corrected": corrected,
+                    "translation": translation,
+                    "raw": content
+                }
+            else:
+                logging.error("翻译失败 %d，内容片段：%s", status, text[:30])
+                return {
+                    "corrected": "[请求失败]",
+                    "translation": text,
+                    "raw": f"[翻译失败: {status}]"
+                }
+        except Exception as e:
+            logging.exception("请求异常: %s", str(e))
+            return {
+                "corrected": "[异常]",
+                "translation": text,
+                "raw": f"[翻译异常] {str(e)}"
+            }
+
+    def _headers(self) -> dict:
+        return {
             "Authorization": f"Bearer {config_manager.get('LLM_API_KEY')}",
             "Content-Type": "application/json"
         }
-        payload = {
+
+    def _payload(self, prompt) -> dict:
+        return {
             "model": config_manager.get('LLM_MODEL'),
             "messages": [
                 {"role": "system", "content": "你是一个语音转写纠错和翻译专家，返回结构化结果。"},
@@ -73,61 +435,50 @@ class Translator:
             ]
         }
 
+    async def translate_batch(self, items) -> list:
+        """
+        一次请求翻译多条分句，items 为 [(text, src_lang, tgt_lang), ...]，按顺序返回与 translate 相同结构的结果。
+
+        多条分句共用一份提示词和一次往返；模型按编号返回JSON。整体无法解析或缺少某条时，
+        这些条目逐条（并发）调用 translate；请求失败时各条返回与 translate 相同的失败结果。
+        """
+        items = list(items)
+        if len(items) == 1:
+            text, src_lang, tgt_lang = items[0]
+            return [await self.translate(text, src_lang=src_lang, tgt_lang=tgt_lang)]
+        entries = [{"id": index + 1, "src": src_lang, "tgt": tgt_lang, "text": text}
+                   for index, (text, src_lang, tgt_lang) in enumerate(items)]
+        prompt = BATCH_PROMPT + json.dumps(entries, ensure_ascii=False)
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    config_manager.get('TRANSLATE_API_URL'),
-                    headers=headers,
-                    json=payload,
-                    timeout=5
-                ) as resp:
-                    if resp.status == 200:
-                        data = await resp.json()
-                        content = data.get("choices", [{}])[0].get("message", {}).get("content", "").strip()
-
-                        # 简单解析两个部分
-                        corrected = ""
-                        translation = ""
-
-                        for line in content.splitlines():
-                            line = line.strip()
-                            if line.startswith("【纠错后原文】"):
-                                corrected = line.replace("【纠错后原文】", "").strip()
-                            elif line.startswith("【翻译结果】"):
-                                translation = line.replace("【翻译结果】", "").strip()
-
-                        if not corrected and not translation:
-                            logging.warning("无法解析结构化响应，原始返回：%s", content)
-                            return {
-                                "corrected": "[解析失败]",
-                                "translation": "[翻译失败]",
-                                "raw": content
-                            }
-
-                        return {
-                            "corrected": corrected,
-                            "translation": translation,
-                            "raw": content
-                        }
-                    else:
-                        logging.error("翻译失败 %d，内容片段：%s", resp.status, text[:30])
-                        return {
-                            "corrected": "[请求失败]",
-                            "translation": text,
-                            "raw": f"[翻译失败: {resp.status}]"
-                        }
+            status, data = await self._post(self._headers(), self._payload(prompt))
         except Exception as e:
-            logging.exception("请求异常: %s", str(e))
-            return {
-                "corrected": "[异常]",
-                "translation": text,
-                "raw": f"[翻译异常] {str(e)}"
-            }
+            logging.exception("批量翻译请求异常: %s", str(e))
+            return [{"corrected": "[异常]", "translation": text, "raw": f"[翻译异常] {str(e)}"}
+                    for text, _, _ in items]
+        if status != 200:
+            logging.error("批量翻译失败 %d，共 %d 条", status, len(items))
+            return [{"corrected": "[请求失败]", "translation": text, "raw": f"[翻译失败: {status}]"}
+                    for text, _, _ in items]
+        content = (data.get("choices", [{}])[0].get("message", {}).get("content", "") or "").strip()
+        parsed = parse_batch(content, len(items))
+        results = [None] * len(items)
+        for index, (corrected, translation) in parsed.items():
+            results[index] = {"corrected": corrected, "translation": translation, "raw": content}
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing:
+            logging.warning("批量翻译结果缺少 %d/%d 条，逐条重试，原始返回：%s", len(missing), len(items), content[:200])
+            retried = await asyncio.gather(*(
+                self.translate(items[index][0], src_lang=items[index][1], tgt_lang=items[index][2])
+                for index in missing))
+            for index, result in zip(missing, retried):
+                results[index] = result
+        return results
 
 # 测试用
 if __name__ == "__main__":
     async def test():
         t = Translator()
+        await t.warm_up()
         sample_texts = [
             "我要去音行办卡",
             "查一下狗狗妈的路线",
@@ -142,5 +493,6 @@ if __name__ == "__main__":
         # print("纠错:", result["corrected"])
         # print("翻译:", result["translation"])
         # print("----")
+        await t.close()
 
     asyncio.run(test())
\ No newline at end of file
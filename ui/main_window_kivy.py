@@ -47,11 +47,15 @@ import re
 import traceback
 import os
 import datetime
+import time
+import logging
 from kivy.utils import platform
 from kivymd.uix.dialog import MDDialog
 from kivymd.uix.button import MDFlatButton
 from kivymd.uix.list import OneLineListItem
 
+logger = logging.getLogger(__name__)
+
 def clean_text(text):
     if not isinstance(text, str):
         return text
@@ -73,10 +77,14 @@ def clean_text(text):
         print(f"[ERROR] Unicode error in clean_text: {e}, text: {repr(text)}")
         return str(text) if text else ""
 
-from audio_capture import AudioStream
-from asr_client import VolcanoASRClientAsync
+from audio_capture import open_audio_stream, warm_up_audio
+from asr_client import AsrStandbyManager, PartialUpdated, UtteranceFinalized, SessionEnded
 from lang_detect import LangDetect
-from translator import Translator
+from translation_cache import cached_translator
+from translation_pool import TranslationPool
+from translator import ThrottledUpdater
+from session_recorder import SessionRecorder
+from config_manager import config_manager
 # 新增导入
 from hotwords import get_hotwords, add_hotword
 from utils.file_downloader import FileDownloader
@@ -256,16 +264,28 @@ class MainWidget(MDBoxLayout):
         super().__init__(**kwargs)
         self.final_texts = []
         self.final_bubbles = []
-        self.last_shown_definite_text = None
         self.final_utterance_keys = set()
-        self.asr_thread = None
+        self.asr_future = None
         self.audio = None
         self.lang_detect = LangDetect()
-        self.translator = Translator()
+        # 重复的短句直接取缓存，相同请求并发时只调用一次LLM
+        self.translator = cached_translator()
         self.file_downloader = FileDownloader()
         self.loop = None
         self.interim_bubble = None  # 只保留一个interim气泡
-        self._asr_call_count = 0  # 调用计数
+        # ASR常驻事件循环：预热连接绑定在该循环上，Mic ON 时直接取用
+        self.asr_loop = asyncio.new_event_loop()
+        threading.Thread(target=self.asr_loop.run_forever, daemon=True).start()
+        # 预热连接每条都是一次计费会话：ASR_STANDBY 开启时在首次 Mic ON 之后才开始补充，空闲后停止
+        self.asr_standby = AsrStandbyManager(
+            standby_ttl=float(config_manager.get('ASR_STANDBY_TTL_S', 8)),
+            idle_timeout=float(config_manager.get('ASR_STANDBY_IDLE_S', 300)))
+        self.asr_standby_enabled = str(config_manager.get('ASR_STANDBY', False)).lower() in ('1', 'true', 'yes', 'on')
+        # 翻译在 ASR 事件循环上进行，常驻连接池绑定该循环，启动时预先建立连接
+        asyncio.run_coroutine_threadsafe(self.translator.warm_up(), self.asr_loop)
+        # PortAudio 初始化和设备枚举放到后台，Mic ON 时只打开采集流
+        warm_up_audio()
+        self.mic_on_at = None
         # 初始化热词（保留代码结构）
         self.hotwords = get_hotwords()
         self.update_hotwords_display()
@@ -293,23 +313,36 @@ class MainWidget(MDBoxLayout):
             return
         self.set_asr_running(True)
         self.mic_btn_text = 'Mic OFF'
-        self.audio = AudioStream()
-        self.asr_thread = threading.Thread(target=self._run_asr, daemon=True)
-        self.asr_thread.start()
+        self.mic_on_at = time.perf_counter()
+        self.audio = open_audio_stream()
+        self.asr_future = asyncio.run_coroutine_threadsafe(self._run_asr(), self.asr_loop)
 
     def on_stop(self):
         self.set_asr_running(False)
         if self.audio:
             self.audio.stop()
         self.mic_btn_text = 'Mic ON'
-        if self.asr_thread and self.asr_thread.is_alive():
-            self.asr_thread.join(timeout=1)
+
+    def shutdown(self):
+        """应用退出时关闭预热连接并停止ASR事件循环"""
+        self.on_stop()
+        try:
+            asyncio.run_coroutine_threadsafe(self.asr_standby.close(), self.asr_loop).result(timeout=2)
+        except Exception as e:
+            print(f"[ASR] 关闭预热连接失败: {e}")
+        try:
+            asyncio.run_coroutine_threadsafe(self.translator.close(), self.asr_loop).result(timeout=2)
+        except Exception as e:
+            print(f"[翻译] 关闭连接池失败: {e}")
+        if hasattr(self.translator, 'close_store'):
+            self.translator.close_store()
+        self.asr_loop.call_soon_threadsafe(self.asr_loop.stop)
 
     def on_reset(self):
         self.final_texts.clear()
         self.final_bubbles.clear()
-        self.last_shown_definite_text = None
         self.final_utterance_keys.clear()
+        self.interim_bubble = None
         self.ids.chat_area.clear_widgets()
         self.scroll_to_bottom()
 
@@ -345,147 +378,191 @@ class MainWidget(MDBoxLayout):
     def set_asr_running(self, value):
         self.asr_running = value
 
-    def _run_asr(self):
+    async def _run_asr(self):
         try:
-            asyncio.run(self._asr_flow())
+            await self._asr_flow()
         except Exception as e:
             print(f"[ASR] 错误: {e}")
             # 确保异常时也能安全切回主线程修改UI
             Clock.schedule_once(lambda dt: self.set_asr_running(False))
 
+    def _start_recorder(self, audio):
+        """RECORD_AUDIO 开启时把本次会话的采集音频录入 RECORD_DIR，返回 SessionRecorder 或 None"""
+        if str(config_manager.get('RECORD_AUDIO', False)).lower() not in ('1', 'true', 'yes', 'on'):
+            return None
+        try:
+            # 相对路径放在应用数据目录下，不随启动时的工作目录变化
+            record_dir = config_manager.get_data_path(config_manager.get('RECORD_DIR', 'recordings'))
+            os.makedirs(record_dir, exist_ok=True)
+            name = datetime.datetime.now().strftime('session_%Y%m%d_%H%M%S.tcrec')
+            return SessionRecorder(os.path.join(record_dir, name), audio.rate, audio.channels).attach(audio)
+        except Exception as e:
+            print(f"[录音] 无法开始录音: {e}")
+            return None
+
     async def _asr_flow(self):
-        N = 10
-        last_text = None
-        last_emit_time = None
-        no_update_count = 0
         audio = self.audio
+        # 录音须在采集开始之前订阅，录音时间与ASR会话时间一致
+        recorder = self._start_recorder(audio)
         
-        # 创建翻译任务队列和后台任务
-        translation_queue = asyncio.Queue()
-        translation_tasks = set()
-        
-        # 启动翻译后台任务
-        translation_task = asyncio.create_task(self._translation_worker(translation_queue))
+        # 翻译工作池：多条翻译并发进行，结果按分句顺序更新到气泡
+        translation_pool = self._create_translation_pool().start()
+        # 空闲连接可能已超过 TRANSLATE_KEEPALIVE_S 被关闭，在首句固化之前重新建立
+        warm_up_task = asyncio.create_task(self.translator.warm_up())
         
-        async def on_result(response):
-            print("[DEBUG] ASR原始payload_msg:", repr(response.payload_msg))  # 新增调试打印
-            nonlocal last_text, last_emit_time, no_update_count
-            if not self.asr_running:
-                return
-            now = asyncio.get_event_loop().time()
-            timeout_finalize = False
-            if response.payload_msg:
-                result = response.payload_msg.get('result', {})
-                asr_utterances = result.get('utterances', [])
-                print("[DEBUG] ASR原始utterances:", repr(asr_utterances))  # 新增调试打印
-                updated = False
-                current_text = None
-                new_definite_utterances = []
-                
-                for utt in asr_utterances:
-                    if utt.get('definite') and not utt.get('translation'):
-                        # 立即显示ASR结果，翻译异步处理
-                        utt['translation'] = None
-                        utt['corrected'] = None
-                        
-                        # 将翻译任务加入队列，异步处理
-                        if self.get_app_show_translation():
-                            translation_item = {
-                                'utterance_id': id(utt),
-                                'text': utt['text'],
-                                'utterance': utt
-                            }
-                            await translation_queue.put(translation_item)
-                        
-                        updated = True
-                    if utt.get('text'):
-                        current_text = utt['text']
-                    if utt.get('definite') and utt.get('text'):
-                        new_definite_utterances.append(utt)
-                        
-                if current_text and current_text != getattr(self, 'last_shown_definite_text', None):
-                    self.last_shown_definite_text = current_text
-                    no_update_count = 0
-                    last_emit_time = now
-                else:
-                    no_update_count += 1
-                    
-                if no_update_count >= N and last_text:
-                    timeout_finalize = True
-                    utterance = {'text': last_text, 'definite': True, 'translation': None, 'timeout_finalize': True}
-                    
-                    # 超时固化时也异步翻译
-                    if self.get_app_show_translation():
+        async def consume_events(events):
+            """按增量事件更新界面：只处理新固化的分句和变化的中间结果"""
+            async for event in events:
+                if isinstance(event, UtteranceFinalized):
+                    utt = event.utterance
+                    if recorder is not None:
+                        # VAD门控时分句时间为上行音频时间，换算回采集时间
+                        to_capture = asr.vad_gate.capture_ms if asr.vad_gate else float
+                        recorder.add_utterance(to_capture(utt['start_time']), to_capture(utt['end_time']))
+                    # 立即显示ASR结果，翻译异步处理
+                    utt['translation'] = None
+                    utt['corrected'] = None
+                    utt['timeout_finalize'] = False
+                    if self.asr_running and self.get_app_show_translation():
                         translation_item = {
-                            'utterance_id': id(utterance),
-                            'text': last_text,
-                            'utterance': utterance
+                            'utterance_id': id(utt),
+                            'text': utt['text'],
+                            'utterance': utt
                         }
-                        await translation_queue.put(translation_item)
-                        
-                    self._show_asr_utterances([utterance])
-                    no_update_count = 0
-                    last_emit_time = now
-                else:
-                    for utt in asr_utterances:
-                        if utt.get('definite'):
-                            utt['timeout_finalize'] = False
-                    self._show_asr_utterances(asr_utterances)
-                    last_emit_time = now
+                        translation_pool.submit(translation_item)
+                    self._add_final_utterance(utt)
+                elif isinstance(event, PartialUpdated):
+                    if self.asr_running:
+                        self._show_interim(event.text)
+                elif isinstance(event, SessionEnded):
+                    self._show_interim('')
                     
-        async with VolcanoASRClientAsync(on_result=on_result) as asr:
+        try:
+            asr = await self.asr_standby.acquire()
+            if self.asr_standby_enabled:
+                await self.asr_standby.start()
+        except Exception:
+            await translation_pool.close()
+            if recorder is not None:
+                recorder.close()
+            raise
+        events_task = asyncio.create_task(consume_events(asr.events()))
+        async with asr:
             try:
                 await asr.run(audio.audio_stream_generator())
             except Exception as e:
                 print(f"[ASR] 错误: {e}")
+        await events_task
+        if recorder is not None:
+            recorder.close()
+            print(f"[录音] 已保存 {recorder.path}（{recorder.duration_ms / 1000:.0f}s，{recorder.utterance_count} 句）")
+        self.asr_standby.release()
+        print(f"[ASR] 首个中间结果耗时 {self.asr_standby.first_partial_report()}")
+        if getattr(audio, 'first_frame_ms', None) is not None:
+            mic_on_ms = (audio.started_at - self.mic_on_at) * 1000 + audio.first_frame_ms
+            print(f"[音频] Mic ON 到首帧 {mic_on_ms:.0f}ms（打开采集流到首帧 {audio.first_frame_ms:.0f}ms）")
                 
         # 等待翻译任务完成
-        await translation_queue.put(None)  # 发送结束信号
-        await translation_task
+        await translation_pool.close()
+        await warm_up_task
+        print(f"[翻译] 工作池 {translation_pool.report()}")
+        if hasattr(self.translator, 'report'):
+            print(f"[翻译] 缓存{self.translator.report()}")
+        usage = getattr(self.translator, 'usage', None)
+        if usage and usage['requests']:
+            print(f"[翻译] 累计请求 {usage['requests']} 次，输入词元 {usage['prompt_tokens']}，"
+                  f"输出词元 {usage['completion_tokens']}")
         
         self.set_asr_running(False)
         self.mic_btn_text = 'Mic ON'
 
-    async def _translation_worker(self, queue):
-        """翻译后台工作线程"""
-        while True:
-            try:
-                item = await queue.get()
-                if item is None:  # 结束信号
-                    break
-                    
-                utterance_id = item['utterance_id']
-                text = item['text']
-                utterance = item['utterance']
-                
-                print("[DEBUG] 翻译前文本:", repr(text))  # 新增调试打印
-                # 执行翻译
-                try:
-                    src_lang = self.lang_detect.detect(text)
-                    tgt_lang = 'en' if src_lang.startswith('zh') else 'zh'
-                    translation_result = await self.translator.translate(text, src_lang=src_lang, tgt_lang=tgt_lang)
-                    print("[DEBUG] 翻译API返回:", repr(translation_result))  # 新增调试打印
-                    
-                    # 更新utterance的翻译结果
-                    if isinstance(translation_result, dict):
-                        utterance['translation'] = translation_result.get('translation', '')
-                        utterance['corrected'] = translation_result.get('corrected', '')
-                    else:
-                        utterance['translation'] = translation_result or ''
-                        utterance['corrected'] = ''
-                        
-                    # 在主线程中更新UI
-                    self._update_utterance_translation(utterance)
-                    
-                except Exception as e:
-                    print(f"[翻译] 翻译失败: {e}")
-                    utterance['translation'] = '[翻译失败]'
-                    utterance['corrected'] = text
-                    self._update_utterance_translation(utterance)
-                    
-            except Exception as e:
-                print(f"[翻译工作线程] 异常: {e}")
-                continue
+    def _create_translation_pool(self):
+        """
+        按 TRANSLATE_WORKERS / TRANSLATE_IN_ORDER / TRANSLATE_BATCH_* 创建本次会话的翻译工作池。
+        处理函数绑定本次的工作池，上一次会话尚未结束的翻译不会用到新会话的交付顺序。
+        """
+        pool = TranslationPool(
+            lambda entries: self._translate_entries(pool, entries), self._deliver_translation,
+            width=int(config_manager.get('TRANSLATE_WORKERS', 4)),
+            ordered=str(config_manager.get('TRANSLATE_IN_ORDER', True)).lower() in ('1', 'true', 'yes', 'on'),
+            max_items=int(config_manager.get('TRANSLATE_BATCH_MAX', 8)),
+            window_s=float(config_manager.get('TRANSLATE_BATCH_WINDOW_MS', 0)) / 1000)
+        return pool
+
+    async def _translate_entries(self, pool, entries):
+        """翻译工作池的处理函数：一条时单独翻译，多条时合并为一个批量请求"""
+        if len(entries) == 1:
+            seq, item = entries[0]
+            return [await self._translate_item(pool, seq, item)]
+        return await self._translate_items([item for _, item in entries])
+
+    def _translation_langs(self, text):
+        src_lang = self.lang_detect.detect(text)
+        return src_lang, 'en' if src_lang.startswith('zh') else 'zh'
+
+    async def _translate_item(self, pool, seq, item):
+        """单条翻译，TRANSLATE_STREAM 开启时译文随生成显示（按序交付时只显示轮到的分句）"""
+        text = item['text']
+        utterance = item['utterance']
+
+        print("[DEBUG] 翻译前文本:", repr(text))  # 新增调试打印
+        partial_updater = None
+        on_partial = None
+        if str(config_manager.get('TRANSLATE_STREAM', True)).lower() in ('1', 'true', 'yes', 'on'):
+            # 流式翻译：译文随生成显示，界面更新按 TRANSLATE_STREAM_UPDATE_MS 合并
+            partial_updater = ThrottledUpdater(
+                lambda corrected, translation: self._show_partial_translation(utterance, corrected, translation),
+                float(config_manager.get('TRANSLATE_STREAM_UPDATE_MS', 100)) / 1000)
+
+            def on_partial(corrected, translation):
+                if pool.in_turn(seq):
+                    partial_updater.update(corrected, translation)
+        try:
+            src_lang, tgt_lang = self._translation_langs(text)
+            translation_result = await self.translator.translate(
+                text, src_lang=src_lang, tgt_lang=tgt_lang, on_partial=on_partial)
+        finally:
+            if partial_updater is not None:
+                partial_updater.cancel()
+        print("[DEBUG] 翻译API返回:", repr(translation_result))  # 新增调试打印
+        return translation_result
+
+    async def _translate_items(self, items):
+        """多条分句合并为一个批量翻译请求（不流式）"""
+        logger.debug("批量翻译 %d 条: %s", len(items), [item['text'] for item in items])
+        requests = [(item['text'], *self._translation_langs(item['text'])) for item in items]
+        return await self.translator.translate_batch(requests)
+
+    def _deliver_translation(self, item, translation_result):
+        """翻译工作池交付结果（按序交付时与分句顺序一致）"""
+        if isinstance(translation_result, Exception):
+            print(f"[翻译] 翻译失败: {translation_result}")
+            self._apply_translation_failure(item['utterance'], item['text'])
+        else:
+            self._apply_translation(item['utterance'], translation_result)
+
+    def _apply_translation(self, utterance, translation_result):
+        # 更新utterance的翻译结果
+        if isinstance(translation_result, dict):
+            utterance['translation'] = translation_result.get('translation', '')
+            utterance['corrected'] = translation_result.get('corrected', '')
+        else:
+            utterance['translation'] = translation_result or ''
+            utterance['corrected'] = ''
+
+        # 在主线程中更新UI
+        self._update_utterance_translation(utterance)
+
+    def _apply_translation_failure(self, utterance, text):
+        utterance['translation'] = '[翻译失败]'
+        utterance['corrected'] = text
+        self._update_utterance_translation(utterance)
+
+    def _show_partial_translation(self, utterance, corrected, translation):
+        """流式翻译的中间结果，最终结果到达后被覆盖"""
+        utterance['corrected'] = corrected
+        utterance['translation'] = translation
+        self._update_utterance_translation(utterance)
 
     @mainthread
     def _update_utterance_translation(self, utterance):
@@ -511,44 +588,44 @@ class MainWidget(MDBoxLayout):
         return getattr(app, 'show_translation', True)
 
     @mainthread
-    def _show_asr_utterances(self, utterances):
-        self._asr_call_count += 1
-        print(f"[DEBUG] _show_asr_utterances call #{self._asr_call_count}, utterances count: {len(utterances)}")
+    def _add_final_utterance(self, utt):
+        """追加一个固化分句气泡，已有气泡不重绘"""
+        original_text = utt.get('text', '')
+        key = (original_text, utt.get('start_time'), utt.get('end_time'))
+        if not original_text or key in self.final_utterance_keys:
+            return
+        timeout_tip = '超时自动固化' if utt.get('timeout_finalize', False) else ''
+        bubble = self.create_bubble(original_text, utt.get('corrected', ''), utt.get('translation', None),
+                                    timeout_tip, id(utt))
+        self.final_bubbles.append(bubble)
+        self.final_utterance_keys.add(key)
+        chat_area = self.ids.chat_area
+        # interim 气泡始终在最底部（children[0]），固化气泡插在它上方
+        index = 1 if self.interim_bubble is not None and self.interim_bubble.parent is chat_area else 0
+        chat_area.add_widget(bubble, index=index)
+        self._scroll_if_overflow()
+
+    @mainthread
+    def _show_interim(self, text):
+        """更新唯一的 interim 气泡；text 为空时移除"""
+        chat_area = self.ids.chat_area
+        if not text:
+            if self.interim_bubble is not None and self.interim_bubble.parent is chat_area:
+                chat_area.remove_widget(self.interim_bubble)
+            self.interim_bubble = None
+            return
+        if self.interim_bubble is None:
+            self.interim_bubble = InterimBubble(text=text)
+            chat_area.add_widget(self.interim_bubble, index=0)
+        else:
+            self.interim_bubble.text = text
+        self._scroll_if_overflow()
+
+    def _scroll_if_overflow(self):
+        # 只有内容超出可视区时才自动滚动到底部
         chat_area = self.ids.chat_area
-        print(f"[DEBUG] chat_area children before: {len(chat_area.children)}")
-        # 1. 固化分句：增量添加到 final_bubbles，历史内容不丢失
-        for utt in utterances:
-            original_text = utt.get('text', '')
-            definite = utt.get('definite', False)
-            translation = utt.get('translation', None)
-            corrected_text = utt.get('corrected', '')  # 获取纠错后的原文
-            timeout_tip = '超时自动固化' if utt.get('timeout_finalize', False) else ''
-            start_time = utt.get('start_time')
-            end_time = utt.get('end_time')
-            key = (original_text, start_time, end_time)
-            print(f"[DEBUG] 处理utterance: definite={definite}, original_text={repr(original_text)}, corrected_text={repr(corrected_text)}, translation={repr(translation)}")
-            if definite and original_text and key not in self.final_utterance_keys:
-                utterance_id = id(utt)  # 使用utterance的id作为标识
-                bubble = self.create_bubble(original_text, corrected_text, translation, timeout_tip, utterance_id)
-                print(f"[DEBUG] 创建气泡: original_text={repr(bubble.original_text)}, corrected_text={repr(bubble.corrected_text)}, translation={repr(bubble.translation)}")
-                self.final_bubbles.append(bubble)
-                self.final_utterance_keys.add(key)
-        # 2. 清空并重绘所有固化分句
-        chat_area.clear_widgets()
-        for bubble in self.final_bubbles:
-            chat_area.add_widget(bubble)
-        # 3. 显示所有未固化 interim 气泡（每个都显示）
-        for utt in utterances:
-            text = utt.get('text', '')
-            definite = utt.get('definite', False)
-            if not definite and text:
-                interim_bubble = InterimBubble(text=text)
-                chat_area.add_widget(interim_bubble)
-        # 4. 只有内容超出可视区时才自动滚动到底部
-        scrollview = chat_area.parent
-        if chat_area.height > scrollview.height:
+        if chat_area.height > chat_area.parent.height:
             self.scroll_to_bottom()
-        # print(f"[DEBUG] _show_asr_utterances end, chat_area children: {len(chat_area.children)}")
 
     def create_bubble(self, original_text, corrected_text, translation, timeout_tip, utterance_id=None):
         print(f"[DEBUG] create_bubble输入: original_text={repr(original_text)}, corrected_text={repr(corrected_text)}, translation={repr(translation)}")
@@ -724,6 +801,12 @@ class TranslateChatApp(MDApp):
     def open_api_config(self):
         self.sm.current = 'api_config'
 
+    def on_stop(self):
+        for widget in self.sm.get_screen('main').walk():
+            if isinstance(widget, MainWidget):
+                widget.shutdown()
+                break
+
 def run_app():
     TranslateChatApp().run()
 
@@ -0,0 +1,180 @@
+# =============================================================
+# 文件名(File): vad_gate.py
+# 版本(Version): v1.0.0
+# 作者(Author): 深圳王哥 & AI
+# 创建日期(Created): 2026/10/17
+# 简介(Description): 客户端VAD门控 - 只上行有声段，静音期间发送保活帧，长时间静音时通知上层关闭会话
+# =============================================================
+
+"""
+客户端VAD门控
+
+ASR按上行音频时长计费，长时间静音也会计费。VadGate 用 webrtcvad 按30ms帧判断有声/静音，
+位于采集和ASR发送队列之间：
+    - 静音帧不上行；判定开始说话时连同之前 pre_roll_ms 的音频一起送出，避免首字被截
+    - 最后一个有声帧之后继续送出 hangover_ms 的静音，服务端需要收到足够的静音才会固化分句，
+      因此 hangover_ms 应不短于服务端判停窗口（end_window_size）
+    - 静音期间每隔 keepalive_interval_ms 送出一小段数字静音，避免服务端等包超时（45000081）
+    - 静音超过 idle_close_ms 时通知上层结束会话并关闭连接，再次说话时重新建连
+
+送出的音频不再与采集时间一一对应，capture_ms 可将服务端返回的分句时间换算回采集时间。
+"""
+
+import bisect
+import collections
+import logging
+
+# webrtcvad 为可选依赖，仅在启用VAD门控时需要
+try:
+    import webrtcvad
+except Exception as e:
+    webrtcvad = None
+    _VAD_IMPORT_ERROR = e
+else:
+    _VAD_IMPORT_ERROR = None
+
+logger = logging.getLogger(__name__)
+
+VAD_FRAME_MS = 30
+# 最近 VAD_TRIGGER_WINDOW 帧中至少 VAD_TRIGGER_FRAMES 帧有声时判定开始说话，滤掉零星的误判帧
+VAD_TRIGGER_WINDOW = 5
+VAD_TRIGGER_FRAMES = 3
+
+class VadGate:
+    """
+    VAD门控状态机，输入任意长度的16bit单声道PCM，输出需要上行的音频和会话动作。
+
+    sample_rate: 8000 / 16000 / 32000 / 48000（webrtcvad 支持的采样率）
+    aggressiveness: webrtcvad 灵敏度 0-3，越大越容易判为静音
+    pre_roll_ms: 判定开始说话时一并送出的之前的音频
+    hangover_ms: 最后一个有声帧之后继续送出的静音时长
+    keepalive_interval_ms / keepalive_ms: 静音期间保活帧的间隔和时长，interval 为0时不发送
+    idle_close_ms: 静音超过该时长后通知上层关闭会话，0表示不关闭
+    """
+
+    def __init__(self, sample_rate=16000, aggressiveness=2, pre_roll_ms=300, hangover_ms=1000,
+                 keepalive_interval_ms=2000, keepalive_ms=100, idle_close_ms=0):
+        if webrtcvad is None:
+            raise RuntimeError(f"VAD门控需要webrtcvad: {_VAD_IMPORT_ERROR}")
+        self._vad = webrtcvad.Vad(aggressiveness)
+        self.sample_rate = sample_rate
+        self.bytes_per_ms = sample_rate * 2 / 1000
+        self.frame_bytes = int(self.bytes_per_ms * VAD_FRAME_MS)
+        self.pre_roll_ms = pre_roll_ms
+        self.hangover_ms = hangover_ms
+        self.keepalive_interval_ms = keepalive_interval_ms
+        self._keepalive = bytes(int(self.bytes_per_ms * keepalive_ms) & ~1)
+        self.idle_close_ms = idle_close_ms
+        self._rest = bytearray()
+        self._pre_roll = collections.deque(maxlen=max(pre_roll_ms // VAD_FRAME_MS, VAD_TRIGGER_WINDOW))
+        self._recent = collections.deque(maxlen=VAD_TRIGGER_WINDOW)
+        self.speaking = False
+        self.idle = False
+        self._silence_ms = 0        # 送出状态：最后一个有声帧之后的静音；抑制状态：已抑制的静音
+        self._since_keepalive = 0
+        self._next_capture_ms = 0.0
+        self._breaks = [(0.0, 0.0)]  # (会话时间, 采集时间)，送出的音频在采集时间上不连续处的断点
+        self.captured_ms = 0.0
+        self.streamed_ms = 0.0       # 已送出的音频，含保活帧
+        self.keepalive_count = 0
+        self.idle_count = 0
+
+    def feed(self, pcm) -> list:
+        """
+        输入一块PCM，返回动作列表 [(kind, pcm)]：
+            ('audio', pcm)      有声段（含预卷和拖尾静音），需上行
+            ('keepalive', pcm)  保活静音，需上行且不必等满一帧
+            ('pause', None)     转入静音，已送出的音频应立即发送
+            ('idle', None)      静音超过 idle_close_ms，应结束会话并关闭连接
+        """
+        self._rest += pcm
+        actions = []
+        frame_bytes = self.frame_bytes
+        usable = len(self._rest) - len(self._rest) % frame_bytes
+        for offset in range(0, usable, frame_bytes):
+            self._feed_frame(bytes(self._rest[offset:offset + frame_bytes]), actions)
+        del self._rest[:usable]
+        return actions
+
+    def flush(self) -> list:
+        """音频源结束：说话中时送出不足一帧的剩余音频"""
+        actions = []
+        if self.speaking and self._rest:
+            self._emit(actions, 'audio', bytes(self._rest), self.captured_ms)
+        self.captured_ms += len(self._rest) / self.bytes_per_ms
+        self._rest.clear()
+        return actions
+
+    def _feed_frame(self, frame, actions):
+        start_ms = self.captured_ms
+        self.captured_ms += VAD_FRAME_MS
+        is_speech = self._vad.is_speech(frame, self.sample_rate)
+        self._recent.append(is_speech)
+        if self.speaking:
+            self._emit(actions, 'audio', frame, start_ms)
+            self._silence_ms = 0 if is_speech else self._silence_ms + VAD_FRAME_MS
+            if self._silence_ms >= self.hangover_ms:
+                self.speaking = False
+                self._silence_ms = 0
+                self._since_keepalive = 0
+                self._recent.clear()
+                actions.append(('pause', None))
+            return
+        self._pre_roll.append(frame)
+        if sum(self._recent) >= VAD_TRIGGER_FRAMES:
+            self.speaking = True
+            self.idle = False
+            self._silence_ms = 0
+            pre_roll_start = self.captured_ms - len(self._pre_roll) * VAD_FRAME_MS
+            self._emit(actions, 'audio', b"".join(self._pre_roll), pre_roll_start)
+            self._pre_roll.clear()
+            return
+        if self.idle:
+            return
+        self._silence_ms += VAD_FRAME_MS
+        if self.idle_close_ms and self._silence_ms >= self.idle_close_ms:
+            self.idle = True
+            self.idle_count += 1
+            actions.append(('idle', None))
+            return
+        if self.keepalive_interval_ms:
+            self._since_keepalive += VAD_FRAME_MS
+            if self._since_keepalive >= self.keepalive_interval_ms:
+                self._since_keepalive = 0
+                self.keepalive_count += 1
+                self._emit(actions, 'keepalive', self._keepalive, self.captured_ms)
+
+    def _emit(self, actions, kind, pcm, capture_ms):
+        if capture_ms != self._next_capture_ms:
+            self._breaks.append((self.streamed_ms, capture_ms))
+        duration = len(pcm) / self.bytes_per_ms
+        self.streamed_ms += duration
+        # 保活帧不对应采集音频，之后的音频总是记一个新断点
+        self._next_capture_ms = capture_ms + duration if kind == 'audio' else -1.0
+        # 同一次 feed 中连续的有声帧合并为一块
+        if kind == 'audio' and actions and actions[-1][0] == 'audio':
+            actions[-1][1].extend(pcm)
+        elif kind == 'audio':
+            actions.append((kind, bytearray(pcm)))
+        else:
+            actions.append((kind, pcm))
+
+    def capture_ms(self, session_ms) -> float:
+        """会话时间（服务端分句时间）换算为采集时间"""
+        index = bisect.bisect_right(self._breaks, (session_ms, float('inf'))) - 1
+        streamed, captured = self._breaks[index]
+        return captured + session_ms - streamed
+
+    @property
+    def streamed_ratio(self) -> float:
+        """上行音频时长占采集时长的比例"""
+        return self.streamed_ms / self.captured_ms if self.captured_ms else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "captured_ms": self.captured_ms,
+            "streamed_ms": self.streamed_ms,
+            "streamed_ratio": self.streamed_ratio,
+            "keepalives": self.keepalive_count,
+            "idle_closes": self.idle_count,
+        }